@@ -0,0 +1,106 @@
+"""Cold-start budget check: import time and first-run ("first paint") time.
+
+Each measurement runs in a fresh interpreter so nothing is already cached:
+
+  * import  – importing every module streamlit_app.py imports at top level
+  * first run – AppTest's first full script run, imports included, which is
+    the work the server does before the first page reaches the browser
+
+It also reports which of the lazily imported modules (charts, bulk_scoring,
+pandas) were loaded by the first run; none should be. Note that Streamlit
+itself imports plotly.graph_objects at startup when Plotly is installed (for
+its chart theme), so only the app's own charting code can be deferred.
+Exits non-zero when a median exceeds its target:
+
+    python -m bench.cold_start --repeat 5
+"""
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.fake_predict_server import start_server  # noqa: E402
+APP_PATH = ROOT / "streamlit_app.py"
+
+# Target (detik) di mesin dev Linux biasa; sesuaikan dengan hardware CI
+TARGET_IMPORT_S = 1.0
+TARGET_FIRST_RUN_S = 2.0
+LAZY_MODULES = ("charts", "bulk_scoring", "pandas")
+
+
+def top_level_imports(path=APP_PATH) -> list:
+    """Modules imported at module level of the app (lazy imports inside blocks are skipped)"""
+    modules = []
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def _run(code: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure_import(modules) -> dict:
+    return _run(
+        "import importlib, json, time\n"
+        "t = time.perf_counter()\n"
+        f"for m in {modules!r}: importlib.import_module(m)\n"
+        "print(json.dumps({'seconds': time.perf_counter() - t}))\n"
+    )
+
+
+def measure_first_run(backend_url: str) -> dict:
+    # Backend palsu, tanpa store disk dan tanpa surface: hanya kerja first paint yang diukur
+    return _run(
+        "import json, sys, time, logging\n"
+        "logging.disable(logging.WARNING)\n"
+        "t = time.perf_counter()\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        f"at = AppTest.from_file({str(APP_PATH)!r}, default_timeout=120)\n"
+        f"at.secrets['api'] = {{'FASTAPI_URL': {backend_url!r}}}\n"
+        "at.secrets['cache'] = {'STORE_FILE': ''}\n"
+        "at.secrets['surface'] = {'ENABLED': False}\n"
+        "at.run()\n"
+        "elapsed = time.perf_counter() - t\n"
+        "assert not at.exception, at.exception\n"
+        f"print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--target-import", type=float, default=TARGET_IMPORT_S)
+    parser.add_argument("--target-first-run", type=float, default=TARGET_FIRST_RUN_S)
+    args = parser.parse_args()
+
+    modules = top_level_imports()
+    imports = [measure_import(modules)["seconds"] for _ in range(args.repeat)]
+    server = start_server()
+    runs = [measure_first_run(server.url) for _ in range(args.repeat)]
+    server.shutdown()
+    first_runs = [r["seconds"] for r in runs]
+
+    import_median = statistics.median(imports)
+    first_run_median = statistics.median(first_runs)
+    print(f"top-level imports : {', '.join(modules)}")
+    print(f"import     median {import_median:.3f}s  (target {args.target_import:.2f}s)")
+    print(f"first run  median {first_run_median:.3f}s  (target {args.target_first_run:.2f}s)")
+    print(f"eagerly loaded    : {runs[-1]['loaded'] or 'none of ' + ', '.join(LAZY_MODULES)}")
+
+    failed = import_median > args.target_import or first_run_median > args.target_first_run
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Local stand-in for the /predict backend, for benchmarks and offline runs.
+
+Answers ``{"features": [...]}`` with ``{"winner_probability": p}`` and
+``{"features": [[...], ...]}`` with ``{"winner_probabilities": [...]}``.
+Batches may also arrive in the binary wire formats from wire.py and any
+body may be gzipped; binary batches are answered in the format named in
+``Accept``. Latency and error rate are configurable so slow or flaky
+backends can be reproduced locally.
+
+    python -m bench.fake_predict_server --port 8765 --latency-ms 80 --error-rate 0.02
+"""
+import argparse
+import gzip
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import wire
+
+MODEL_VERSION = "fake-1"
+
+
+def fake_probability(features) -> float:
+    """Deterministic, plausible win probability from a 20-feature row"""
+    grid, quali, avg_points = features[1], features[3], features[18]
+    z = -0.25 * (grid - 5) - 0.8 * (quali - 79.9) + 0.08 * avg_points - 1.5
+    return round(1 / (1 + math.exp(-z)), 6)
+
+
+class FakePredictServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, batch=True, binary=True,
+                 gzip=True):
+        super().__init__(address, _Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.batch = batch
+        self.binary = binary
+        self.gzip = gzip
+        self.requests = 0
+        self.rows = 0
+        self.bytes_in = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/predict"
+
+    def count(self, rows: int, nbytes: int):
+        with self._lock:
+            self.requests += 1
+            self.rows += rows
+            self.bytes_in += nbytes
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, body: dict):
+        self._reply_bytes(status, json.dumps(body).encode(), wire.JSON)
+
+    def _reply_bytes(self, status: int, data: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header(wire.MODEL_VERSION_HEADER, MODEL_VERSION)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        delay = server.latency_ms + random.uniform(-server.jitter_ms, server.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if random.random() < server.error_rate:
+            server.count(0, len(raw))
+            return self._reply(503, {"error": "injected failure"})
+
+        content_type = self.headers.get("Content-Type")
+        if self.headers.get("Content-Encoding") == "gzip":
+            if not server.gzip:
+                server.count(0, len(raw))
+                return self._reply(415, {"error": "unsupported content encoding"})
+            body = gzip.decompress(raw)
+        else:
+            body = raw
+        if wire.format_of(content_type) != "json":
+            if not server.binary:
+                server.count(0, len(raw))
+                return self._reply(415, {"error": "unsupported media type"})
+            matrix = wire.decode_rows(body, content_type)
+            server.count(len(matrix), len(raw))
+            accept = self.headers.get("Accept", wire.JSON).split(",")[0]
+            data, response_type = wire.encode_probabilities([fake_probability(r) for r in matrix], wire.format_of(accept))
+            return self._reply_bytes(200, data, response_type)
+
+        features = json.loads(body)["features"]
+        if features and isinstance(features[0], list):
+            if not server.batch:
+                server.count(0, len(raw))
+                return self._reply(422, {"error": "batch payload not supported"})
+            server.count(len(features), len(raw))
+            return self._reply(200, {"winner_probabilities": [fake_probability(r) for r in features],
+                                     "model_version": MODEL_VERSION})
+        server.count(1, len(raw))
+        self._reply(200, {"winner_probability": fake_probability(features), "model_version": MODEL_VERSION})
+
+
+def start_server(port=0, **options) -> FakePredictServer:
+    """Start a FakePredictServer on a daemon thread and return it"""
+    server = FakePredictServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, name="fake-predict", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-batch", action="store_true", help="reject batch payloads with 422")
+    parser.add_argument("--json-only", action="store_true", help="reject binary payloads with 415")
+    parser.add_argument("--no-gzip", action="store_true", help="reject gzipped bodies with 415")
+    args = parser.parse_args()
+    server = FakePredictServer(("127.0.0.1", args.port), args.latency_ms, args.jitter_ms,
+                               args.error_rate, batch=not args.no_batch, binary=not args.json_only,
+                               gzip=not args.no_gzip)
+    print(f"Fake /predict listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""Concurrent-session load test of the real Streamlit server.
+
+Starts ``streamlit run streamlit_app.py`` as a subprocess against the fake
+backend and opens N websocket sessions that speak Streamlit's own protocol
+(BackMsg / ForwardMsg protobufs on ``/_stcore/stream``), the way a browser
+tab does. After the first full run, each session loops over realistic
+actions with random think times: drag the Grid Position or Driver ID
+slider, edit a lap/quali number input, press START PREDICTION. Widget
+actions inside a fragment rerun only that fragment, like in the browser.
+
+For every level of N it records rerun latency (BackMsg sent ->
+script_finished received) percentiles per action, websocket bytes, and the
+server's RSS, CPU and thread count sampled from /proc. The result is a
+scaling curve, printed as a table and written as JSON (and optionally a
+Plotly HTML chart):
+
+    python -m bench.load_test --sessions 1 5 10 25 50 --duration 30 \\
+        --output bench/results/load_$(git rev-parse --short HEAD).json --html bench/results/load.html
+
+Linux only (/proc) and fully offline. Needs the ``websockets`` package,
+which is a bench-only dependency and not in requirements.txt.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.fake_predict_server import start_server  # noqa: E402
+from bench.run_bench import git_revision  # noqa: E402
+
+try:
+    import websockets
+except ImportError:  # dependensi khusus bench
+    websockets = None
+
+APP_PATH = ROOT / "streamlit_app.py"
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# (aksi, bobot): proporsi kasar dari sesi nyata, lebih banyak geser slider daripada klik predict
+ACTIONS = [("grid_slider", 3), ("driver_slider", 2), ("number_input", 2), ("predict", 2)]
+NUMBER_INPUTS = ("Best Lap Time (s)", "Best Quali Time (s)")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def write_secrets(directory: Path, backend_url: str, predictor: str) -> Path:
+    """Secrets for the server under test: fake backend, no disk store, no surface (keeps runs independent)"""
+    path = directory / "secrets.toml"
+    path.write_text(
+        f'[api]\nFASTAPI_URL = "{backend_url}"\nPREDICTOR = "{predictor}"\n\n'
+        '[cache]\nSTORE_FILE = ""\n\n[surface]\nENABLED = false\n',
+        encoding="utf-8",
+    )
+    return path
+
+
+def start_streamlit(port: int, secrets: Path, log) -> subprocess.Popen:
+    cmd = [
+        sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+        "--server.headless", "true", "--server.port", str(port), "--server.address", "127.0.0.1",
+        "--server.fileWatcherType", "none", "--server.enableStaticServing", "false",
+        "--browser.gatherUsageStats", "false", "--secrets.files", str(secrets),
+    ]
+    # cwd = root repo: app membuka data/ dan models/ dengan path relatif
+    return subprocess.Popen(cmd, cwd=ROOT, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_healthy(port: int, proc: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Streamlit exited with code {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as resp:
+                if resp.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Streamlit did not become healthy in time")
+
+
+# ---------- /proc sampler ----------
+
+def read_proc(pid: int) -> dict:
+    """CPU seconds, RSS bytes and thread count of one process"""
+    with open(f"/proc/{pid}/stat") as f:
+        # Field setelah nama proses (yang bisa berisi spasi/kurung)
+        fields = f.read().rsplit(")", 1)[1].split()
+    return {
+        "cpu": (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+        "rss": int(fields[21]) * PAGE_SIZE,
+        "threads": int(fields[17]),
+    }
+
+
+async def sample_process(pid: int, samples: list, interval: float, stop: asyncio.Event):
+    last, last_t = read_proc(pid), time.monotonic()
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+        now, now_t = read_proc(pid), time.monotonic()
+        samples.append({
+            "cpu_percent": 100 * (now["cpu"] - last["cpu"]) / max(now_t - last_t, 1e-9),
+            "rss": now["rss"],
+            "threads": now["threads"],
+        })
+        last, last_t = now, now_t
+
+
+# ---------- Satu sesi browser ----------
+
+class Session:
+    """One websocket session: widget registry from the deltas plus the client-side widget state"""
+
+    def __init__(self, url: str, rng: random.Random):
+        self.url = url
+        self.rng = rng
+        self.widgets = {}
+        self.states = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.ws = None
+
+    async def rerun(self, fragment_id: str = "", trigger: str = None) -> float:
+        """Send one rerun with the current widget states; return seconds until script_finished"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.fragment_id = fragment_id
+        for widget_id, (field, value) in self.states.items():
+            state = client_state.widget_states.widgets.add()
+            state.id = widget_id
+            if field == "double_array_value":
+                state.double_array_value.data.extend(value)
+            else:
+                setattr(state, field, value)
+        if trigger:
+            state = client_state.widget_states.widgets.add()
+            state.id = trigger
+            state.trigger_value = True
+        payload = msg.SerializeToString()
+        start = time.perf_counter()
+        await self.ws.send(payload)
+        self.bytes_out += len(payload)
+        while True:
+            raw = await self.ws.recv()
+            self.bytes_in += len(raw)
+            forward = ForwardMsg()
+            forward.ParseFromString(raw)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self._register(forward.delta)
+            elif kind == "script_finished":
+                if forward.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("script failed to compile")
+                if forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return time.perf_counter() - start
+
+    def _register(self, delta):
+        element = delta.new_element
+        widget = getattr(element, element.WhichOneof("type"))
+        # Chart juga punya id; yang dicari hanya widget berlabel
+        widget_id, label = getattr(widget, "id", ""), getattr(widget, "label", "")
+        if widget_id and label:
+            self.widgets[label] = (widget_id, delta.fragment_id, widget)
+
+    def _find(self, prefix: str):
+        return next(v for label, v in self.widgets.items() if label.startswith(prefix))
+
+    async def act(self, action: str) -> float:
+        if action == "predict":
+            widget_id, fragment_id, _ = self._find("🏁 START PREDICTION")
+            return await self.rerun(fragment_id, trigger=widget_id)
+        if action in ("grid_slider", "driver_slider"):
+            widget_id, fragment_id, slider = self._find("Grid Position" if action == "grid_slider" else "Driver ID")
+            value = float(self.rng.randint(int(slider.min), int(slider.max)))
+            self.states[widget_id] = ("double_array_value", [value])
+        else:
+            widget_id, fragment_id, number = self._find(self.rng.choice(NUMBER_INPUTS))
+            # Nilai acak supaya sebagian prediksi tidak terjawab cache
+            value = round(number.default + self.rng.uniform(-0.5, 0.5), 3)
+            self.states[widget_id] = ("double_value", value)
+        return await self.rerun(fragment_id)
+
+
+async def run_session(url: str, deadline: float, think_ms: float, seed: int, latencies: dict, errors: list):
+    rng = random.Random(seed)
+    session = Session(url, rng)
+    actions, weights = zip(*ACTIONS)
+    try:
+        async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+            session.ws = ws
+            latencies["first_load"].append(await session.rerun())
+            while time.monotonic() < deadline:
+                # Think time eksponensial (rata-rata think_ms), seperti jeda antar interaksi pengguna
+                await asyncio.sleep(rng.expovariate(1000 / think_ms) if think_ms > 0 else 0)
+                if time.monotonic() >= deadline:
+                    break
+                action = rng.choices(actions, weights)[0]
+                latencies[action].append(await session.act(action))
+    except Exception as e:
+        errors.append(f"{type(e).__name__}: {e}")
+    return session.bytes_in, session.bytes_out
+
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {"n": 0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    return {"n": len(ordered), "mean": statistics.fmean(ordered), "p50": pick(0.5), "p95": pick(0.95),
+            "p99": pick(0.99), "max": ordered[-1]}
+
+
+async def run_level(url: str, pid: int, n_sessions: int, duration: float, think_ms: float,
+                    ramp: float, seed: int) -> dict:
+    latencies, errors, samples = defaultdict(list), [], []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_process(pid, samples, 0.5, stop))
+    deadline = time.monotonic() + duration
+
+    async def delayed(i):
+        # Sesi masuk bertahap selama `ramp` detik, bukan serentak dalam satu milidetik
+        await asyncio.sleep(ramp * i / max(n_sessions, 1))
+        return await run_session(url, deadline, think_ms, seed * 100_003 + i, latencies, errors)
+
+    start = time.monotonic()
+    traffic = await asyncio.gather(*(delayed(i) for i in range(n_sessions)))
+    elapsed = time.monotonic() - start
+    stop.set()
+    await sampler
+
+    interactions = [v for action, values in latencies.items() if action != "first_load" for v in values]
+    return {
+        "sessions": n_sessions,
+        "elapsed": elapsed,
+        "reruns": len(interactions),
+        "reruns_per_second": len(interactions) / elapsed if elapsed else 0.0,
+        "latency": _percentiles(interactions),
+        "actions": {action: _percentiles(values) for action, values in sorted(latencies.items())},
+        "errors": errors,
+        "ws_bytes_in": sum(b for b, _ in traffic),
+        "ws_bytes_out": sum(b for _, b in traffic),
+        "server": {
+            "cpu_percent_mean": statistics.fmean(s["cpu_percent"] for s in samples) if samples else 0.0,
+            "cpu_percent_max": max((s["cpu_percent"] for s in samples), default=0.0),
+            "rss_mb_max": max((s["rss"] for s in samples), default=0) / 2**20,
+            "threads_max": max((s["threads"] for s in samples), default=0),
+        },
+    }
+
+
+def print_report(levels):
+    print(f"\n{'sessions':>8}{'reruns/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+          f"{'cpu %':>8}{'rss MB':>9}{'threads':>9}{'KB/rerun':>10}")
+    for level in levels:
+        lat, server = level["latency"], level["server"]
+        if not lat["n"]:
+            print(f"{level['sessions']:>8}  (no completed reruns, {len(level['errors'])} errors)")
+            continue
+        kb = level["ws_bytes_in"] / 1024 / max(level["reruns"] + level["sessions"], 1)
+        print(f"{level['sessions']:>8}{level['reruns_per_second']:>10.1f}{lat['p50'] * 1000:>9.0f}"
+              f"{lat['p95'] * 1000:>9.0f}{lat['p99'] * 1000:>9.0f}{len(level['errors']):>8}"
+              f"{server['cpu_percent_mean']:>8.0f}{server['rss_mb_max']:>9.0f}{server['threads_max']:>9}{kb:>10.1f}")
+
+
+def write_html(levels, path: Path):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    levels = [lv for lv in levels if lv["latency"]["n"]]
+    x = [lv["sessions"] for lv in levels]
+    fig = make_subplots(rows=1, cols=2, subplot_titles=("Rerun latency (ms)", "Server resources"),
+                        specs=[[{}, {"secondary_y": True}]])
+    for q in ("p50", "p95", "p99"):
+        fig.add_trace(go.Scatter(x=x, y=[lv["latency"][q] * 1000 for lv in levels], name=q, mode="lines+markers"),
+                      row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=[lv["server"]["cpu_percent_mean"] for lv in levels], name="CPU %",
+                             mode="lines+markers"), row=1, col=2)
+    fig.add_trace(go.Scatter(x=x, y=[lv["server"]["rss_mb_max"] for lv in levels], name="RSS MB",
+                             mode="lines+markers"), row=1, col=2, secondary_y=True)
+    fig.update_xaxes(title_text="concurrent sessions")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fig.write_html(str(path), include_plotlyjs="cdn")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per level")
+    parser.add_argument("--think-ms", type=float, default=1000.0, help="mean think time between actions")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which sessions connect")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake backend latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--predictor", default="remote", help="PREDICTOR mode of the app under test")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--html", type=Path, help="write a Plotly scaling-curve chart here")
+    parser.add_argument("--target-p95", type=float, help="exit non-zero if any level's p95 (s) exceeds this")
+    args = parser.parse_args()
+    if websockets is None:
+        parser.error("bench.load_test needs the 'websockets' package (pip install websockets)")
+
+    backend = start_server(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="f1-load-") as tmp:
+        secrets = write_secrets(Path(tmp), backend.url, args.predictor)
+        with open(Path(tmp) / "streamlit.log", "wb") as log:
+            proc = start_streamlit(port, secrets, log)
+            try:
+                wait_healthy(port, proc)
+                url = f"ws://127.0.0.1:{port}/_stcore/stream"
+                levels = []
+                for n in args.sessions:
+                    level = asyncio.run(run_level(url, proc.pid, n, args.duration, args.think_ms, args.ramp, args.seed))
+                    levels.append(level)
+                    lat = level["latency"]
+                    print(f"  {n} sessions: {level['reruns']} reruns"
+                          + (f", p95 {lat['p95'] * 1000:.0f} ms" if lat["n"] else "")
+                          + (f", {len(level['errors'])} errors" if level["errors"] else ""), flush=True)
+            finally:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+    backend.shutdown()
+
+    print_report(levels)
+    result = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": vars(args) | {"output": str(args.output), "html": str(args.html)},
+        "backend": {"requests": backend.requests, "rows": backend.rows, "bytes_in": backend.bytes_in},
+        "levels": levels,
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2))
+        print(f"\nSaved {args.output}")
+    if args.html:
+        write_html(levels, args.html)
+        print(f"Saved {args.html}")
+    if args.target_p95 is not None:
+        slow = [lv["sessions"] for lv in levels if lv["latency"]["n"] and lv["latency"]["p95"] > args.target_p95]
+        failed = [lv["sessions"] for lv in levels if lv["errors"] or not lv["latency"]["n"]]
+        if slow or failed:
+            print(f"\np95 above {args.target_p95}s at {slow or '-'}; errors at {failed or '-'}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Headless benchmark of streamlit_app.py against a local fake backend.
+
+Drives the script with Streamlit's AppTest. For each scenario it reports
+the wall time per rerun and the time spent in feature engineering,
+format_input_data, the HTTP call and each chart builder. It also reports
+the ForwardMsg bytes the rerun would send to the browser. Results are
+written as JSON so runs can be compared across commits:
+
+    python -m bench.run_bench --iterations 20 --output bench/results/$(git rev-parse --short HEAD).json
+    python -m bench.run_bench --compare bench/results/abc1234.json
+
+Runs fully offline; the backend is bench.fake_predict_server on localhost.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from functools import wraps
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.fake_predict_server import start_server  # noqa: E402
+
+APP_PATH = ROOT / "streamlit_app.py"
+
+# (module, attribute, stage name); dicari ulang tiap rerun karena app mengimpor per rerun
+TIMED_FUNCTIONS = [
+    ("features", "engineer_features", "feature_engineering"),
+    ("features", "format_input_data", "format_input_data"),
+    ("charts", "create_speedometer", "chart.speedometer"),
+    ("charts", "create_sector_comparison", "chart.sector_comparison"),
+    ("charts", "create_performance_radar", "chart.performance_radar"),
+    ("charts", "create_comparison_metrics", "chart.comparison_metrics"),
+    ("charts", "create_dashboard", "chart.dashboard"),
+    ("charts", "create_sweep_heatmap", "chart.sweep_heatmap"),
+]
+
+
+class Recorder:
+    """Collect per-rerun stage timings from wrapped functions"""
+
+    def __init__(self):
+        self.current = defaultdict(float)
+        self.reruns = []
+
+    def timed(self, fn, stage):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.current[stage] += time.perf_counter() - start
+        return wrapper
+
+    def install(self):
+        import importlib
+
+        import predict_client
+
+        for module_name, attr, stage in TIMED_FUNCTIONS:
+            module = importlib.import_module(module_name)
+            setattr(module, attr, self.timed(getattr(module, attr), stage))
+        predict_client.PredictClient._send = self.timed(predict_client.PredictClient._send, "http")
+        self._install_byte_counter()
+
+    def _install_byte_counter(self):
+        from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+        original_run = LocalScriptRunner.run
+        recorder = self
+
+        def run(runner, *args, **kwargs):
+            try:
+                return original_run(runner, *args, **kwargs)
+            finally:
+                recorder.current["bytes_to_browser"] += sum(m.ByteSize() for m in runner.forward_msgs())
+
+        LocalScriptRunner.run = run
+
+    def rerun(self, scenario, action):
+        self.current = defaultdict(float)
+        start = time.perf_counter()
+        action()
+        self.current["wall"] = time.perf_counter() - start
+        self.reruns.append((scenario, dict(self.current)))
+
+
+def _summary(values):
+    ordered = sorted(values)
+    return {
+        "n": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+def summarize(reruns):
+    by_scenario = defaultdict(lambda: defaultdict(list))
+    for scenario, stages in reruns:
+        for stage in set(stages) | {"http"}:
+            by_scenario[scenario][stage].append(stages.get(stage, 0.0))
+    return {scenario: {stage: _summary(v) for stage, v in sorted(stages.items())}
+            for scenario, stages in by_scenario.items()}
+
+
+def _widget(elements, label):
+    return next(w for w in elements if w.label == label)
+
+
+def _button(at, prefix):
+    return next(b for b in at.button if b.label.startswith(prefix))
+
+
+def run_scenarios(recorder, server, iterations, combined_charts=False, wire_format="json"):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=120)
+    at.secrets["api"] = {"FASTAPI_URL": server.url, "PREDICTOR": "remote", "WIRE_FORMAT": wire_format}
+    at.secrets["ui"] = {"COMBINED_CHARTS": combined_charts}
+    # Tanpa store disk: hasil run sebelumnya tidak boleh menjawab dari SQLite
+    at.secrets["cache"] = {"STORE_FILE": ""}
+    # Thread surface di background ikut memanggil _send; jangan sampai terhitung ke rerun
+    at.secrets["surface"] = {"ENABLED": False}
+
+    recorder.rerun("first_load", at.run)
+    base_lap = _widget(at.number_input, "Best Lap Time (s)").value
+    for i in range(iterations):
+        # Nilai unik per iterasi supaya cache tidak menjawab -> benar-benar POST
+        lap = round(base_lap + 0.001 * (i + 1), 3)
+        recorder.rerun("widget_change", lambda: _widget(at.slider, "Grid Position").set_value(1 + i % 20).run())
+        recorder.rerun("predict_cold", lambda: (_widget(at.number_input, "Best Lap Time (s)").set_value(lap).run(),
+                                                _button(at, "🏁 START PREDICTION").click().run()))
+        recorder.rerun("predict_cached", lambda: _button(at, "🏁 START PREDICTION").click().run())
+        recorder.rerun("full_grid", lambda: _button(at, "🏎️ PREDICT FULL GRID").click().run())
+        if at.exception:
+            raise RuntimeError(f"App raised: {at.exception}")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())["scenarios"]
+    print(f"\n{'scenario':<16}{'stage':<28}{'baseline p50':>14}{'current p50':>14}{'change':>10}")
+    for scenario, stages in current.items():
+        for stage, stats in stages.items():
+            old = baseline.get(scenario, {}).get(stage)
+            if not old or not old["p50"]:
+                continue
+            change = (stats["p50"] - old["p50"]) / old["p50"] * 100
+            print(f"{scenario:<16}{stage:<28}{old['p50']:>14.4f}{stats['p50']:>14.4f}{change:>9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-batch", action="store_true", help="fake backend rejects batch payloads")
+    parser.add_argument("--combined-charts", action="store_true")
+    parser.add_argument("--wire-format", default="json", help="batch payload format: json, f64, f32 or arrow")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--compare", type=Path, help="baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    server = start_server(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                          error_rate=args.error_rate, batch=not args.no_batch)
+    recorder = Recorder()
+    recorder.install()
+    run_scenarios(recorder, server, args.iterations, args.combined_charts, args.wire_format)
+    server.shutdown()
+
+    scenarios = summarize(recorder.reruns)
+    result = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": vars(args) | {"output": str(args.output), "compare": str(args.compare)},
+        "backend": {"requests": server.requests, "rows": server.rows, "bytes_in": server.bytes_in},
+        "scenarios": scenarios,
+    }
+
+    for scenario, stages in scenarios.items():
+        print(f"\n[{scenario}]")
+        for stage, stats in stages.items():
+            unit = "B" if stage == "bytes_to_browser" else "s"
+            print(f"  {stage:<28} p50={stats['p50']:.4f}{unit}  p95={stats['p95']:.4f}{unit}  n={stats['n']}")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2))
+        print(f"\nSaved {args.output}")
+    if args.compare:
+        compare(scenarios, args.compare)
+
+
+if __name__ == "__main__":
+    main()
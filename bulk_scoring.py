@@ -0,0 +1,150 @@
+"""Chunked CSV/Parquet scoring for the bulk upload panel.
+
+Rows are read, feature-engineered, scored and written one chunk at a time,
+so memory stays bounded by the chunk size rather than the file size.
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from features import FASTEST_QUALI_TIME, RAW_COLUMNS, REQUIRED_RAW_COLUMNS as REQUIRED_COLUMNS, engineer_features
+
+DEFAULT_YEAR = 2025.0
+OUTPUT_COLUMN = 'winner_probability'
+OUTPUT_PREFIX = 'bulk-'
+
+
+def _is_parquet(filename: str) -> bool:
+    return Path(filename).suffix.lower() in (".parquet", ".pq")
+
+
+def iter_input_chunks(source, filename: str, chunksize: int = 5000) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks from a CSV or Parquet file-like object"""
+    if _is_parquet(filename):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize)
+
+
+def fill_raw_columns(chunk: pd.DataFrame, avg_positions: np.ndarray, avg_points: np.ndarray,
+                     year: float = DEFAULT_YEAR) -> pd.DataFrame:
+    """Validate a chunk and fill optional raw columns (Year, driver history)"""
+    missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    raw = chunk.copy()
+    if 'Year' not in raw.columns:
+        raw['Year'] = float(year)
+    driver_ids = raw['DriverEncoded'].to_numpy(dtype=np.int64)
+    if len(driver_ids) and (driver_ids.min() < 0 or driver_ids.max() >= len(avg_positions)):
+        raise ValueError(f"DriverEncoded must be between 0 and {len(avg_positions) - 1}")
+    if 'AvgPrevPositions' not in raw.columns:
+        raw['AvgPrevPositions'] = avg_positions[driver_ids]
+    if 'AvgPrevPoints' not in raw.columns:
+        raw['AvgPrevPoints'] = avg_points[driver_ids]
+    return raw
+
+
+def prune_outputs(directory, max_age: float) -> int:
+    """Delete bulk outputs in `directory` older than `max_age` seconds, return how many"""
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in Path(directory).glob(f"{OUTPUT_PREFIX}*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            # Dihapus session/proses lain bersamaan
+            continue
+    return removed
+
+
+def new_output_path(directory, fmt: str, max_age: float = 3600.0) -> Path:
+    """Fresh output file in `directory`, after pruning outputs older than `max_age` seconds.
+
+    Outputs of sessions that ended without a new upload are never deleted by
+    their session, so every new upload sweeps the directory instead.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    prune_outputs(directory, max_age)
+    fd, name = tempfile.mkstemp(prefix=OUTPUT_PREFIX, suffix=f".{fmt}", dir=directory)
+    os.close(fd)
+    return Path(name)
+
+
+class ChunkWriter:
+    """Append scored chunks to a CSV or Parquet file on disk"""
+
+    def __init__(self, path, fmt: str):
+        self.path = Path(path)
+        self.fmt = fmt
+        self._writer = None
+        self._header_written = False
+
+    def write(self, chunk: pd.DataFrame):
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            chunk.to_csv(self.path, mode="a" if self._header_written else "w",
+                         header=not self._header_written, index=False)
+            self._header_written = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_file(
+    source,
+    filename: str,
+    output_path,
+    output_format: str,
+    predictor,
+    avg_positions: np.ndarray,
+    avg_points: np.ndarray,
+    chunksize: int = 5000,
+    batch_size: int = 500,
+    max_workers: int = 4,
+    progress: Optional[Callable[[int], None]] = None,
+    year: float = DEFAULT_YEAR,
+    fastest_quali_time: float = FASTEST_QUALI_TIME,
+) -> int:
+    """Score every row of `source` into `output_path`, return the number of rows"""
+    writer = ChunkWriter(output_path, output_format)
+    total = 0
+    try:
+        for chunk in iter_input_chunks(source, filename, chunksize):
+            raw = fill_raw_columns(chunk, avg_positions, avg_points, year)
+            probs = np.empty(len(raw))
+            if len(raw):
+                matrix = engineer_features(raw[RAW_COLUMNS], fastest_quali_time)
+                # cache=False: baris sekali pakai tidak boleh menggeser prediksi lain dari cache bersama
+                for idx, chunk_probs in predictor.iter_predict_rows(matrix.tolist(), chunk_size=batch_size,
+                                                                    max_workers=max_workers, cache=False):
+                    probs[idx] = chunk_probs
+            # Chunk kosong (CSV tanpa baris) tetap ditulis supaya output punya header
+            chunk[OUTPUT_COLUMN] = probs
+            writer.write(chunk)
+            total += len(chunk)
+            if progress is not None:
+                progress(total)
+    finally:
+        writer.close()
+    return total
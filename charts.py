@@ -0,0 +1,427 @@
+"""Plotly chart builders for the result panels.
+
+Layout that every chart shares (BASE_LAYOUT) is applied to each chart's
+own layout, and each chart's static structure is built and validated once
+as a skeleton dict. Per call only the data arrays are patched in, and
+results are memoized on their (rounded) inputs; every caller gets its own
+copy of the memoized figure, since sessions must not share a mutable one.
+"""
+import copy
+from functools import lru_cache, wraps
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from metrics import timed
+
+RED = '#ff0000'
+TITLE_FONT = {'size': 24, 'color': 'white', 'family': 'Arial Black'}
+
+# Template kosong: menggantikan template default plotly (~3.4KB) yang ikut terserialisasi di
+# setiap figure. Gaya tidak ditaruh di template karena theme="streamlit" menimpa template.layout
+F1_TEMPLATE = go.layout.Template()
+
+# Gaya bersama, dipasang di layout tiap skeleton (dibangun sekali, tanpa biaya per panggilan)
+BASE_LAYOUT = dict(
+    template=F1_TEMPLATE,
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(43,43,43,0.6)',
+    font={'color': "white", 'family': "Arial"},
+    title={'font': TITLE_FONT, 'x': 0.5, 'xanchor': 'center'},
+    showlegend=False,
+)
+
+RADAR_CATEGORIES = ['Qualifying', 'Race Pace', 'Consistency', 'Experience', 'Grid Position']
+COMPARISON_METRICS = ['Quali Advantage', 'Race Efficiency', 'Position Improvement']
+
+
+def _r(value, decimals=4):
+    return round(float(value), decimals)
+
+
+def _memoized(maxsize: int):
+    """lru_cache for a figure builder that returns a fresh copy of the cached figure per call"""
+    def decorate(build):
+        cached = lru_cache(maxsize=maxsize)(lambda *args: build(*args).to_dict())
+
+        @wraps(build)
+        def wrapper(*args):
+            return go.Figure(copy.deepcopy(cached(*args)), _validate=False)
+        wrapper.cache_info, wrapper.cache_clear = cached.cache_info, cached.cache_clear
+        return wrapper
+    return decorate
+
+
+def _patched(skeleton: dict, *trace_patches: dict) -> go.Figure:
+    """New figure from a prevalidated skeleton with per-trace data patched in"""
+    spec = copy.deepcopy(skeleton)
+    for trace, patch in zip(spec['data'], trace_patches):
+        trace.update(patch)
+    return go.Figure(spec, _validate=False)
+
+
+# ---------- Skeletons (dibangun & divalidasi sekali per proses) ----------
+
+@lru_cache(maxsize=None)
+def _speedometer_skeleton() -> dict:
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=0,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "Win Probability", 'font': {'size': 28, 'color': 'white', 'family': 'Arial Black'}},
+        delta={'reference': 50, 'increasing': {'color': "#00ff00"}, 'font': {'size': 20}},
+        number={'font': {'size': 50, 'color': RED, 'family': 'Arial Black'}, 'suffix': '%'},
+        gauge={
+            'axis': {'range': [None, 100], 'tickwidth': 2, 'tickcolor': "white", 'tickfont': {'size': 14}},
+            'bar': {'color': RED, 'thickness': 0.8},
+            'bgcolor': "rgba(255,255,255,0.2)",
+            'borderwidth': 3,
+            'bordercolor': RED,
+            'steps': [
+                {'range': [0, 15], 'color': 'rgba(150, 150, 150, 0.3)'},
+                {'range': [15, 35], 'color': 'rgba(255, 255, 0, 0.3)'},
+                {'range': [35, 100], 'color': 'rgba(0, 255, 0, 0.3)'}
+            ],
+            'threshold': {
+                'line': {'color': "white", 'width': 4},
+                'thickness': 0.75,
+                'value': 90
+            }
+        }
+    ))
+    fig.update_layout(BASE_LAYOUT)
+    fig.update_layout(height=350, margin=dict(l=20, r=20, t=80, b=20))
+    return fig.to_dict()
+
+
+@lru_cache(maxsize=None)
+def _sector_skeleton() -> dict:
+    fig = go.Figure(go.Bar(
+        x=['Sector 1', 'Sector 2', 'Sector 3'],
+        marker=dict(
+            color=[RED, '#ffffff', RED],
+            line=dict(color=RED, width=3),
+            pattern_shape=["", "/", ""]
+        ),
+        textposition='outside',
+        textfont=dict(size=16, color='white', family='Arial Black')
+    ))
+    fig.update_layout(BASE_LAYOUT)
+    fig.update_layout(
+        title={'text': "Sector Time Analysis"},
+        font={'size': 14},
+        yaxis_title="Time (seconds)",
+        yaxis_title_font={'size': 16, 'color': 'white'},
+        xaxis_tickfont={'size': 14, 'color': 'white'},
+        height=350,
+        margin=dict(l=50, r=30, t=80, b=50)
+    )
+    return fig.to_dict()
+
+
+@lru_cache(maxsize=None)
+def _radar_skeleton() -> dict:
+    fig = go.Figure(go.Scatterpolar(
+        theta=RADAR_CATEGORIES,
+        fill='toself',
+        fillcolor='rgba(255, 0, 0, 0.4)',
+        line=dict(color=RED, width=3),
+        marker=dict(size=8, color=RED)
+    ))
+    fig.update_layout(BASE_LAYOUT)
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100],
+                gridcolor='rgba(255, 255, 255, 0.3)',
+                tickfont={'size': 12, 'color': 'white'}
+            ),
+            angularaxis=dict(
+                gridcolor='rgba(255, 255, 255, 0.3)',
+                tickfont={'size': 14, 'color': 'white', 'family': 'Arial Black'}
+            ),
+            bgcolor='rgba(43,43,43,0.6)'
+        ),
+        title={'text': "Driver Performance Profile"},
+        height=450,
+        margin=dict(l=80, r=80, t=100, b=50)
+    )
+    return fig.to_dict()
+
+
+@lru_cache(maxsize=None)
+def _position_skeleton() -> dict:
+    fig = go.Figure(go.Bar(
+        marker=dict(color=RED, line=dict(color='white', width=1)),
+        hovertemplate='%{x}: %{y:.1f}%<extra></extra>',
+    ))
+    fig.update_layout(BASE_LAYOUT)
+    fig.update_layout(
+        title={'text': "Estimated Position Distribution"},
+        xaxis_title="Estimated finishing position",
+        yaxis_title="Share of samples (%)",
+        height=350,
+        margin=dict(l=60, r=30, t=80, b=50)
+    )
+    return fig.to_dict()
+
+
+@lru_cache(maxsize=None)
+def _comparison_skeleton() -> dict:
+    fig = go.Figure(go.Bar(
+        y=COMPARISON_METRICS,
+        orientation='h',
+        marker=dict(line=dict(color='white', width=2)),
+        textposition='outside',
+        textfont=dict(size=16, color='white', family='Arial Black')
+    ))
+    fig.update_layout(BASE_LAYOUT)
+    fig.update_layout(
+        title={'text': "Key Performance Metrics"},
+        xaxis_title="Score",
+        height=350,
+        margin=dict(l=150, r=50, t=80, b=50)
+    )
+    return fig.to_dict()
+
+
+@lru_cache(maxsize=None)
+def _live_skeleton() -> dict:
+    fig = go.Figure(go.Bar(
+        orientation='h',
+        marker=dict(color=RED, line=dict(color='white', width=1)),
+        textposition='outside',
+        texttemplate='%{x:.1f}%',
+        textfont=dict(color='white'),
+        hovertemplate='%{y}: %{x:.2f}%<extra></extra>',
+    ))
+    fig.update_layout(BASE_LAYOUT)
+    fig.update_layout(
+        title={'text': "Live Win Probability"},
+        xaxis_title="Win probability (%)",
+        yaxis_autorange='reversed',
+        margin=dict(l=220, r=60, t=80, b=50)
+    )
+    return fig.to_dict()
+
+
+# ---------- Data per chart ----------
+
+def radar_scores(inputs: dict) -> list:
+    """Normalize driver inputs to the 0-100 radar scale"""
+    quali_score = max(0, min(100, 100 - (inputs['BestQuali (s)'] - 75) * 10))
+    pace_score = max(0, min(100, 100 - (inputs['RacePace (s)'] - 75) * 10))
+    consistency_score = max(0, min(100, 100 - inputs['SectorTimeConsistency'] * 50))
+    experience_score = min(100, (inputs['AvgPrevPoints'] / 25) * 100)
+    grid_score = (21 - inputs['GridPosition']) * 5
+    return [quali_score, pace_score, consistency_score, experience_score, grid_score]
+
+
+def comparison_values(inputs: dict) -> list:
+    return [
+        inputs['QualiAdvantage'] * 10,  # Scaled for visibility
+        inputs['RacePaceEfficiency'] * 100,
+        abs(inputs['PositionImprovement']) * 5
+    ]
+
+
+def _speedometer_patch(probability, interval=None):
+    if interval is None:
+        return {'value': probability * 100}
+    # Interval kepercayaan Monte Carlo: pita putih di gauge + keterangan di judul
+    low, high = interval
+    trace = _speedometer_skeleton()['data'][0]
+    gauge = copy.deepcopy(trace['gauge'])
+    gauge['steps'].append({'range': [low * 100, high * 100], 'color': 'rgba(255, 255, 255, 0.55)'})
+    title = dict(trace['title'], text=f"Win Probability<br><span style='font-size:15px'>"
+                                      f"CI {low * 100:.1f}% – {high * 100:.1f}%</span>")
+    return {'value': probability * 100, 'gauge': gauge, 'title': title}
+
+
+def _sector_patch(s1, s2, s3):
+    return {'y': [s1, s2, s3], 'text': [f'{s1:.3f}s', f'{s2:.3f}s', f'{s3:.3f}s']}
+
+
+def _radar_patch(values):
+    return {'r': list(values)}
+
+
+def _comparison_patch(values):
+    return {
+        'x': list(values),
+        'marker': {'color': [RED if v > 0 else '#666666' for v in values], 'line': {'color': 'white', 'width': 2}},
+        'text': [f'{v:.1f}' for v in values],
+    }
+
+
+# ---------- Public builders (memoized on rounded inputs) ----------
+
+@_memoized(256)
+def _speedometer(probability, interval):
+    return _patched(_speedometer_skeleton(), _speedometer_patch(probability, interval))
+
+
+@timed("chart.speedometer")
+def create_speedometer(probability, interval=None):
+    """Create a speedometer gauge chart, optionally with a (low, high) confidence band"""
+    return _speedometer(_r(probability, 6), None if interval is None else (_r(interval[0]), _r(interval[1])))
+
+
+@_memoized(256)
+def _sectors(s1, s2, s3):
+    return _patched(_sector_skeleton(), _sector_patch(s1, s2, s3))
+
+
+@timed("chart.sector_comparison")
+def create_sector_comparison(s1, s2, s3):
+    """Create sector time comparison bar chart"""
+    return _sectors(_r(s1), _r(s2), _r(s3))
+
+
+@_memoized(256)
+def _radar(values):
+    return _patched(_radar_skeleton(), _radar_patch(values))
+
+
+@timed("chart.performance_radar")
+def create_performance_radar(inputs):
+    """Create radar chart for driver performance"""
+    return _radar(tuple(_r(v) for v in radar_scores(inputs)))
+
+
+@_memoized(256)
+def _comparison(values):
+    return _patched(_comparison_skeleton(), _comparison_patch(values))
+
+
+@timed("chart.comparison_metrics")
+def create_comparison_metrics(inputs):
+    """Create comparison bar chart for key metrics"""
+    return _comparison(tuple(_r(v) for v in comparison_values(inputs)))
+
+
+@_memoized(256)
+def _positions(shares):
+    return _patched(_position_skeleton(), {
+        'x': [f'P{i}' for i in range(1, len(shares) + 1)],
+        'y': [v * 100 for v in shares],
+    })
+
+
+@timed("chart.position_distribution")
+def create_position_distribution(shares):
+    """Create bar chart of the share of samples per estimated finishing position"""
+    return _positions(tuple(_r(v) for v in shares))
+
+
+@_memoized(64)
+def _live(labels, probabilities):
+    fig = _patched(_live_skeleton(), {'x': [p * 100 for p in probabilities], 'y': list(labels)})
+    fig.update_layout(height=max(300, 90 + 28 * len(labels)))
+    return fig
+
+
+@timed("chart.live_probabilities")
+def create_live_probabilities(driver_labels, probabilities):
+    """Create horizontal bar chart of live win probabilities, highest first"""
+    probs = np.asarray(probabilities, dtype=np.float64)
+    order = np.argsort(-probs, kind='stable')
+    return _live(tuple(str(driver_labels[i]) for i in order), tuple(_r(probs[i]) for i in order))
+
+
+@_memoized(64)
+def _dashboard(probability, sectors, radar_values, comparison, interval=None):
+    fig = make_subplots(
+        rows=2, cols=2,
+        specs=[[{'type': 'indicator'}, {'type': 'xy'}], [{'type': 'polar'}, {'type': 'xy'}]],
+        subplot_titles=("", "Sector Time Analysis", "Driver Performance Profile", "Key Performance Metrics"),
+        vertical_spacing=0.14,
+        horizontal_spacing=0.16,
+    )
+    parts = [
+        (_speedometer_skeleton(), _speedometer_patch(probability, interval), 1, 1),
+        (_sector_skeleton(), _sector_patch(*sectors), 1, 2),
+        (_radar_skeleton(), _radar_patch(radar_values), 2, 1),
+        (_comparison_skeleton(), _comparison_patch(comparison), 2, 2),
+    ]
+    for skeleton, patch, row, col in parts:
+        trace = dict(copy.deepcopy(skeleton['data'][0]), **patch)
+        if trace['type'] == 'indicator':
+            trace.pop('domain', None)
+        fig.add_trace(trace, row=row, col=col)
+    fig.update_layout(BASE_LAYOUT)
+    fig.update_layout(
+        polar=_radar_skeleton()['layout']['polar'],
+        height=850,
+        margin=dict(l=60, r=60, t=60, b=40),
+    )
+    fig.update_annotations(font={'size': 18, 'color': 'white', 'family': 'Arial Black'})
+    return fig
+
+
+@timed("chart.dashboard")
+def create_dashboard(probability, s1, s2, s3, inputs, interval=None):
+    """Create one combined figure with all four result charts"""
+    return _dashboard(
+        _r(probability, 6),
+        (_r(s1), _r(s2), _r(s3)),
+        tuple(_r(v) for v in radar_scores(inputs)),
+        tuple(_r(v) for v in comparison_values(inputs)),
+        None if interval is None else (_r(interval[0]), _r(interval[1])),
+    )
+
+
+@timed("chart.finish_heatmap")
+def create_finish_heatmap(driver_labels, position_matrix):
+    """Create heatmap of simulated finishing-position probabilities per driver"""
+    probs = np.asarray(position_matrix) * 100
+    order = np.argsort(-(probs @ np.arange(probs.shape[1], 0, -1)), kind='stable')
+    fig = go.Figure(data=go.Heatmap(
+        z=probs[order],
+        x=[f'P{i}' for i in range(1, probs.shape[1] + 1)],
+        y=[str(driver_labels[i]) for i in order],
+        colorscale=[[0, '#1a1a1a'], [0.5, '#cc0000'], [1, '#ffffff']],
+        zmin=0,
+        colorbar=dict(title=dict(text='%', font={'color': 'white'}), tickfont={'color': 'white'}),
+        hovertemplate='%{y}<br>%{x}: %{z:.1f}%<extra></extra>'
+    ))
+
+    fig.update_layout(BASE_LAYOUT)
+    fig.update_layout(
+        title={'text': "Simulated Finishing Positions"},
+        xaxis_title="Finishing position",
+        yaxis_autorange='reversed',
+        height=650,
+        margin=dict(l=220, r=30, t=80, b=60)
+    )
+
+    return fig
+
+
+@timed("chart.sweep_heatmap")
+def create_sweep_heatmap(grid_positions, lap_times, prob_matrix):
+    """Create win-probability heatmap over grid position and lap time"""
+    fig = go.Figure(data=go.Heatmap(
+        z=np.asarray(prob_matrix) * 100,
+        x=[f'{t:.3f}' for t in lap_times],
+        y=[f'P{int(g)}' for g in grid_positions],
+        colorscale=[[0, '#1a1a1a'], [0.5, '#cc0000'], [1, '#ffffff']],
+        zmin=0,
+        zmax=100,
+        colorbar=dict(title=dict(text='Win %', font={'color': 'white'}), tickfont={'color': 'white'}),
+        hovertemplate='Grid %{y}<br>Lap %{x}s<br>Win %{z:.1f}%<extra></extra>'
+    ))
+
+    fig.update_layout(BASE_LAYOUT)
+    fig.update_layout(
+        title={'text': "Win Probability Sensitivity"},
+        xaxis_title="Best Lap Time (s)",
+        yaxis_title="Grid Position",
+        yaxis_autorange='reversed',
+        height=550,
+        margin=dict(l=80, r=30, t=80, b=60)
+    )
+
+    return fig
@@ -0,0 +1,114 @@
+"""HTML for the header banner, the About Formula 1 section and the footer.
+
+Kept out of streamlit_app.py so each section is emitted as one markdown
+element per rerun instead of a stack of separate cards and columns. The
+header names the selected event, filled in by header_html().
+"""
+import html
+
+HEADER_HTML = """
+<div class='header-banner'>
+    <div style='text-align: center;'>
+        <h1 style='font-size: 3.5rem; margin-bottom: 10px; color: white !important; text-shadow: 3px 3px 10px #000000;'>
+            🏎️ F1 WINNER PREDICTOR 🏎️
+        </h1>
+        <h2 style='color: #ff0000 !important; font-weight: bold; margin-top: 5px; font-size: 2.2rem; text-shadow: 2px 2px 8px #000000;'>
+            {event}
+        </h2>
+        <p style='color: white; font-size: 1.2rem; margin-top: 15px; font-weight: bold;'>
+            ⚡ Predict • Analyze • Win ⚡
+        </p>
+    </div>
+</div>
+"""
+
+
+def header_html(circuit_name: str, year: int) -> str:
+    """Header banner for the event picked in the input panel ("Mexico City GP", 2025 -> MEXICO CITY GRAND PRIX 2025)"""
+    name = circuit_name.upper()
+    if name.endswith(" GP"):
+        name = name[:-len(" GP")] + " GRAND PRIX"
+    return HEADER_HTML.format(event=html.escape(f"{name} {year}"))
+
+
+ABOUT_HTML = """
+<div class='section-divider'></div>
+<h2 style='text-align: center; color: white !important; margin-bottom: 40px;'>🏎️ ABOUT FORMULA 1</h2>
+<div class='about-card'>
+    <h3 style='color: #ff0000; margin-top: 0;'>What is Formula 1?</h3>
+    <p style='font-size: 1.15rem; line-height: 1.9; color: #ddd;'>
+    Formula 1 (F1) adalah kelas tertinggi dari balap mobil roda terbuka internasional yang diatur oleh 
+    <strong>Fédération Internationale de l'Automobile (FIA)</strong>. F1 dikenal sebagai puncak teknologi 
+    otomotif dan keterampilan mengemudi, dengan mobil-mobil yang mampu mencapai kecepatan lebih dari 
+    <strong style='color: #ff0000;'>350 km/jam</strong> dan menghasilkan <strong>5G force</strong> di tikungan cepat.
+    </p>
+</div>
+<div class='about-grid'>
+    <div class='about-card'>
+        <h4 style='color: #ff0000; text-align: center;'>⚡ EXTREME SPEED</h4>
+        <p style='color: #ddd; text-align: center; font-size: 1rem; line-height: 1.6;'>
+        Mobil F1 berakselerasi <strong style='color: #ff0000;'>0-100 km/jam</strong> dalam 
+        <strong>2.6 detik</strong> dan mencapai top speed <strong style='color: #ff0000;'>350+ km/jam</strong>.
+        <br><br>
+        Sistem DRS menambah <strong>10-12 km/jam</strong> ekstra di straight!
+        </p>
+    </div>
+    <div class='about-card'>
+        <h4 style='color: #ff0000; text-align: center;'>🌍 GLOBAL REACH</h4>
+        <p style='color: #ddd; text-align: center; font-size: 1rem; line-height: 1.6;'>
+        F1 mengadakan <strong style='color: #ff0000;'>23+ races</strong> di 5 benua setiap musim, 
+        dari Monaco hingga Singapore.
+        <br><br>
+        Ditonton oleh <strong style='color: #ff0000;'>500+ juta</strong> fans di seluruh dunia!
+        </p>
+    </div>
+    <div class='about-card'>
+        <h4 style='color: #ff0000; text-align: center;'>🔧 CUTTING-EDGE TECH</h4>
+        <p style='color: #ddd; text-align: center; font-size: 1rem; line-height: 1.6;'>
+        Setiap mobil memiliki <strong style='color: #ff0000;'>300+ sensors</strong> yang 
+        menghasilkan <strong>1.5 TB data</strong> per race.
+        <br><br>
+        Power unit hybrid menghasilkan <strong style='color: #ff0000;'>1000+ HP</strong>!
+        </p>
+    </div>
+</div>
+<div class='about-card'>
+    <h3 style='color: #ff0000; text-align: center;'>🏆 THE ELITE COMPETITION</h3>
+    <p style='font-size: 1.1rem; line-height: 1.8; color: #ddd; text-align: center;'>
+    Hanya <strong style='color: #ff0000;'>20 pembalap terbaik dunia</strong> yang berkompetisi di F1, 
+    mewakili 10 tim konstruktor. Mereka bersaing untuk dua kejuaraan: 
+    <strong>Kejuaraan Dunia Pembalap</strong> dan <strong>Kejuaraan Dunia Konstruktor</strong>.
+    </p>
+    <br>
+    <h4 style='color: #ff0000; text-align: center;'>🇲🇽 MEXICO CITY GRAND PRIX</h4>
+    <p style='color: #ddd; font-size: 1rem; line-height: 1.7; text-align: center;'>
+    <strong>Autódromo Hermanos Rodríguez</strong> di Mexico City adalah salah satu sirkuit paling ikonik di F1, 
+    terkenal dengan <strong style='color: #ff0000;'>atmosfer elektrik</strong> dan elevasi tinggi 
+    <strong>(2,200m di atas permukaan laut)</strong> yang menantang performa mesin dan aero.
+    <br><br>
+    Sirkuit ini memiliki <strong style='color: #ff0000;'>Foro Sol</strong>, sebuah stadion baseball 
+    yang diubah menjadi tribun dengan kapasitas <strong>30,000+ penonton</strong> yang menciptakan 
+    suasana luar biasa dengan Mexican wave dan chants yang legendaris!
+    </p>
+</div>
+"""
+
+FOOTER_HTML = """
+<div class='section-divider'></div>
+<div style='text-align: center; color: #888; padding: 40px 0 20px 0;'>
+    <p style='font-size: 1rem; margin-bottom: 10px; color: #ccc;'>
+        🏎️ <strong style='color: #ff0000;'>F1 Winner Predictor 2025</strong> | Powered by Machine Learning & AI
+    </p>
+    <p style='font-size: 0.9rem; margin-bottom: 20px; color: #999;'>
+        Backend: Flask + Waitress on Railway | Frontend: Streamlit Cloud
+    </p>
+    <div style='border-top: 2px solid #444; padding-top: 20px; margin: 20px auto; max-width: 600px;'>
+        <p style='font-size: 1.1rem; color: #ff0000; font-weight: bold; letter-spacing: 2px; text-shadow: 2px 2px 4px #000;'>
+            © DGX 2025 • ALL RIGHTS RESERVED
+        </p>
+        <p style='font-size: 0.85rem; color: #666; margin-top: 10px;'>
+            Racing Analytics • Performance Prediction • Data Science
+        </p>
+    </div>
+</div>
+"""
@@ -0,0 +1,94 @@
+"""Driver/season registry loaded from a versioned JSON data file.
+
+Each season holds its grid as parallel arrays indexed by driver ID (the
+model's DriverEncoded), so per-row lookups for batches and the full grid
+are plain numpy indexing. Each season also lists its circuits with the
+fastest qualifying time used by TimeDiffFromFastest. New seasons or
+circuits only need an edit to data/drivers.json.
+"""
+import json
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class Season:
+    """One season's grid (arrays indexed by driver ID) and circuits"""
+
+    def __init__(self, year: int, names, teams, avg_positions, avg_points,
+                 circuits: Dict[str, dict], default_circuit: str, history_from: Optional[int] = None):
+        self.year = int(year)
+        self.names = np.asarray(names, dtype=str)
+        self.teams = np.asarray(teams, dtype=str)
+        self.avg_positions = np.asarray(avg_positions, dtype=np.float64)
+        self.avg_points = np.asarray(avg_points, dtype=np.float64)
+        self.circuits = circuits
+        self.default_circuit = default_circuit
+        self.history_from = history_from
+        # "Nama (Tim)" dirakit sekali, dipakai label widget dan tabel grid
+        self.labels = np.char.add(np.char.add(self.names, " ("), np.char.add(self.teams, ")"))
+
+    @classmethod
+    def from_dict(cls, year: int, data: dict) -> "Season":
+        drivers = sorted(data["drivers"], key=lambda d: d["id"])
+        ids = [d["id"] for d in drivers]
+        if ids != list(range(len(drivers))):
+            raise ValueError(f"Season {year}: driver IDs must be 0..{len(drivers) - 1} without gaps")
+        circuits = data["circuits"]
+        default_circuit = data.get("default_circuit", next(iter(circuits)))
+        if default_circuit not in circuits:
+            raise ValueError(f"Season {year}: unknown default circuit {default_circuit!r}")
+        return cls(
+            year,
+            [d["name"] for d in drivers],
+            [d["team"] for d in drivers],
+            [d["avg_pos"] for d in drivers],
+            [d["avg_points"] for d in drivers],
+            circuits,
+            default_circuit,
+            data.get("history_from"),
+        )
+
+    @property
+    def n_drivers(self) -> int:
+        return len(self.names)
+
+    @property
+    def driver_ids(self) -> np.ndarray:
+        return np.arange(self.n_drivers)
+
+    def label(self, driver_id: int) -> str:
+        if 0 <= driver_id < self.n_drivers:
+            return str(self.labels[driver_id])
+        return "Unknown Driver"
+
+    def circuit_name(self, circuit: str) -> str:
+        return self.circuits[circuit]["name"]
+
+    def fastest_quali_time(self, circuit: Optional[str] = None) -> float:
+        return float(self.circuits[circuit or self.default_circuit]["fastest_quali_time"])
+
+
+class DriverRegistry:
+    """All seasons from one data file, keyed by year"""
+
+    def __init__(self, seasons: Dict[int, Season], default_season: int, version: str):
+        if default_season not in seasons:
+            raise ValueError(f"Default season {default_season} is not in the data file")
+        self.seasons = seasons
+        self.default_season = default_season
+        self.version = version
+
+    @classmethod
+    def load(cls, path) -> "DriverRegistry":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        seasons = {int(year): Season.from_dict(int(year), s) for year, s in data["seasons"].items()}
+        return cls(seasons, int(data.get("default_season", max(seasons))), str(data.get("version", "unversioned")))
+
+    @property
+    def years(self) -> list:
+        return sorted(self.seasons, reverse=True)
+
+    def season(self, year: Optional[int] = None) -> Season:
+        return self.seasons[self.default_season if year is None else int(year)]
@@ -0,0 +1,122 @@
+"""Feature engineering for the F1 winner model.
+
+Turns raw driver/session inputs (the values entered through the widgets)
+into the 20-column float64 matrix the backend expects, for one row or many
+at once. Nothing here depends on Streamlit.
+"""
+import sys
+from typing import List
+
+import numpy as np
+
+# Kolom mentah (input widget + data historis driver)
+RAW_COLUMNS = [
+    'Year', 'GridPosition', 'LapTime (s)', 'BestQuali (s)', 'RacePace (s)',
+    'Sector1Time (s)', 'Sector2Time (s)', 'Sector3Time (s)',
+    'DriverEncoded', 'AvgPrevPositions', 'AvgPrevPoints',
+]
+
+# Kolom mentah yang wajib ada (Year dan data historis driver bisa diisi otomatis)
+REQUIRED_RAW_COLUMNS = [
+    'GridPosition', 'LapTime (s)', 'BestQuali (s)', 'RacePace (s)',
+    'Sector1Time (s)', 'Sector2Time (s)', 'Sector3Time (s)', 'DriverEncoded',
+]
+
+# Urutan kolom yang dipakai backend (20 fitur)
+FEATURE_ORDER = [
+    'Year', 'GridPosition', 'LapTime (s)', 'BestQuali (s)', 'RacePace (s)',
+    'Sector1Time (s)', 'Sector2Time (s)', 'Sector3Time (s)',
+    'SectorTimeConsistency', 'QualiAdvantage', 'PositionImprovement',
+    'RacePaceEfficiency', 'Sector1Ratio', 'Sector2Ratio', 'Sector3Ratio',
+    'TimeDiffFromFastest', 'DriverEncoded', 'AvgPrevPositions', 'AvgPrevPoints', 'Dummy'
+]
+N_FEATURES = len(FEATURE_ORDER)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_ORDER)}
+
+# Default fastest quali time (Mexico City GP); nilai per sirkuit ada di data/drivers.json
+FASTEST_QUALI_TIME = 78.0
+# PositionImprovement dihitung relatif terhadap P5
+REFERENCE_GRID_POSITION = 5
+
+
+def as_raw_matrix(raw) -> np.ndarray:
+    """Coerce raw inputs into an (N, len(RAW_COLUMNS)) float64 array.
+
+    Accepts a DataFrame with RAW_COLUMNS, a dict of scalars or equal-length
+    arrays keyed by RAW_COLUMNS, or an array already in RAW_COLUMNS order.
+    """
+    # pandas tidak diimpor di sini (mahal saat cold start); kalau belum dimuat, raw pasti bukan DataFrame
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(raw, pd.DataFrame):
+        return raw[RAW_COLUMNS].to_numpy(dtype=np.float64)
+    if isinstance(raw, dict):
+        columns = np.broadcast_arrays(*[np.asarray(raw[c], dtype=np.float64) for c in RAW_COLUMNS])
+        return np.column_stack([np.atleast_1d(c) for c in columns])
+    matrix = np.atleast_2d(np.asarray(raw, dtype=np.float64))
+    if matrix.shape[1] != len(RAW_COLUMNS):
+        raise ValueError(f"Expected {len(RAW_COLUMNS)} raw columns, got {matrix.shape[1]}")
+    return matrix
+
+
+def engineer_features(raw, fastest_quali_time=FASTEST_QUALI_TIME) -> np.ndarray:
+    """Compute all 20 backend features for N rows in one vectorized pass.
+
+    `fastest_quali_time` may be a scalar or a per-row array. Returns a
+    C-contiguous (N, 20) float64 matrix in FEATURE_ORDER.
+    """
+    r = as_raw_matrix(raw)
+    col = {name: r[:, i] for i, name in enumerate(RAW_COLUMNS)}
+    sectors = r[:, 5:8]
+    total_sector_time = sectors.sum(axis=1)
+
+    out = np.empty((r.shape[0], N_FEATURES), dtype=np.float64)
+    out[:, 0:8] = r[:, 0:8]
+    out[:, FEATURE_INDEX['SectorTimeConsistency']] = sectors.std(axis=1)
+    out[:, FEATURE_INDEX['QualiAdvantage']] = col['BestQuali (s)'] - col['LapTime (s)']
+    out[:, FEATURE_INDEX['PositionImprovement']] = col['GridPosition'] - REFERENCE_GRID_POSITION
+    out[:, FEATURE_INDEX['RacePaceEfficiency']] = col['RacePace (s)'] / col['LapTime (s)']
+    out[:, FEATURE_INDEX['Sector1Ratio']:FEATURE_INDEX['Sector3Ratio'] + 1] = sectors / total_sector_time[:, None]
+    out[:, FEATURE_INDEX['TimeDiffFromFastest']] = np.maximum(0, col['BestQuali (s)'] - fastest_quali_time)
+    out[:, FEATURE_INDEX['DriverEncoded']] = col['DriverEncoded']
+    out[:, FEATURE_INDEX['AvgPrevPositions']] = col['AvgPrevPositions']
+    out[:, FEATURE_INDEX['AvgPrevPoints']] = col['AvgPrevPoints']
+    out[:, FEATURE_INDEX['Dummy']] = 0.0
+    return out
+
+
+def expand_for_drivers(raw: dict, driver_ids, avg_positions, avg_points) -> dict:
+    """Repeat one row of raw inputs for each driver, swapping in per-driver history"""
+    expanded = dict(raw)
+    expanded['DriverEncoded'] = np.asarray(driver_ids, dtype=np.float64)
+    expanded['AvgPrevPositions'] = np.asarray(avg_positions, dtype=np.float64)
+    expanded['AvgPrevPoints'] = np.asarray(avg_points, dtype=np.float64)
+    return expanded
+
+
+def sweep_inputs(raw: dict, grid_positions, lap_deltas) -> dict:
+    """Raw inputs for every (grid position, lap-time delta) pair, grid-major.
+
+    The delta shifts LapTime and BestQuali together; all other inputs stay fixed.
+    """
+    grid, delta = np.meshgrid(np.asarray(grid_positions, dtype=np.float64),
+                              np.asarray(lap_deltas, dtype=np.float64), indexing='ij')
+    swept = dict(raw)
+    swept['GridPosition'] = grid.ravel()
+    swept['LapTime (s)'] = raw['LapTime (s)'] + delta.ravel()
+    swept['BestQuali (s)'] = raw['BestQuali (s)'] + delta.ravel()
+    return swept
+
+
+def features_to_dict(row) -> dict:
+    """Map one feature row back to {feature name: float} (without the Dummy column)"""
+    return {name: float(value) for name, value in zip(FEATURE_ORDER[:-1], row)}
+
+
+def format_input_data(inputs: dict) -> List[float]:
+    """Convert dictionary to ordered list of 20 features for backend"""
+    result = [0.0 if key == 'Dummy' else float(inputs[key]) for key in FEATURE_ORDER]
+
+    if len(result) != N_FEATURES:
+        raise ValueError(f"Expected {N_FEATURES} features, got {len(result)}")
+
+    return result
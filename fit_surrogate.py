@@ -0,0 +1,122 @@
+"""Fit the local surrogate (models/local_surrogate.json) to the backend model.
+
+Samples plausible raw inputs for every driver and circuit in the registry,
+scores them with the backend in batches and fits a ridge regression on
+logit(p) over standardized features, which is the logistic model
+LocalModel evaluates. A holdout split reports how closely the surrogate
+tracks the backend:
+
+    python -m fit_surrogate --url https://<backend>/predict --samples 20000
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from drivers import DriverRegistry
+from features import FEATURE_ORDER, engineer_features
+from predict_client import PredictClient
+
+# Probabilitas di-clip sebelum logit supaya 0/1 dari backend tidak jadi tak hingga
+_EPS = 1e-4
+
+
+def sample_inputs(registry: DriverRegistry, n: int, rng: np.random.Generator):
+    """Random raw inputs around realistic lap times; returns (raw dict, fastest quali per row)"""
+    seasons = [registry.season(year) for year in registry.years]
+    season_idx = rng.integers(0, len(seasons), n)
+    raw = {key: np.empty(n) for key in ('Year', 'DriverEncoded', 'AvgPrevPositions', 'AvgPrevPoints')}
+    fastest = np.empty(n)
+    for i, season in enumerate(seasons):
+        rows = np.flatnonzero(season_idx == i)
+        drivers = rng.integers(0, season.n_drivers, len(rows))
+        circuits = list(season.circuits)
+        fastest[rows] = [season.fastest_quali_time(circuits[c]) for c in rng.integers(0, len(circuits), len(rows))]
+        raw['Year'][rows] = season.year
+        raw['DriverEncoded'][rows] = drivers
+        raw['AvgPrevPositions'][rows] = np.asarray(season.avg_positions)[drivers]
+        raw['AvgPrevPoints'][rows] = np.asarray(season.avg_points)[drivers]
+
+    lap = fastest + rng.uniform(0.5, 4.0, n)
+    ratios = rng.dirichlet([310, 350, 340], n)
+    raw.update({
+        'GridPosition': rng.integers(1, 21, n).astype(np.float64),
+        'LapTime (s)': lap,
+        'BestQuali (s)': lap + rng.normal(-0.4, 0.4, n),
+        'RacePace (s)': lap + rng.uniform(0.3, 2.5, n),
+        'Sector1Time (s)': lap * ratios[:, 0],
+        'Sector2Time (s)': lap * ratios[:, 1],
+        'Sector3Time (s)': lap * ratios[:, 2],
+    })
+    return raw, fastest
+
+
+def fit(matrix: np.ndarray, probs: np.ndarray, ridge: float = 1e-3) -> dict:
+    """Ridge regression of logit(p) on standardized features"""
+    mean = matrix.mean(axis=0)
+    scale = matrix.std(axis=0)
+    # Kolom konstan (Dummy, Year dengan satu musim) tidak ikut: skala 1, koefisien 0
+    varying = scale > 1e-9
+    scale = np.where(varying, scale, 1.0)
+    z = (matrix - mean) / scale
+    target = np.log(np.clip(probs, _EPS, 1 - _EPS) / (1 - np.clip(probs, _EPS, 1 - _EPS)))
+
+    design = np.column_stack([z[:, varying], np.ones(len(z))])
+    penalty = ridge * len(z) * np.eye(design.shape[1])
+    penalty[-1, -1] = 0.0
+    solution = np.linalg.solve(design.T @ design + penalty, design.T @ target)
+    coef = np.zeros(matrix.shape[1])
+    coef[varying] = solution[:-1]
+    return {"mean": mean, "scale": scale, "coef": coef, "intercept": float(solution[-1])}
+
+
+def predict(model: dict, matrix: np.ndarray) -> np.ndarray:
+    z = (matrix - model["mean"]) / model["scale"]
+    return 1.0 / (1.0 + np.exp(-(z @ model["coef"] + model["intercept"])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", required=True, help="backend /predict URL")
+    parser.add_argument("--drivers", type=Path, default=Path("data/drivers.json"))
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--ridge", type=float, default=1e-3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--version", help="model_version of the artifact (default local-logit-<date>)")
+    parser.add_argument("--output", type=Path, default=Path("models/local_surrogate.json"))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    raw, fastest = sample_inputs(DriverRegistry.load(args.drivers), args.samples, rng)
+    matrix = engineer_features(raw, fastest)
+    client = PredictClient(args.url)
+    probs = np.concatenate([
+        np.asarray(client.predict_batch(matrix[i:i + args.batch_size].tolist()), dtype=np.float64)
+        for i in range(0, len(matrix), args.batch_size)
+    ])
+
+    n_train = int(len(matrix) * (1 - args.holdout))
+    model = fit(matrix[:n_train], probs[:n_train], args.ridge)
+    error = np.abs(predict(model, matrix[n_train:]) - probs[n_train:])
+    print(f"Fitted on {n_train:,} rows; holdout MAE {error.mean():.4f}, p95 {np.quantile(error, 0.95):.4f}")
+
+    artifact = {
+        "model_version": args.version or f"local-logit-{time.strftime('%Y%m%d')}",
+        "description": (f"Logistic surrogate fitted by fit_surrogate.py to {args.url} on {len(matrix):,} "
+                        f"sampled inputs; holdout MAE {error.mean():.4f}"),
+        "features": FEATURE_ORDER,
+        "mean": model["mean"].round(6).tolist(),
+        "scale": model["scale"].round(6).tolist(),
+        "coef": model["coef"].round(6).tolist(),
+        "intercept": round(model["intercept"], 6),
+    }
+    args.output.write_text(json.dumps(artifact, indent=2) + "\n", encoding="utf-8")
+    print(f"Saved {args.output} ({artifact['model_version']})")
+
+
+if __name__ == "__main__":
+    main()
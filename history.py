@@ -0,0 +1,114 @@
+"""Per-session prediction history in fixed-size NumPy columns.
+
+Only the 20-feature row (which already carries every raw input), the
+probability and a short label are kept per run; figures are rebuilt from
+the row when a past run is viewed. Capacity is fixed per session and the
+least recently used run is overwritten once it is full, so a session's
+history never grows past ``capacity * ~200`` bytes plus its labels.
+"""
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from features import FEATURE_INDEX, N_FEATURES, features_to_dict
+
+
+class PredictionHistory:
+    """Fixed-capacity, LRU-evicting store of one session's predictions"""
+
+    def __init__(self, capacity: int = 50):
+        self.capacity = max(1, int(capacity))
+        self.features = np.zeros((self.capacity, N_FEATURES), dtype=np.float64)
+        self.probabilities = np.zeros(self.capacity, dtype=np.float64)
+        self.created_at = np.zeros(self.capacity, dtype=np.float64)
+        self.run_ids = np.zeros(self.capacity, dtype=np.int64)
+        self.last_used = np.zeros(self.capacity, dtype=np.int64)
+        self.labels: List[str] = [""] * self.capacity
+        self.size = 0
+        self.evictions = 0
+        self._clock = 0
+        self._next_id = 1
+
+    def __len__(self):
+        return self.size
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _slot(self, run_id: int) -> Optional[int]:
+        match = np.flatnonzero(self.run_ids[:self.size] == run_id)
+        return int(match[0]) if len(match) else None
+
+    def add(self, features, probability: float, label: str = "") -> int:
+        """Record a prediction and return its run id (an identical row is just touched)"""
+        row = np.asarray(features, dtype=np.float64)
+        same = np.flatnonzero((self.features[:self.size] == row).all(axis=1))
+        if len(same):
+            slot = int(same[0])
+            self.probabilities[slot] = probability
+            self.last_used[slot] = self._tick()
+            return int(self.run_ids[slot])
+
+        if self.size < self.capacity:
+            slot = self.size
+            self.size += 1
+        else:
+            slot = int(np.argmin(self.last_used))
+            self.evictions += 1
+        run_id = self._next_id
+        self._next_id += 1
+        self.features[slot] = row
+        self.probabilities[slot] = probability
+        self.created_at[slot] = time.time()
+        self.run_ids[slot] = run_id
+        self.last_used[slot] = self._tick()
+        self.labels[slot] = label
+        return run_id
+
+    def get(self, run_id: int, touch: bool = True) -> Optional[dict]:
+        """Stored run as {run_id, label, probability, features, inputs}, or None if evicted"""
+        slot = self._slot(run_id)
+        if slot is None:
+            return None
+        if touch:
+            self.last_used[slot] = self._tick()
+        return {
+            "run_id": run_id,
+            "label": self.labels[slot],
+            "probability": float(self.probabilities[slot]),
+            "features": self.features[slot].copy(),
+            "inputs": features_to_dict(self.features[slot]),
+        }
+
+    def run_ids_recent_first(self) -> list:
+        order = np.argsort(-self.created_at[:self.size], kind="stable")
+        return self.run_ids[:self.size][order].tolist()
+
+    def rows(self) -> list:
+        """One summary dict per run, newest first, for display"""
+        order = np.argsort(-self.created_at[:self.size], kind="stable")
+        f = self.features[order]
+        return [
+            {
+                "Run": int(self.run_ids[i]),
+                "Driver": self.labels[i],
+                "Grid": int(f[k, FEATURE_INDEX['GridPosition']]),
+                "Best Lap (s)": f[k, FEATURE_INDEX['LapTime (s)']],
+                "Race Pace (s)": f[k, FEATURE_INDEX['RacePace (s)']],
+                "Win Probability": self.probabilities[i] * 100,
+                "Time": time.strftime("%H:%M:%S", time.localtime(self.created_at[i])),
+            }
+            for k, i in enumerate(order)
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.features, self.probabilities, self.created_at, self.run_ids, self.last_used)
+        return sum(a.nbytes for a in arrays) + sum(len(label.encode()) for label in self.labels)
+
+    def clear(self):
+        self.size = 0
+        self.last_used[:] = 0
+        self.labels = [""] * self.capacity
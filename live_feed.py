@@ -0,0 +1,198 @@
+"""Live race-weekend mode: tail a JSONL lap feed and keep a scored leaderboard.
+
+Each line of the feed is one completed lap::
+
+    {"driver": 4, "session": "R", "lap_time": 80.912, "sector1": 25.1,
+     "sector2": 28.0, "sector3": 27.8, "position": 2}
+
+``LiveBoard`` keeps rolling per-driver aggregates in arrays indexed by
+driver ID (best lap and its sectors, best quali, mean of the last few race
+laps, current position). A driver is marked dirty only when one of those
+values changes, and a tick re-scores just the dirty drivers in one batch.
+One board is shared by every viewer and ticks are rate-limited, so the
+feed is read and scored once per interval no matter how many sessions
+are watching.
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from features import engineer_features
+from metrics import inc
+
+QUALI_SESSIONS = {"Q", "Q1", "Q2", "Q3", "SQ"}
+
+
+class FeedTailer:
+    """Incrementally read complete lines appended to a file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self._partial = b""
+
+    def read_new(self) -> list:
+        """Parsed records appended since the last call (restarts if the file was truncated)"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            self.offset, self._partial = 0, b""
+        if size == self.offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = self._partial + f.read(size - self.offset)
+        self.offset = size
+        lines = data.split(b"\n")
+        self._partial = lines.pop()
+        records = []
+        for line in lines:
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+
+class LiveBoard:
+    """Rolling per-driver aggregates and incrementally updated win probabilities"""
+
+    def __init__(self, path, n_drivers: int = 20, pace_window: int = 5, min_interval: float = 2.0):
+        self.tailer = FeedTailer(path)
+        self.n_drivers = n_drivers
+        self.pace_window = pace_window
+        self.min_interval = min_interval
+        self.best_lap = np.full(n_drivers, np.inf)
+        self.best_sectors = np.full((n_drivers, 3), np.nan)
+        self.best_quali = np.full(n_drivers, np.inf)
+        self.position = np.zeros(n_drivers)
+        self.laps = np.zeros(n_drivers, dtype=np.int64)
+        # Ring buffer lap balapan terakhir per driver (untuk race pace)
+        self._recent = np.full((n_drivers, pace_window), np.nan)
+        self._race_laps = np.zeros(n_drivers, dtype=np.int64)
+        # Konteks scoring (musim, sirkuit) -> (probabilitas, mask dirty)
+        self._scores = {}
+        self._last_tick = 0.0
+        self._lock = threading.Lock()
+        # Naik setiap kali agregat driver berubah; hasil scoring yang basi tidak ditulis
+        self._version = np.zeros(n_drivers, dtype=np.int64)
+        self.records = 0
+        self.skipped = 0
+        self.rescored = 0
+
+    def race_pace(self) -> np.ndarray:
+        """Mean of each driver's last `pace_window` race laps (best lap if none yet)"""
+        counts = (~np.isnan(self._recent)).sum(axis=1)
+        return np.where(counts > 0, np.nansum(self._recent, axis=1) / np.maximum(counts, 1), self.best_lap)
+
+    def _aggregate_row(self, i: int) -> np.ndarray:
+        return np.concatenate([[self.best_lap[i], self.best_quali[i], self.position[i]], self._recent[i]])
+
+    def _parse(self, record):
+        """(driver, lap time, sectors, position or None, quali?) for a valid record, else None"""
+        try:
+            i = int(record["driver"])
+            lap_time = float(record["lap_time"])
+            # Feed tanpa split sector: bagi rata supaya rasio sector tetap terdefinisi
+            sectors = [float(record.get(f"sector{k}") or lap_time / 3) for k in (1, 2, 3)]
+            position = record.get("position")
+            position = None if position is None else float(position)
+            quali = str(record.get("session") or "R").upper() in QUALI_SESSIONS
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+        if not 0 <= i < self.n_drivers or not np.isfinite(lap_time) or not np.all(np.isfinite(sectors)):
+            return None
+        return i, lap_time, sectors, position, quali
+
+    def apply(self, records) -> np.ndarray:
+        """Fold lap records into the aggregates; return the IDs of drivers that changed.
+
+        Malformed records (missing or non-numeric fields) are skipped and counted.
+        """
+        changed = np.zeros(self.n_drivers, dtype=bool)
+        for record in records:
+            parsed = self._parse(record)
+            if parsed is None:
+                self.skipped += 1
+                inc("live.skipped")
+                continue
+            i, lap_time, sectors, position, quali = parsed
+            before = self._aggregate_row(i)
+            self.laps[i] += 1
+            if quali:
+                self.best_quali[i] = min(self.best_quali[i], lap_time)
+            else:
+                self._recent[i, self._race_laps[i] % self.pace_window] = lap_time
+                self._race_laps[i] += 1
+            if lap_time < self.best_lap[i]:
+                self.best_lap[i] = lap_time
+                self.best_sectors[i] = sectors
+            if position is not None:
+                self.position[i] = position
+            changed[i] |= not np.array_equal(before, self._aggregate_row(i), equal_nan=True)
+        self.records += len(records)
+        self._version[changed] += 1
+        return np.flatnonzero(changed)
+
+    def raw_inputs(self, driver_ids, year: float, avg_positions, avg_points) -> dict:
+        """Raw feature inputs for `driver_ids` built from the live aggregates"""
+        ids = np.asarray(driver_ids, dtype=np.int64)
+        best_lap = self.best_lap[ids]
+        quali = np.where(np.isfinite(self.best_quali[ids]), self.best_quali[ids], best_lap)
+        position = np.where(self.position[ids] > 0, self.position[ids], ids + 1)
+        return {
+            'Year': float(year), 'GridPosition': position, 'LapTime (s)': best_lap,
+            'BestQuali (s)': quali, 'RacePace (s)': self.race_pace()[ids],
+            'Sector1Time (s)': self.best_sectors[ids, 0], 'Sector2Time (s)': self.best_sectors[ids, 1],
+            'Sector3Time (s)': self.best_sectors[ids, 2], 'DriverEncoded': ids,
+            'AvgPrevPositions': np.asarray(avg_positions)[ids], 'AvgPrevPoints': np.asarray(avg_points)[ids],
+        }
+
+    def tick(self, predictor, context, year: float, avg_positions, avg_points,
+             fastest_quali_time: float, force: bool = False) -> dict:
+        """Read new laps and re-score dirty drivers for `context` (at most once per min_interval).
+
+        The backend call runs outside the lock, so other viewers keep reading
+        the board meanwhile; a result is only written if that driver's
+        aggregates have not changed since the rows were built.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if force or now - self._last_tick >= self.min_interval:
+                self._last_tick = now
+                changed = self.apply(self.tailer.read_new())
+                for _, dirty in self._scores.values():
+                    dirty[changed] = True
+            probs, dirty = self._scores.setdefault(
+                context, (np.full(self.n_drivers, np.nan), np.ones(self.n_drivers, dtype=bool)))
+            todo = np.flatnonzero(dirty & np.isfinite(self.best_lap))
+            if len(todo):
+                raw = self.raw_inputs(todo, year, avg_positions, avg_points)
+                versions = self._version[todo].copy()
+                # Diklaim tick ini; tick lain tidak men-score driver yang sama bersamaan
+                dirty[todo] = False
+
+        if len(todo):
+            matrix = engineer_features(raw, fastest_quali_time)
+            try:
+                # Baris live berubah tiap lap dan tidak akan diminta lagi: jangan mengisi cache bersama
+                scored = np.asarray(predictor.predict_rows(matrix.tolist(), cache=False), dtype=np.float64)
+            except Exception:
+                with self._lock:
+                    dirty[todo] = True
+                raise
+
+        with self._lock:
+            if len(todo):
+                fresh = self._version[todo] == versions
+                probs[todo[fresh]] = scored[fresh]
+                self.rescored += len(todo)
+                inc("live.rescored", len(todo))
+            return {"probabilities": probs.copy(), "laps": self.laps.copy(), "rescored": len(todo),
+                    "records": self.records, "position": self.position.copy()}
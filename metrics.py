@@ -0,0 +1,207 @@
+"""Process-wide timing spans, counters and a Prometheus text export.
+
+    with span("backend.post"):
+        ...
+    inc("backend.requests", outcome="timeout")
+
+Everything is aggregated in REGISTRY, which lives as long as the server
+process and is shared by all sessions.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Batas bucket histogram (detik)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing quantile q (max for the overflow bucket)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = "f1_frontend"):
+        self.prefix = prefix
+        self.histograms = {}
+        self.counters = {}
+        self.started_at = time.time()
+        self._last_export = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, event: str, amount: int = 1, **labels):
+        key = (event, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.started_at = time.time()
+
+    def stage_rows(self) -> list:
+        """One summary dict per stage, in milliseconds, for display"""
+        with self._lock:
+            return [
+                {
+                    "Stage": stage,
+                    "Count": h.count,
+                    "Mean (ms)": h.sum / h.count * 1000 if h.count else 0.0,
+                    "p50 ≤ (ms)": h.quantile(0.5) * 1000,
+                    "p95 ≤ (ms)": h.quantile(0.95) * 1000,
+                    "Max (ms)": h.max * 1000,
+                }
+                for stage, h in sorted(self.histograms.items())
+            ]
+
+    def counter_rows(self) -> list:
+        with self._lock:
+            return [
+                {"Event": event + "".join(f" {k}={v}" for k, v in labels), "Count": n}
+                for (event, labels), n in sorted(self.counters.items())
+            ]
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        name = f"{self.prefix}_stage_duration_seconds"
+        lines = [f"# HELP {name} Time spent per rerun stage.", f"# TYPE {name} histogram"]
+        with self._lock:
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+
+            counter = f"{self.prefix}_events_total"
+            lines += [f"# HELP {counter} Event counts.", f"# TYPE {counter} counter"]
+            for (event, labels), n in sorted(self.counters.items()):
+                label_text = ",".join([f'event="{event}"'] + [f'{k}="{v}"' for k, v in labels])
+                lines.append(f"{counter}{{{label_text}}} {n}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Atomically write the text export to a file (for node_exporter's textfile collector)"""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def maybe_write_prometheus(self, path, min_interval: float = 10.0) -> bool:
+        """write_prometheus() at most once per `min_interval` seconds"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_export < min_interval:
+                return False
+            self._last_export = now
+        self.write_prometheus(path)
+        return True
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Span:
+    """A running timer; stop() records the elapsed time once"""
+
+    def __init__(self, stage: str, registry: MetricsRegistry = REGISTRY):
+        self.stage = stage
+        self.registry = registry
+        self.start = time.perf_counter()
+        self.elapsed = None
+
+    def stop(self) -> float:
+        if self.elapsed is None:
+            self.elapsed = time.perf_counter() - self.start
+            self.registry.observe(self.stage, self.elapsed)
+        return self.elapsed
+
+
+@contextmanager
+def span(stage: str, registry: MetricsRegistry = REGISTRY):
+    timer = Span(stage, registry)
+    try:
+        yield timer
+    finally:
+        timer.stop()
+
+
+def timed(stage: str):
+    """Decorator form of span()"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def inc(event: str, amount: int = 1, **labels):
+    REGISTRY.inc(event, amount, **labels)
+
+
+def serve_prometheus(port: int, registry: MetricsRegistry = REGISTRY, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics in the Prometheus text format from a daemon thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
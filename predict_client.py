@@ -0,0 +1,683 @@
+import asyncio
+import functools
+import hashlib
+import random
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+import wire
+from metrics import inc, span
+
+
+class PredictError(Exception):
+    """Raised when the /predict backend cannot produce a prediction"""
+
+    def __init__(self, message, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(PredictError):
+    """Raised while the circuit breaker is open and calls fail fast"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Backend unavailable, retry in {retry_in:.1f}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures, half-open after a cooldown"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def before_call(self):
+        """Raise CircuitOpenError if calls should currently fail fast"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed < self.reset_timeout:
+                raise CircuitOpenError(self.reset_timeout - elapsed)
+            # Half-open: biarkan satu percobaan lewat, tahan yang lain sampai hasilnya jelas
+            self._opened_at = time.monotonic()
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class PredictClient:
+    """Process-wide HTTP client for the /predict backend.
+
+    One keep-alive session is shared by every Streamlit session so TCP/TLS
+    connections are reused. Transient failures (connection errors, timeouts,
+    5xx) are retried with jittered exponential backoff, and a circuit breaker
+    stops calling the backend while it is down.
+
+    Batches can be sent in a binary wire format (see wire.py), gzipped above
+    `gzip_min_bytes`; if the backend rejects it the client falls back to
+    JSON batches. Rejections (of batches or of the binary format) are
+    remembered for `batch_recheck` seconds, then the client tries again.
+    """
+
+    RETRY_STATUS = {502, 503, 504}
+    # Status yang berarti "backend tidak paham payload batch" -> fallback ke request per baris.
+    # 404/500 dkk. bukan penolakan format: itu error biasa, jangan diingat
+    BATCH_REJECT_STATUS = {400, 413, 415, 422}
+
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        max_retries: int = 2,
+        backoff: float = 0.3,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        async_concurrency: int = 16,
+        request_deadline: Optional[float] = None,
+        wire_format: str = "json",
+        gzip_min_bytes: int = 64 * 1024,
+        batch_recheck: float = 300.0,
+    ):
+        if wire_format not in wire.WIRE_FORMATS:
+            raise ValueError(f"Unknown wire format {wire_format!r}; expected one of {', '.join(wire.WIRE_FORMATS)}")
+        self.url = url
+        self.pool_size = pool_size
+        self.async_concurrency = async_concurrency
+        self.request_deadline = request_deadline
+        self._aio = None
+        self._aio_lock = threading.Lock()
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json", "Connection": "keep-alive"})
+        # None = belum tahu apakah backend menerima batch {"features": [[...], ...]}
+        self.batch_supported = None
+        self.wire_format = wire_format
+        self.gzip_min_bytes = gzip_min_bytes
+        # None = belum tahu apakah backend menerima body Content-Encoding: gzip
+        self.gzip_supported = None
+        # None = belum tahu apakah backend menerima wire_format biner
+        self.wire_format_supported = None
+        self.batch_recheck = batch_recheck
+        self._rejected_at = 0.0
+
+    @property
+    def worst_case_seconds(self) -> float:
+        """Longest a single call can take: every attempt timing out plus the maximum backoff"""
+        connect_timeout, read_timeout = self.timeout
+        backoff = sum(self.backoff * (2 ** attempt) for attempt in range(self.max_retries))
+        return (connect_timeout + read_timeout) * (self.max_retries + 1) + backoff
+
+    def _sleep_before_retry(self, attempt: int, deadline: Optional[float] = None):
+        # Full jitter: acak antara 0 dan backoff * 2^attempt, tidak melewati deadline
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+        if deadline is not None:
+            delay = min(delay, max(0.0, deadline - time.monotonic()))
+        time.sleep(delay)
+
+    def _attempt_timeout(self, deadline: Optional[float]):
+        """(connect, read) timeout of the next attempt, capped by the deadline; None once it has passed"""
+        if deadline is None:
+            return self.timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        return tuple(min(t, remaining) for t in self.timeout)
+
+    def post(self, payload: dict, deadline: Optional[float] = None) -> dict:
+        """POST a JSON payload with retries and circuit breaking, return the JSON body.
+
+        `deadline` (time.monotonic()) caps every attempt's timeout and stops further retries.
+        """
+        response = self._send(deadline=deadline, json=payload)
+        with span("backend.parse"):
+            result = self._json(response)
+        self.breaker.record_success()
+        return result
+
+    def _json(self, response: requests.Response) -> dict:
+        """JSON object of a 200 response; an unreadable body counts as a backend failure"""
+        try:
+            result = response.json()
+        except ValueError as e:
+            result, error = None, e
+        else:
+            error = None if isinstance(result, dict) else f"expected a JSON object, got {type(result).__name__}"
+        if error is not None:
+            inc("backend.requests", outcome="bad_body")
+            self.breaker.record_failure()
+            raise PredictError(f"Backend returned an invalid response body: {error}", 502)
+        return result
+
+    def _send(self, deadline: Optional[float] = None, **request_kwargs) -> requests.Response:
+        """POST with retries and circuit breaking, return the 200 response.
+
+        A 200 does not close the breaker yet: the caller records success once the body parsed.
+        """
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            inc("backend.requests", outcome="circuit_open")
+            raise
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                inc("backend.retries")
+                self._sleep_before_retry(attempt - 1, deadline)
+            timeout = self._attempt_timeout(deadline)
+            if timeout is None:
+                inc("backend.requests", outcome="deadline")
+                break
+            try:
+                with span("backend.post"):
+                    response = self.session.post(self.url, timeout=timeout, **request_kwargs)
+            except requests.Timeout as e:
+                inc("backend.requests", outcome="timeout")
+                last_error = PredictError(f"Backend request failed: {e}")
+                continue
+            except requests.ConnectionError as e:
+                inc("backend.requests", outcome="connection_error")
+                last_error = PredictError(f"Backend request failed: {e}")
+                continue
+            except requests.RequestException as e:
+                # Redirect loop, body terputus, URL tidak valid, dst.: tetap gagal milik backend
+                inc("backend.requests", outcome="request_error")
+                last_error = PredictError(f"Backend request failed: {e}")
+                continue
+
+            inc("backend.requests", outcome=str(response.status_code))
+            if response.status_code in self.RETRY_STATUS:
+                last_error = PredictError(f"API Error: Status Code {response.status_code}", response.status_code)
+                continue
+
+            if response.status_code != 200:
+                # Error 4xx/500 bukan masalah jaringan: jangan retry, jangan buka circuit
+                self.breaker.record_success()
+                raise PredictError(f"API Error: Status Code {response.status_code}", response.status_code)
+
+            return response
+
+        if last_error is None:
+            # Deadline habis sebelum percobaan pertama: backend belum terbukti gagal
+            raise PredictError("Request deadline passed before it was sent", 504)
+        self.breaker.record_failure()
+        raise last_error
+
+    def predict(self, features: List[float]) -> dict:
+        """Score one 20-feature row, return the backend's JSON response"""
+        return self.post({"features": list(features)})
+
+    def predict_batch(self, rows: List[List[float]]) -> List[float]:
+        """Score many rows, in one batched POST if the backend accepts it.
+
+        Falls back to concurrent single-row requests over the shared pool when
+        the backend rejects the batch payload; the outcome is remembered.
+        """
+        if len(rows) == 0:
+            return []
+        if time.monotonic() - self._rejected_at >= self.batch_recheck:
+            # Penolakan lama kedaluwarsa: backend mungkin sudah di-deploy ulang
+            if self.batch_supported is False:
+                self.batch_supported = None
+            if self.wire_format_supported is False:
+                self.wire_format_supported = None
+            if self.gzip_supported is False:
+                self.gzip_supported = None
+        if self.batch_supported is not False and len(rows) > 1:
+            # Format biner dulu (kalau belum ditolak), lalu batch JSON; tidak diaktifkan ulang di panggilan yang sama
+            formats = ["json"]
+            if self.wire_format != "json" and self.wire_format_supported is not False:
+                formats.insert(0, self.wire_format)
+            for fmt in formats:
+                try:
+                    probs = self._post_batch(rows, fmt)
+                except PredictError as e:
+                    if e.status_code not in self.BATCH_REJECT_STATUS:
+                        raise
+                    self._rejected_at = time.monotonic()
+                    if fmt == "json":
+                        self.batch_supported = False
+                        break
+                    # Backend tidak paham format biner -> coba batch JSON
+                    inc("backend.wire_fallback", format=fmt)
+                    self.wire_format_supported = False
+                    continue
+                if fmt != "json":
+                    self.wire_format_supported = True
+                self.batch_supported = True
+                return probs
+        rows = [list(map(float, row)) for row in rows]
+        return [r.get("winner_probability", 0) for r in self.aio.predict_many_sync(rows)]
+
+    def _post_batch(self, rows, fmt: str) -> List[float]:
+        """POST rows as one batch body in `fmt` (gzipped when large), return the probabilities.
+
+        A rejected gzipped body is resent uncompressed. Gzip is blamed (and
+        stays off until the next batch_recheck) only if that plain resend
+        succeeds; otherwise the rejection is about the payload itself.
+        """
+        matrix = np.asarray(rows, dtype=np.float64)
+        with span("backend.encode"):
+            plain, content_type = wire.encode_rows(matrix, fmt)
+            body, encoding = wire.maybe_gzip(plain, self.gzip_min_bytes if self.gzip_supported is not False else 0)
+        accept = wire.JSON if fmt == "json" else f"{wire.media_type(fmt)}, {wire.JSON};q=0.5"
+        headers = {"Content-Type": content_type, "Accept": accept}
+        try:
+            response = self._send(data=body, headers={**headers, "Content-Encoding": encoding} if encoding else headers)
+        except PredictError as e:
+            if not encoding or e.status_code not in self.BATCH_REJECT_STATUS:
+                raise
+            response = self._send(data=plain, headers=headers)
+            inc("backend.gzip_fallback")
+            self.gzip_supported = False
+            self._rejected_at = time.monotonic()
+        else:
+            if encoding:
+                self.gzip_supported = True
+        with span("backend.parse"):
+            response_type = response.headers.get("Content-Type")
+            if wire.format_of(response_type) == "json":
+                result = self._json(response)
+                self.breaker.record_success()
+                return self._parse_batch(result, len(matrix))
+            try:
+                probs = wire.decode_probabilities(response.content, response_type)
+            except Exception as e:
+                inc("backend.requests", outcome="bad_body")
+                self.breaker.record_failure()
+                raise PredictError(f"Backend returned an invalid response body: {e}", 502) from e
+        self.breaker.record_success()
+        if len(probs) != len(matrix):
+            raise PredictError("Backend returned an unexpected batch response", 422)
+        return probs.tolist()
+
+    @property
+    def aio(self) -> "AsyncPredictClient":
+        """Lazily created asyncio client sharing this client's retries and breaker"""
+        with self._aio_lock:
+            if self._aio is None:
+                self._aio = AsyncPredictClient(self, self.async_concurrency, self.request_deadline)
+            return self._aio
+
+    @staticmethod
+    def _parse_batch(result: dict, n_rows: int) -> List[float]:
+        probs = result.get("winner_probabilities", result.get("winner_probability"))
+        if not isinstance(probs, list) or len(probs) != n_rows:
+            raise PredictError("Backend returned an unexpected batch response", 422)
+        return [float(p) for p in probs]
+
+    def close(self):
+        self.session.close()
+
+
+class _LoopThread:
+    """One daemon thread running an asyncio event loop for synchronous callers"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="predict-async-loop", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def get(cls) -> "_LoopThread":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def run(self, coro, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+
+class AsyncPredictClient:
+    """asyncio client for the /predict backend with bounded concurrency.
+
+    This is a thread pool behind an asyncio facade, not non-blocking I/O:
+    each request runs the blocking PredictClient.post on a fixed-size
+    executor of `concurrency` threads, so retries, timeouts, the circuit
+    breaker, metrics and error mapping are exactly those of the synchronous
+    client. The per-request `deadline` is passed down to PredictClient.post,
+    which caps each attempt's timeout and stops retrying once it passes, so
+    a request that timed out here frees its thread shortly after instead of
+    retrying in the background.
+    The *_sync wrappers run on a shared background event loop, so they are
+    safe to call from Streamlit script threads.
+    """
+
+    def __init__(self, client: PredictClient, concurrency: int = 16, deadline: Optional[float] = None):
+        self.client = client
+        self.concurrency = concurrency
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="predict-async")
+        # Semaphore terikat ke event loop masing-masing
+        self._semaphores = {}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return self._semaphores[loop]
+
+    async def post(self, payload: dict, deadline: Optional[float] = None) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self.client.post, payload, deadline))
+
+    async def predict(self, features: List[float]) -> dict:
+        """Score one row, waiting for a concurrency slot and honouring the deadline"""
+        async with self._semaphore():
+            deadline = None if self.deadline is None else time.monotonic() + self.deadline
+            try:
+                return await asyncio.wait_for(self.post({"features": [float(x) for x in features]}, deadline),
+                                              self.deadline)
+            except asyncio.TimeoutError:
+                raise PredictError(f"Request exceeded {self.deadline}s deadline", 504) from None
+
+    async def predict_many(self, rows, return_exceptions: bool = False) -> list:
+        """Score rows concurrently; results come back in input order"""
+        return await asyncio.gather(*(self.predict(row) for row in rows), return_exceptions=return_exceptions)
+
+    def predict_many_sync(self, rows, return_exceptions: bool = False, timeout: Optional[float] = None) -> list:
+        """Blocking wrapper around predict_many for script threads"""
+        return _LoopThread.get().run(self.predict_many(rows, return_exceptions), timeout)
+
+    def predict_sync(self, features: List[float], timeout: Optional[float] = None) -> dict:
+        return _LoopThread.get().run(self.predict(features), timeout)
+
+
+def feature_key(features: List[float], decimals: int = 6) -> str:
+    """Canonical hash of a feature vector (rounded so float noise maps to one key)"""
+    rounded = [round(float(x), decimals) + 0.0 for x in features]
+    return hashlib.blake2b(struct.pack(f"<{len(rounded)}d", *rounded), digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    """Thread-safe LRU + TTL cache of backend responses keyed by feature_key().
+
+    With a `store` (store.PredictionStore), every put is also queued for
+    persisting to disk (the store writes asynchronously), and a memory miss
+    is looked up in the store for the current model version before it
+    counts as a miss. Entries from the store keep their stored age.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 600.0, store=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.model_version = None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            model_version = self.model_version
+        stored = self.store.get(key, model_version, self.ttl) if self.store is not None else None
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        value, age = stored
+        self.put_local(key, value, age)
+        return value
+
+    def peek(self, key: str) -> Optional[dict]:
+        """Like get(), but without touching LRU order or hit/miss counters"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                return entry[1]
+            return None
+
+    def put(self, key: str, value: dict):
+        self.put_local(key, value)
+        if self.store is not None:
+            self.store.put(key, value, self.model_version)
+
+    def put_local(self, key: str, value: dict, age: float = 0.0):
+        """Insert into memory only (used for entries read from the store), `age` seconds old"""
+        with self._lock:
+            self._data[key] = (time.monotonic() - age, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def observe_model_version(self, version, invalidate: bool = True) -> bool:
+        """Record the backend's model version, clearing the cache when it changes"""
+        if version is None:
+            return False
+        with self._lock:
+            changed = self.model_version is not None and version != self.model_version
+            if changed and invalidate:
+                self._data.clear()
+            self.model_version = version
+            return changed
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "model_version": self.model_version,
+            }
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution.
+
+    The first caller (leader) runs the function; callers arriving while it is
+    in flight wait up to `timeout` seconds and receive the same result or the
+    same exception.
+    """
+
+    def __init__(self, timeout: Optional[float] = 30.0):
+        self.timeout = timeout
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+            else:
+                self.shared += 1
+
+        if not leader:
+            inc("backend.coalesced")
+            try:
+                return call.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                raise PredictError(f"Timed out after {self.timeout:.1f}s waiting for an identical in-flight request")
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# Jawaban model lokal (surrogate) hanya pengganti sementara backend: tidak di-cache / disimpan
+LOCAL_SOURCE = "local"
+
+
+class LocalProbabilities(list):
+    """Batch probabilities from the local surrogate (never cached by CachedPredictor)"""
+
+
+def is_local_result(result) -> bool:
+    if isinstance(result, dict):
+        return result.get("source") == LOCAL_SOURCE
+    return isinstance(result, LocalProbabilities)
+
+
+class CachedPredictor:
+    """Wrap a predictor so identical feature vectors are answered from the cache.
+
+    Concurrent misses for the same vector (e.g. many sessions submitting the
+    default inputs at lights-out) share one backend call via SingleFlight.
+    Answers from the local surrogate (fallback/race modes) are passed through
+    uncached, so they neither outlive a backend outage nor touch the cache's
+    model version.
+    """
+
+    def __init__(self, predictor, cache: PredictionCache, invalidate_on_model_change: bool = False,
+                 coalesce_timeout: Optional[float] = 30.0):
+        self.predictor = predictor
+        self.cache = cache
+        self.invalidate_on_model_change = invalidate_on_model_change
+        self.flight = SingleFlight(coalesce_timeout)
+
+    def predict(self, features: List[float]) -> dict:
+        key = feature_key(features)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        return self.flight.do(key, lambda: self._fetch(key, features))
+
+    def _fetch(self, key: str, features: List[float]) -> dict:
+        # Leader sebelumnya bisa saja selesai di antara cache miss dan masuk flight
+        cached = self.cache.peek(key)
+        if cached is not None:
+            return cached
+        result = self.predictor.predict(features)
+        if is_local_result(result):
+            return result
+        self.cache.observe_model_version(result.get("model_version"), self.invalidate_on_model_change)
+        self.cache.put(key, result)
+        return result
+
+    def remember_late(self, method: str, arg, result):
+        """Cache a backend answer that arrived after a hedged call already returned.
+
+        Only single-row predictions are kept: a late batch may come from a
+        ``cache=False`` caller (bulk, Monte Carlo).
+        """
+        if method != "predict" or is_local_result(result):
+            return
+        self.cache.observe_model_version(result.get("model_version"), self.invalidate_on_model_change)
+        self.cache.put(feature_key(arg), result)
+
+    def predict_rows(self, rows, cache: bool = True) -> List[float]:
+        """Score many rows, sending only cache misses to the backend in one batch"""
+        probs = [None] * len(rows)
+        for idx, chunk_probs in self.iter_predict_rows(rows, chunk_size=max(len(rows), 1), max_workers=1,
+                                                       cache=cache):
+            for i, prob in zip(idx, chunk_probs):
+                probs[i] = prob
+        return probs
+
+    def iter_predict_rows(self, rows, chunk_size: int = 50, max_workers: int = 4,
+                          cache: bool = True) -> Iterator[Tuple[List[int], List[float]]]:
+        """Yield (row indices, probabilities) as results become available.
+
+        Cached rows are yielded first, then duplicate misses are collapsed and
+        sent in chunks of `chunk_size` rows, up to `max_workers` chunks in flight.
+        With ``cache=False`` (one-off bulk/sample rows) the shared cache is
+        neither read nor filled, so those rows don't evict real predictions.
+        """
+        missing = {}
+        cached_idx, cached_probs = [], []
+        for i, row in enumerate(rows):
+            key = feature_key(row)
+            if key in missing:
+                missing[key][1].append(i)
+                continue
+            cached = self.cache.get(key) if cache else None
+            if cached is not None:
+                cached_idx.append(i)
+                cached_probs.append(cached.get("winner_probability", 0))
+            else:
+                missing[key] = (row, [i])
+        if cached_idx:
+            yield cached_idx, cached_probs
+        if not missing:
+            return
+
+        items = list(missing.items())
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+        def score(chunk):
+            return chunk, self.predictor.predict_batch([row for _, (row, _) in chunk])
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+            for future in as_completed([pool.submit(score, chunk) for chunk in chunks]):
+                chunk, fresh = future.result()
+                store = cache and not is_local_result(fresh)
+                idx, probs = [], []
+                for (key, (_, positions)), prob in zip(chunk, fresh):
+                    if store:
+                        self.cache.put(key, {"winner_probability": prob})
+                    idx.extend(positions)
+                    probs.extend([prob] * len(positions))
+                yield idx, probs
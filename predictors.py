@@ -0,0 +1,143 @@
+"""Predictor implementations behind one interface.
+
+Every predictor exposes ``predict(features) -> dict`` (a backend-style
+response with ``winner_probability``) and ``predict_batch(rows) -> list``.
+``PredictClient`` is the remote implementation; this module adds the
+in-process surrogate model and the combinators used for offline and
+degraded operation.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from features import FEATURE_ORDER
+from metrics import inc
+from predict_client import LOCAL_SOURCE, LocalProbabilities, PredictError
+
+PREDICTOR_MODES = ("remote", "local", "race", "fallback")
+
+
+class LocalModel:
+    """Logistic surrogate over the 20-feature vector, loaded from a JSON artifact"""
+
+    def __init__(self, mean, scale, coef, intercept: float, model_version: str):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.model_version = model_version
+
+    @classmethod
+    def load(cls, path) -> "LocalModel":
+        with open(path, encoding="utf-8") as f:
+            artifact = json.load(f)
+        if artifact["features"] != FEATURE_ORDER:
+            raise ValueError(f"{Path(path).name}: feature order does not match the backend's")
+        return cls(artifact["mean"], artifact["scale"], artifact["coef"],
+                   artifact["intercept"], artifact.get("model_version", "local"))
+
+    def predict_proba(self, matrix) -> np.ndarray:
+        z = (np.atleast_2d(np.asarray(matrix, dtype=np.float64)) - self.mean) / self.scale
+        return 1.0 / (1.0 + np.exp(-(z @ self.coef + self.intercept)))
+
+
+class LocalPredictor:
+    """Score in-process with a LocalModel; no network involved.
+
+    `model` is a LocalModel or a zero-argument factory returning one; a
+    factory is resolved on every call, so a reloaded artifact takes effect
+    without rebuilding the predictor.
+    """
+
+    def __init__(self, model):
+        self._model = model
+
+    @property
+    def model(self) -> LocalModel:
+        return self._model if isinstance(self._model, LocalModel) else self._model()
+
+    def predict(self, features: List[float]) -> dict:
+        model = self.model
+        prob = float(model.predict_proba(features)[0])
+        return {"winner_probability": prob, "model_version": model.model_version, "source": LOCAL_SOURCE}
+
+    def predict_batch(self, rows) -> List[float]:
+        if len(rows) == 0:
+            return LocalProbabilities()
+        return LocalProbabilities(self.model.predict_proba(rows).tolist())
+
+
+class RacePredictor:
+    """Hedged call: prefer the primary, use the secondary if the primary is slow or fails.
+
+    The primary gets `hedge_after` seconds; after that (or as soon as it
+    fails) the secondary answers. A primary answer that arrives after the
+    secondary was used is handed to `on_late(method, arg, result)`, e.g. to
+    cache it for the next identical request.
+    """
+
+    def __init__(self, primary, secondary, hedge_after: float = 0.5, on_late=None):
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge_after = hedge_after
+        self.on_late = on_late
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="race-predict")
+
+    def _race(self, method: str, arg):
+        future = self._pool.submit(getattr(self.primary, method), arg)
+        try:
+            return future.result(timeout=self.hedge_after)
+        except FutureTimeoutError:
+            inc("predictor.hedged", method=method)
+            future.add_done_callback(lambda f: self._late(method, arg, f))
+        except Exception:
+            inc("predictor.hedged", method=method)
+        return getattr(self.secondary, method)(arg)
+
+    def _late(self, method: str, arg, future):
+        if self.on_late is not None and future.exception() is None:
+            self.on_late(method, arg, future.result())
+
+    def predict(self, features: List[float]) -> dict:
+        return self._race("predict", features)
+
+    def predict_batch(self, rows) -> List[float]:
+        return self._race("predict_batch", rows)
+
+
+class FallbackPredictor:
+    """Use the primary predictor, switching to the secondary when it fails"""
+
+    def __init__(self, primary, secondary):
+        self.primary = primary
+        self.secondary = secondary
+
+    def predict(self, features: List[float]) -> dict:
+        try:
+            return self.primary.predict(features)
+        except PredictError:
+            return self.secondary.predict(features)
+
+    def predict_batch(self, rows) -> List[float]:
+        try:
+            return self.primary.predict_batch(rows)
+        except PredictError:
+            return self.secondary.predict_batch(rows)
+
+
+def build_predictor(mode: str, remote, local_factory, hedge_after: float = 0.5):
+    """Compose the predictor for a config mode; `local_factory` is called per local prediction"""
+    if mode not in PREDICTOR_MODES:
+        raise ValueError(f"Unknown predictor mode {mode!r}, expected one of {PREDICTOR_MODES}")
+    if mode == "remote":
+        return remote
+    local = LocalPredictor(local_factory)
+    if mode == "local":
+        return local
+    if mode == "race":
+        return RacePredictor(remote, local, hedge_after)
+    return FallbackPredictor(remote, local)
@@ -0,0 +1,284 @@
+"""Persistent prediction store (SQLite) behind the in-memory PredictionCache.
+
+Every cache put is queued to one writer thread that commits in batches, so
+the request path never waits on disk. At startup the newest rows of the
+current model version are loaded into the cache, and a memory miss is
+looked up here before calling the backend, so a fresh container answers
+common inputs without the backend. Rows are keyed by (feature_key, model_version). The
+store is compacted by age and row count, and it can be copied between nodes
+as a plain SQLite file:
+
+    python -m store export predictions_node1.sqlite --db data/predictions.sqlite
+    python -m store import predictions_node1.sqlite --db data/predictions.sqlite
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from metrics import inc
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    key TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    probability REAL NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (key, model_version)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS predictions_created_at ON predictions (created_at);
+"""
+
+# Baris yang lebih baru menang saat import / tulis ulang
+_UPSERT = """
+INSERT INTO predictions (key, model_version, probability, created_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (key, model_version) DO UPDATE SET
+    probability = excluded.probability, created_at = excluded.created_at
+WHERE excluded.created_at > predictions.created_at
+"""
+
+
+def connect(path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=30.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class PredictionStore:
+    """SQLite table of predictions with an asynchronous, batching writer thread.
+
+    The writer also compacts: once at startup and again after every
+    `max_rows // 10` writes, so the table stays near `max_rows`. The row
+    counts in stats() are cached for `stats_ttl` seconds, since the sidebar
+    asks for them on every rerun of every session.
+    """
+
+    def __init__(self, path, max_age: float = 7 * 86400, max_rows: int = 200_000,
+                 queue_size: int = 100_000, batch_size: int = 1000, stats_ttl: float = 10.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._conn = connect(self.path)
+        self._lock = threading.Lock()
+        # Koneksi baca terpisah: dengan WAL, lookup saat cache miss tidak menunggu batch writer
+        self._reader = connect(self.path)
+        self._read_lock = threading.Lock()
+        # Counter dinaikkan dari thread script, writer dan pool async sekaligus
+        self._counter_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.written = 0
+        self.dropped = 0
+        self.stats_ttl = stats_ttl
+        self._counts = None
+        self._counted_at = 0.0
+        self._writer = threading.Thread(target=self._run, name="prediction-store", daemon=True)
+        self._writer.start()
+
+    def put(self, key: str, value: dict, model_version=None):
+        """Queue one prediction for writing; never blocks (dropped if the queue is full)"""
+        version = value.get("model_version", model_version)
+        row = (key, "" if version is None else str(version), float(value.get("winner_probability", 0)), time.time())
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._counter_lock:
+                self.dropped += 1
+            inc("store.dropped")
+
+    def _run(self):
+        self.compact()
+        compacted_at = 0
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < self.batch_size:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._lock, self._conn:
+                    self._conn.executemany(_UPSERT, rows)
+                with self._counter_lock:
+                    self.written += len(rows)
+                inc("store.written", len(rows))
+                if self.written - compacted_at >= max(self.max_rows // 10, 1):
+                    compacted_at = self.written
+                    self.compact()
+            except sqlite3.Error:
+                inc("store.failed", len(rows))
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued prediction is committed"""
+        self._queue.join()
+
+    @staticmethod
+    def _value(probability: float, version: str) -> dict:
+        value = {"winner_probability": probability}
+        if version:
+            value["model_version"] = version
+        return value
+
+    def get(self, key: str, model_version=None, max_age: Optional[float] = None):
+        """(value, age in seconds) of the newest stored prediction for `key`, or None.
+
+        With `model_version`, only rows of that version count. `max_age`
+        (e.g. the cache TTL) tightens the store's own max_age.
+        """
+        max_age = self.max_age if max_age is None else min(max_age, self.max_age)
+        query = "SELECT probability, model_version, created_at FROM predictions WHERE key = ? AND created_at >= ?"
+        params = [key, time.time() - max_age]
+        if model_version is not None:
+            query += " AND model_version = ?"
+            params.append(str(model_version))
+        with self._read_lock:
+            row = self._reader.execute(query + " ORDER BY created_at DESC LIMIT 1", params).fetchone()
+        with self._counter_lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if row is None:
+            inc("store.lookup", outcome="miss")
+            return None
+        inc("store.lookup", outcome="hit")
+        probability, version, created_at = row
+        return self._value(probability, version), max(time.time() - created_at, 0.0)
+
+    def latest_model_version(self) -> Optional[str]:
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT model_version FROM predictions ORDER BY created_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def warm(self, cache, limit: int, model_version=None) -> int:
+        """Load the newest `limit` predictions into `cache` (newest last, so it is most recently used).
+
+        Only rows of one model version are loaded: `model_version`, else the
+        cache's, else the newest in the store. Rows keep their stored age, so
+        nothing older than the cache TTL is loaded and each entry expires
+        when it would have had it never left memory.
+        """
+        version = model_version or cache.model_version or self.latest_model_version()
+        if version is None:
+            return 0
+        now = time.time()
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT key, probability, created_at FROM predictions WHERE model_version = ? AND created_at >= ? "
+                "ORDER BY created_at DESC LIMIT ?", (str(version), now - min(self.max_age, cache.ttl), limit),
+            ).fetchall()
+        for key, probability, created_at in reversed(rows):
+            # put_local: tanpa menulis balik ke store
+            cache.put_local(key, self._value(probability, version), age=max(now - created_at, 0.0))
+        if version and cache.model_version is None:
+            cache.model_version = version
+        inc("store.warmed", len(rows))
+        return len(rows)
+
+    def compact(self, vacuum: bool = False) -> int:
+        """Delete rows older than max_age and beyond the newest max_rows; return rows removed"""
+        with self._lock, self._conn:
+            removed = self._conn.execute("DELETE FROM predictions WHERE created_at < ?",
+                                         (time.time() - self.max_age,)).rowcount
+            cutoff = self._conn.execute("SELECT created_at FROM predictions ORDER BY created_at DESC "
+                                        "LIMIT 1 OFFSET ?", (self.max_rows,)).fetchone()
+            if cutoff is not None:
+                removed += self._conn.execute("DELETE FROM predictions WHERE created_at <= ?", cutoff).rowcount
+        if vacuum:
+            with self._lock:
+                self._conn.execute("VACUUM")
+        inc("store.compacted", removed)
+        return removed
+
+    def export(self, dest) -> int:
+        """Write a consistent, compacted copy of the store to `dest`; return its row count"""
+        self.flush()
+        dest = Path(dest)
+        if dest.exists():
+            os.remove(dest)
+        with self._lock:
+            self._conn.execute("VACUUM INTO ?", (str(dest),))
+            return self._conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def import_from(self, source) -> int:
+        """Merge another store file into this one (newer rows win); return rows inserted or updated"""
+        self.flush()
+        with self._lock:
+            self._conn.execute("ATTACH DATABASE ? AS incoming", (str(source),))
+            try:
+                with self._conn:
+                    before = self._conn.total_changes
+                    self._conn.execute(
+                        "INSERT INTO predictions (key, model_version, probability, created_at) "
+                        "SELECT key, model_version, probability, created_at FROM incoming.predictions WHERE true "
+                        + _UPSERT[_UPSERT.index("ON CONFLICT"):]
+                    )
+                    return self._conn.total_changes - before
+            finally:
+                self._conn.execute("DETACH DATABASE incoming")
+
+    def _row_counts(self):
+        """(rows, model versions), counted at most once per stats_ttl on the reader connection"""
+        now = time.monotonic()
+        with self._read_lock:
+            if self._counts is None or now - self._counted_at >= self.stats_ttl:
+                # Koneksi baca (WAL): COUNT(*) tidak menahan writer maupun compact
+                self._counts = self._reader.execute(
+                    "SELECT COUNT(*), COUNT(DISTINCT model_version) FROM predictions").fetchone()
+                self._counted_at = now
+            return self._counts
+
+    def stats(self) -> dict:
+        rows, versions = self._row_counts()
+        with self._counter_lock:
+            counters = {"written": self.written, "dropped": self.dropped, "hits": self.hits, "misses": self.misses}
+        return {
+            "rows": rows,
+            "model_versions": versions,
+            "bytes": sum(p.stat().st_size for p in (self.path, Path(f"{self.path}-wal")) if p.exists()),
+            "pending": self._queue.qsize(),
+            **counters,
+        }
+
+    @classmethod
+    def open(cls, path, **kwargs) -> Optional["PredictionStore"]:
+        """Store at `path`, or None when persistence is disabled (empty path)"""
+        return cls(path, **kwargs) if path else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect, compact, export or import the prediction store")
+    parser.add_argument("command", choices=["stats", "compact", "export", "import"])
+    parser.add_argument("file", nargs="?", type=Path, help="Destination (export) or source (import) store")
+    parser.add_argument("--db", type=Path, default=Path("data/predictions.sqlite"))
+    parser.add_argument("--max-age-days", type=float, default=7.0)
+    parser.add_argument("--max-rows", type=int, default=200_000)
+    args = parser.parse_args()
+    if args.command in ("export", "import") and args.file is None:
+        parser.error(f"{args.command} needs a store file")
+
+    store = PredictionStore(args.db, max_age=args.max_age_days * 86400, max_rows=args.max_rows)
+    if args.command == "compact":
+        print(f"Removed {store.compact(vacuum=True):,} rows")
+    elif args.command == "export":
+        print(f"Exported {store.export(args.file):,} rows to {args.file}")
+    elif args.command == "import":
+        print(f"Merged {store.import_from(args.file):,} rows from {args.file}")
+    print(store.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,27 @@
 import streamlit as st
-import requests
 import numpy as np
-import json
-from typing import List
-import plotly.graph_objects as go
-import plotly.express as px
 import base64
+import os
+import tempfile
 from pathlib import Path
 
+# Plotly (charts), pandas (rank_grid) dan bulk_scoring diimpor lazy di tempat pemakaiannya:
+# cold start tidak perlu menunggu library berat yang baru dipakai setelah prediksi
+from content import ABOUT_HTML, FOOTER_HTML, header_html
+from features import (
+    REQUIRED_RAW_COLUMNS, engineer_features, expand_for_drivers, features_to_dict, format_input_data, sweep_inputs,
+)
+from metrics import REGISTRY, Span, serve_prometheus, span, timed
+from predict_client import CachedPredictor, CircuitOpenError, PredictClient, PredictError, PredictionCache, feature_key
+from drivers import DriverRegistry
+from history import PredictionHistory
+from live_feed import LiveBoard
+from telemetry import TelemetryStore, meta_path
+from uncertainty import estimated_positions, monte_carlo
+from predictors import LocalModel, RacePredictor, build_predictor
+from store import PredictionStore
+from surface import SurfaceBuilder
+
 # 1. Configurasi Pages
 st.set_page_config(
     page_title="F1 GP Winner Predictor 2025",
@@ -15,39 +29,66 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="collapsed"
 )
+rerun_span = Span("rerun.total")
+
+# 2. Helper konfigurasi (st.secrets dengan fallback default)
+def get_setting(section, key, default=None):
+    """Read a value from st.secrets, falling back to a default"""
+    try:
+        return st.secrets[section][key]
+    except Exception:
+        return default
+
+# 3. Function to load background image
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _encode_background(image_path, mtime, size):
+    """Read and base64-encode an image once per (path, mtime, size)"""
+    with open(image_path, "rb") as img_file:
+        return base64.b64encode(img_file.read()).decode()
 
-# 2. Function to load background image
-def get_base64_image(image_path):
-    """Convert image to base64 for CSS background"""
+def background_key(image_path):
+    """Return (path, mtime, size) so cached assets refresh when the image changes"""
     try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except:
-        return None
-
-# Load background image (letakkan gambar dengan nama 'f1_background.jpg' di folder yang sama)
-bg_image_path = Path("Ferrari.jpg")  # Ganti dengan nama file gambar Anda
-bg_base64 = get_base64_image(bg_image_path)
-
-# 3. Custom F1 Styles with Background
-if bg_base64:
-    background_style = f"""
+        stat = Path(image_path).stat()
+        return str(image_path), stat.st_mtime, stat.st_size
+    except OSError:
+        return str(image_path), None, None
+
+# Mode background: "inline" (base64 di dalam CSS) atau "static" (URL dari folder static/,
+# butuh server.enableStaticServing = true di .streamlit/config.toml)
+BACKGROUND_IMAGE = get_setting("ui", "BACKGROUND_IMAGE", "Ferrari.jpg")  # Ganti dengan nama file gambar Anda
+BACKGROUND_MODE = get_setting("ui", "BACKGROUND_MODE", "inline")
+COMBINED_CHARTS = bool(get_setting("ui", "COMBINED_CHARTS", False))
+
+def _background_style(image_path, mtime, size, mode):
+    """Build the .stApp background rule for the configured image mode"""
+    if mode == "static":
+        image_url = f"app/static/{Path(image_path).name}"
+    else:
+        image_url = f"data:image/jpg;base64,{_encode_background(image_path, mtime, size)}"
+    return f"""
     .stApp {{
-        background-image: linear-gradient(rgba(0, 0, 0, 0.85), rgba(0, 0, 0, 0.85)), url("data:image/jpg;base64,{bg_base64}");
+        background-image: linear-gradient(rgba(0, 0, 0, 0.85), rgba(0, 0, 0, 0.85)), url("{image_url}");
         background-size: cover;
         background-position: center;
         background-repeat: no-repeat;
         background-attachment: fixed;
     }}
     """
-else:
-    background_style = """
+
+# 4. Custom F1 Styles with Background
+@st.cache_resource(show_spinner=False, max_entries=4)
+def build_stylesheet(image_path, mtime, size, mode):
+    """Render the global <style> block once per background image version"""
+    if mtime is not None:
+        background_style = _background_style(image_path, mtime, size, mode)
+    else:
+        background_style = """
     .stApp {
         background: linear-gradient(135deg, #1a1a1a 0%, #2d0a0a 50%, #1a1a1a 100%);
     }
     """
-
-st.markdown(f"""
+    return f"""
 <style>
 {background_style}
 
@@ -131,6 +172,13 @@ div.stButton > button:first-child:hover {{
     box-shadow: 0 4px 20px rgba(255, 0, 0, 0.3);
 }}
 
+/* About cards row (3 kolom, turun jadi 1 kolom di layar kecil) */
+.about-grid {{
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(260px, 1fr));
+    gap: 2rem;
+}}
+
 /* Input containers */
 .stNumberInput, .stSlider {{
     background: rgba(43, 43, 43, 0.6);
@@ -159,378 +207,439 @@ div.stButton > button:first-child:hover {{
     box-shadow: 0 8px 30px rgba(255, 0, 0, 0.6);
 }}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+bg_image_path = Path("static") / BACKGROUND_IMAGE if BACKGROUND_MODE == "static" else Path(BACKGROUND_IMAGE)
+with span("rerun.background"):
+    bg_key = background_key(bg_image_path)
+    if bg_key[1] is not None and BACKGROUND_MODE != "static":
+        _encode_background(*bg_key)
+with span("rerun.css"):
+    st.markdown(build_stylesheet(*bg_key, BACKGROUND_MODE), unsafe_allow_html=True)
 
-# 4. Load API URL
+# 5. Load API URL
 try:
     API_URL = st.secrets["api"]["FASTAPI_URL"]
 except:
     API_URL = "https://web-production-24d62.up.railway.app/predict"
 
-# 5. Fungsi format Data
-def format_input_data(inputs: dict) -> List[float]:
-    """Convert dictionary to ordered list of 20 features for backend"""
-    feature_order = [
-        'Year', 'GridPosition', 'LapTime (s)', 'BestQuali (s)', 'RacePace (s)',
-        'Sector1Time (s)', 'Sector2Time (s)', 'Sector3Time (s)', 
-        'SectorTimeConsistency', 'QualiAdvantage', 'PositionImprovement',
-        'RacePaceEfficiency', 'Sector1Ratio', 'Sector2Ratio', 'Sector3Ratio',
-        'TimeDiffFromFastest', 'DriverEncoded', 'AvgPrevPositions', 'AvgPrevPoints', 'Dummy'
-    ]
-    
-    result = []
-    for key in feature_order:
-        if key == 'Dummy':
-            result.append(0.0)
-        else:
-            result.append(float(inputs[key]))
-    
-    if len(result) != 20:
-        raise ValueError(f"Expected 20 features, got {len(result)}")
-    
-    return result
-
-# 6. Fungsi Visualisasi
-def create_speedometer(probability):
-    """Create a speedometer gauge chart"""
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number+delta",
-        value = probability * 100,
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        title = {'text': "Win Probability", 'font': {'size': 28, 'color': 'white', 'family': 'Arial Black'}},
-        delta = {'reference': 50, 'increasing': {'color': "#00ff00"}, 'font': {'size': 20}},
-        number = {'font': {'size': 50, 'color': '#ff0000', 'family': 'Arial Black'}, 'suffix': '%'},
-        gauge = {
-            'axis': {'range': [None, 100], 'tickwidth': 2, 'tickcolor': "white", 'tickfont': {'size': 14}},
-            'bar': {'color': "#ff0000", 'thickness': 0.8},
-            'bgcolor': "rgba(255,255,255,0.2)",
-            'borderwidth': 3,
-            'bordercolor': "#ff0000",
-            'steps': [
-                {'range': [0, 15], 'color': 'rgba(150, 150, 150, 0.3)'},
-                {'range': [15, 35], 'color': 'rgba(255, 255, 0, 0.3)'},
-                {'range': [35, 100], 'color': 'rgba(0, 255, 0, 0.3)'}
-            ],
-            'threshold': {
-                'line': {'color': "white", 'width': 4},
-                'thickness': 0.75,
-                'value': 90
-            }
-        }
-    ))
-    
-    fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font={'color': "white", 'family': "Arial"},
-        height=350,
-        margin=dict(l=20, r=20, t=80, b=20)
+@st.cache_resource(show_spinner=False)
+def get_predict_client(url):
+    """One pooled keep-alive client per process, shared by all sessions"""
+    return PredictClient(
+        url,
+        pool_size=int(get_setting("api", "POOL_SIZE", 10)),
+        connect_timeout=float(get_setting("api", "CONNECT_TIMEOUT", 3.05)),
+        read_timeout=float(get_setting("api", "READ_TIMEOUT", 10.0)),
+        max_retries=int(get_setting("api", "MAX_RETRIES", 2)),
+        failure_threshold=int(get_setting("api", "BREAKER_FAILURES", 5)),
+        reset_timeout=float(get_setting("api", "BREAKER_RESET_SECONDS", 30.0)),
+        async_concurrency=int(get_setting("api", "ASYNC_CONCURRENCY", 16)),
+        request_deadline=get_setting("api", "REQUEST_DEADLINE", None),
+        wire_format=get_setting("api", "WIRE_FORMAT", "json"),
+        gzip_min_bytes=int(get_setting("api", "GZIP_MIN_BYTES", 64 * 1024)),
+        batch_recheck=float(get_setting("api", "BATCH_RECHECK_SECONDS", 300.0)),
     )
-    
-    return fig
-
-def create_sector_comparison(s1, s2, s3):
-    """Create sector time comparison bar chart"""
-    fig = go.Figure(data=[
-        go.Bar(
-            x=['Sector 1', 'Sector 2', 'Sector 3'],
-            y=[s1, s2, s3],
-            marker=dict(
-                color=['#ff0000', '#ffffff', '#ff0000'],
-                line=dict(color='#ff0000', width=3),
-                pattern_shape=["", "/", ""]
-            ),
-            text=[f'{s1:.3f}s', f'{s2:.3f}s', f'{s3:.3f}s'],
-            textposition='outside',
-            textfont=dict(size=16, color='white', family='Arial Black')
-        )
-    ])
-    
-    fig.update_layout(
-        title={
-            'text': "Sector Time Analysis",
-            'font': {'size': 24, 'color': 'white', 'family': 'Arial Black'},
-            'x': 0.5,
-            'xanchor': 'center'
-        },
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(43,43,43,0.6)',
-        font={'color': "white", 'size': 14},
-        yaxis_title="Time (seconds)",
-        yaxis_title_font={'size': 16, 'color': 'white'},
-        xaxis_tickfont={'size': 14, 'color': 'white'},
-        height=350,
-        showlegend=False,
-        margin=dict(l=50, r=30, t=80, b=50)
+
+PREDICTOR_MODE = get_setting("api", "PREDICTOR", "remote")
+LOCAL_MODEL_PATH = get_setting("api", "LOCAL_MODEL_PATH", "models/local_surrogate.json")
+
+@st.cache_resource(show_spinner=False)
+def get_local_model(path, mtime):
+    """Load the in-process surrogate model once per artifact version"""
+    return LocalModel.load(path)
+
+@st.cache_resource(show_spinner=False)
+def get_prediction_store(path):
+    """Persistent SQLite store behind the cache (None when STORE_FILE is empty)"""
+    return PredictionStore.open(
+        path,
+        max_age=float(get_setting("cache", "STORE_MAX_AGE_DAYS", 7.0)) * 86400,
+        max_rows=int(get_setting("cache", "STORE_MAX_ROWS", 200_000)),
     )
-    
-    return fig
 
-def create_performance_radar(inputs):
-    """Create radar chart for driver performance"""
-    categories = ['Qualifying', 'Race Pace', 'Consistency', 'Experience', 'Grid Position']
-    
-    # Normalize values to 0-100 scale
-    quali_score = max(0, min(100, 100 - (inputs['BestQuali (s)'] - 75) * 10))
-    pace_score = max(0, min(100, 100 - (inputs['RacePace (s)'] - 75) * 10))
-    consistency_score = max(0, min(100, 100 - inputs['SectorTimeConsistency'] * 50))
-    experience_score = min(100, (inputs['AvgPrevPoints'] / 25) * 100)
-    grid_score = (21 - inputs['GridPosition']) * 5
-    
-    values = [quali_score, pace_score, consistency_score, experience_score, grid_score]
-    
-    fig = go.Figure(data=go.Scatterpolar(
-        r=values,
-        theta=categories,
-        fill='toself',
-        fillcolor='rgba(255, 0, 0, 0.4)',
-        line=dict(color='#ff0000', width=3),
-        marker=dict(size=8, color='#ff0000')
-    ))
-    
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100],
-                gridcolor='rgba(255, 255, 255, 0.3)',
-                tickfont={'size': 12, 'color': 'white'}
-            ),
-            angularaxis=dict(
-                gridcolor='rgba(255, 255, 255, 0.3)',
-                tickfont={'size': 14, 'color': 'white', 'family': 'Arial Black'}
-            ),
-            bgcolor='rgba(43,43,43,0.6)'
-        ),
-        paper_bgcolor='rgba(0,0,0,0)',
-        font={'color': "white"},
-        title={
-            'text': "Driver Performance Profile",
-            'font': {'size': 24, 'color': 'white', 'family': 'Arial Black'},
-            'x': 0.5,
-            'xanchor': 'center'
-        },
-        height=450,
-        margin=dict(l=80, r=80, t=100, b=50)
+@st.cache_resource(show_spinner=False)
+def get_predictor(url, mode):
+    """Process-wide cached predictor; identical inputs from any session skip the POST"""
+    store = get_prediction_store(get_setting("cache", "STORE_FILE", "data/predictions.sqlite"))
+    cache = PredictionCache(
+        max_entries=int(get_setting("cache", "MAX_ENTRIES", 2048)),
+        ttl=float(get_setting("cache", "TTL_SECONDS", 600.0)),
+        store=store,
     )
-    
-    return fig
-
-def create_comparison_metrics(inputs):
-    """Create comparison bar chart for key metrics"""
-    metrics = ['Quali Advantage', 'Race Efficiency', 'Position Improvement']
-    values = [
-        inputs['QualiAdvantage'] * 10,  # Scaled for visibility
-        inputs['RacePaceEfficiency'] * 100,
-        abs(inputs['PositionImprovement']) * 5
-    ]
-    colors = ['#ff0000' if v > 0 else '#666666' for v in values]
-    
-    fig = go.Figure(data=[
-        go.Bar(
-            y=metrics,
-            x=values,
-            orientation='h',
-            marker=dict(
-                color=colors,
-                line=dict(color='white', width=2)
-            ),
-            text=[f'{v:.1f}' for v in values],
-            textposition='outside',
-            textfont=dict(size=16, color='white', family='Arial Black')
-        )
-    ])
-    
-    fig.update_layout(
-        title={
-            'text': "Key Performance Metrics",
-            'font': {'size': 24, 'color': 'white', 'family': 'Arial Black'},
-            'x': 0.5,
-            'xanchor': 'center'
-        },
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(43,43,43,0.6)',
-        font={'color': "white"},
-        xaxis_title="Score",
-        height=350,
-        showlegend=False,
-        margin=dict(l=150, r=50, t=80, b=50)
+    if store is not None:
+        # Warm start: prediksi terbaru dari disk langsung tersedia setelah restart/deploy
+        store.warm(cache, cache.max_entries, get_setting("cache", "STORE_MODEL_VERSION", "") or None)
+    client = get_predict_client(url)
+    predictor = build_predictor(
+        mode,
+        client,
+        # Dipanggil tiap prediksi lokal: artifact yang diganti (mtime baru) langsung dipakai
+        lambda: get_local_model(LOCAL_MODEL_PATH, os.path.getmtime(LOCAL_MODEL_PATH)),
+        hedge_after=float(get_setting("api", "HEDGE_AFTER", 0.5)),
+    )
+    cached = CachedPredictor(
+        predictor,
+        cache,
+        invalidate_on_model_change=bool(get_setting("cache", "INVALIDATE_ON_MODEL_CHANGE", False)),
+        # Default: selama worst case leader (semua retry timeout), supaya penumpang tidak menyerah lebih dulu
+        coalesce_timeout=float(get_setting("cache", "COALESCE_TIMEOUT", 0.0)) or client.worst_case_seconds,
+    )
+    if isinstance(predictor, RacePredictor):
+        # Jawaban backend yang telat tetap masuk cache untuk request identik berikutnya
+        predictor.on_late = cached.remember_late
+    return cached
+
+# 6. Fungsi ranking grid
+def rank_grid(driver_ids, probabilities, labels):
+    """Ranked table of raw win probabilities and their normalized share of the field"""
+    import pandas as pd
+
+    probs = np.asarray(probabilities, dtype=np.float64)
+    total = probs.sum()
+    share = probs / total if total > 0 else np.full_like(probs, 1 / len(probs))
+    table = pd.DataFrame({
+        "Driver": np.asarray(labels)[np.asarray(driver_ids, dtype=np.intp)],
+        "Win Probability": probs * 100,
+        "Field Share": share * 100,
+    }).sort_values("Win Probability", ascending=False, kind="stable")
+    table.insert(0, "Rank", np.arange(1, len(table) + 1))
+    return table.reset_index(drop=True)
+
+def race_table(labels, race: dict):
+    """Per-driver simulation outcomes, ordered by expected points"""
+    import pandas as pd
+
+    table = pd.DataFrame({
+        "Driver": np.asarray(labels),
+        "P(Win)": race["win"] * 100,
+        "P(Podium)": race["podium"] * 100,
+        "Exp. Points": race["points"],
+        "Avg. Finish": race["mean_position"],
+    }).sort_values("Exp. Points", ascending=False, kind="stable")
+    table.insert(0, "Rank", np.arange(1, len(table) + 1))
+    return table.reset_index(drop=True)
+
+# 7. Registry driver & musim (data/drivers.json); dimuat ulang otomatis saat file berubah
+DRIVERS_FILE = get_setting("data", "DRIVERS_FILE", "data/drivers.json")
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_driver_registry(path, mtime):
+    """Load the driver/season registry once per file version"""
+    return DriverRegistry.load(path)
+
+def driver_registry():
+    return get_driver_registry(DRIVERS_FILE, os.path.getmtime(DRIVERS_FILE))
+
+def selected_season():
+    """Season and circuit picked in the input panel, falling back to the file's defaults"""
+    registry = driver_registry()
+    year = st.session_state.get("season")
+    season = registry.season(year if year in registry.seasons else None)
+    circuit = st.session_state.get("circuit")
+    return season, circuit if circuit in season.circuits else season.default_circuit
+
+# 8. Riwayat prediksi per sesi (kolom NumPy, kapasitas tetap, LRU)
+HISTORY_MAX_ROWS = int(get_setting("history", "MAX_ROWS", 50))
+
+def session_history():
+    history = st.session_state.get("history")
+    if history is None or history.capacity != HISTORY_MAX_ROWS:
+        history = st.session_state["history"] = PredictionHistory(HISTORY_MAX_ROWS)
+    return history
+
+# 9. Mode ketidakpastian (Monte Carlo)
+UNCERTAINTY_SAMPLES = int(get_setting("uncertainty", "SAMPLES", 1000))
+UNCERTAINTY_LAP_SIGMA = float(get_setting("uncertainty", "LAP_SIGMA", 0.15))
+UNCERTAINTY_SECTOR_SIGMA = float(get_setting("uncertainty", "SECTOR_SIGMA", 0.08))
+UNCERTAINTY_LEVEL = float(get_setting("uncertainty", "LEVEL", 0.9))
+
+# 10. Simulasi balapan (Plackett-Luce)
+RACE_SIMULATIONS = int(get_setting("race_sim", "SIMULATIONS", 100_000))
+
+# 11. Telemetry lokal (python -m telemetry ...) untuk mengisi input lap/sector
+TELEMETRY_DIR = get_setting("telemetry", "STORE_DIR", "data/telemetry")
+# Kolom mentah -> key widget + nilai awal
+LAP_INPUTS = {
+    'LapTime (s)': ("lap_time", 80.500),
+    'BestQuali (s)': ("best_quali", 79.900),
+    'RacePace (s)': ("race_pace", 81.200),
+    'Sector1Time (s)': ("sector1", 25.000),
+    'Sector2Time (s)': ("sector2", 28.000),
+    'Sector3Time (s)': ("sector3", 27.500),
+}
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_telemetry_store(path, mtime):
+    """Memory-map the telemetry store once per ingested version"""
+    return TelemetryStore.load(path)
+
+def telemetry_store():
+    meta = meta_path(TELEMETRY_DIR)
+    return get_telemetry_store(TELEMETRY_DIR, os.path.getmtime(meta)) if meta.exists() else None
+
+def load_session_inputs(year, circuit, driver_id, label):
+    """on_click: fill the lap/sector widgets from the telemetry store"""
+    found = telemetry_store().session_inputs(year, circuit, driver_id)
+    if found is None:
+        st.session_state["telemetry_status"] = f"⚠️ Tidak ada lap untuk {label} di {circuit} {year}."
+        return
+    for column, (key, _) in LAP_INPUTS.items():
+        if column in found:
+            st.session_state[key] = round(found[column], 3)
+    st.session_state["telemetry_status"] = f"📡 Diisi dari {found['laps']:,} lap {label} ({circuit} {year})."
+
+# 12. Live race mode: feed JSONL lap per lap, satu board dibagi semua viewer
+LIVE_FEED_FILE = get_setting("live", "FEED_FILE", "")
+LIVE_REFRESH_SECONDS = float(get_setting("live", "REFRESH_SECONDS", 5.0))
+
+@st.cache_resource(show_spinner=False)
+def get_live_board(path, n_drivers):
+    """Process-wide tailer + aggregates; ticks are shared by every viewer"""
+    return LiveBoard(path, n_drivers, pace_window=int(get_setting("live", "PACE_WINDOW", 5)),
+                     min_interval=LIVE_REFRESH_SECONDS / 2)
+
+# 13. Surface probabilitas (grid x lap x quali per driver) untuk preview slider tanpa request
+# Default mati: tiap konteks baru = ratusan-ribuan baris ke backend (kecuali PREDICTOR = "local")
+SURFACE_ENABLED = bool(get_setting("surface", "ENABLED", False))
+
+@st.cache_resource(show_spinner=False)
+def get_surface_builder():
+    """One background builder and surface LRU per process"""
+    return SurfaceBuilder(
+        lap_span=float(get_setting("surface", "LAP_SPAN", 2.0)),
+        points=int(get_setting("surface", "POINTS", 9)),
+        max_surfaces=int(get_setting("surface", "MAX_SURFACES", 16)),
+        ttl=float(get_setting("cache", "TTL_SECONDS", 600.0)),
+        max_rows=int(get_setting("surface", "MAX_ROWS", 1000)),
+        max_new_per_minute=int(get_setting("surface", "MAX_NEW_PER_MINUTE", 6)),
     )
-    
-    return fig
 
 # ============ HEADER SECTION ============
-st.markdown("""
-<div class='header-banner'>
-    <div style='text-align: center;'>
-        <h1 style='font-size: 3.5rem; margin-bottom: 10px; color: white !important; text-shadow: 3px 3px 10px #000000;'>
-            🏎️ F1 WINNER PREDICTOR 🏎️
-        </h1>
-        <h2 style='color: #ff0000 !important; font-weight: bold; margin-top: 5px; font-size: 2.2rem; text-shadow: 2px 2px 8px #000000;'>
-            MEXICO CITY GRAND PRIX 2025
-        </h2>
-        <p style='color: white; font-size: 1.2rem; margin-top: 15px; font-weight: bold;'>
-            ⚡ Predict • Analyze • Win ⚡
-        </p>
-    </div>
-</div>
-""", unsafe_allow_html=True)
-
-# ============ INPUT SECTION ============
-st.markdown("<h3 style='text-align: center; color: white !important; margin-bottom: 30px;'>🚦 DRIVER PERFORMANCE INPUT</h3>", unsafe_allow_html=True)
-
-col1, col2, col3 = st.columns(3, gap="large")
-
-with col1:
-    st.markdown("#### 🏁 Starting Position")
-    GridPosition = st.slider("Grid Position", 1, 20, 5, help="Posisi start pada kualifikasi")
-    
-    st.markdown("#### 🔥 Speed Performance")
-    LapTime = st.number_input("Best Lap Time (s)", value=80.500, step=0.001, format="%.3f")
-    BestQuali = st.number_input("Best Quali Time (s)", value=79.900, step=0.001, format="%.3f")
+header_season, header_circuit = selected_season()
+# Event yang tampil di header; panel prediksi me-rerun seluruh halaman kalau pilihan musim/sirkuit berubah
+st.session_state["header_event"] = (header_season.year, header_circuit)
+st.markdown(header_html(header_season.circuit_name(header_circuit), header_season.year), unsafe_allow_html=True)
 
-with col2:
-    st.markdown("#### 🏎️ Race Performance")
-    RacePace = st.number_input("Race Pace (s)", value=81.200, step=0.001, format="%.3f")
-    
-    st.markdown("#### ⏱️ Sector Times")
-    Sector1Time = st.number_input("Sector 1 Time (s)", value=25.000, step=0.001, format="%.3f")
-    Sector2Time = st.number_input("Sector 2 Time (s)", value=28.000, step=0.001, format="%.3f")
-    Sector3Time = st.number_input("Sector 3 Time (s)", value=27.500, step=0.001, format="%.3f")
+# ============ PREDICTION HISTORY (fragment, dipanggil dari panel prediksi) ============
+@st.fragment
+@timed("fragment.history")
+def history_panel():
+    history = session_history()
+    if not len(history):
+        return
+    with st.expander(f"🕘 PREDICTION HISTORY • {len(history)}/{history.capacity} runs"):
+        st.caption(
+            "Disimpan per sesi; kalau penuh, run yang paling lama tidak dibuka dihapus. "
+            "Grafik dibuat ulang dari input tersimpan, tanpa request ke backend."
+        )
+        st.dataframe(
+            history.rows(),
+            hide_index=True,
+            width="stretch",
+            column_config={
+                "Best Lap (s)": st.column_config.NumberColumn(format="%.3f"),
+                "Race Pace (s)": st.column_config.NumberColumn(format="%.3f"),
+                "Win Probability": st.column_config.NumberColumn(format="%.2f%%"),
+            },
+        )
+        run_ids = history.run_ids_recent_first()
+        # Run yang sudah tergusur dibuang dari pilihan sebelum widget dibuat
+        if "history_compare" in st.session_state:
+            st.session_state["history_compare"] = [r for r in st.session_state["history_compare"] if r in run_ids]
+        compare_ids = st.multiselect(
+            "Compare runs", run_ids, max_selections=3, key="history_compare",
+            format_func=lambda r: f"#{r} • {history.get(r, touch=False)['label']}",
+        )
+        if compare_ids:
+            from charts import create_performance_radar, create_speedometer
+
+            for compare_col, run_id in zip(st.columns(len(compare_ids)), compare_ids):
+                run = history.get(run_id)
+                with compare_col:
+                    st.markdown(f"**#{run_id}** • {run['label']}")
+                    st.plotly_chart(create_speedometer(run['probability']), width="stretch")
+                    st.plotly_chart(create_performance_radar(run['inputs']), width="stretch")
+        if st.button("🗑️ Clear history"):
+            history.clear()
+            st.session_state.pop("history_compare", None)
+            st.rerun(scope="fragment")
+
+# ============ PREDICTION PANEL (fragment) ============
+# Widget di dalam fragment hanya me-rerun fragment ini, bukan seluruh halaman
+# (header, about dan footer tidak dikirim ulang saat slider digeser)
+@st.fragment
+@timed("fragment.prediction")
+def prediction_panel():
+    # ============ INPUT SECTION ============
+    st.markdown("<h3 style='text-align: center; color: white !important; margin-bottom: 30px;'>🚦 DRIVER PERFORMANCE INPUT</h3>", unsafe_allow_html=True)
+
+    widgets_span = Span("rerun.widgets")
+    season, circuit = selected_season()
+    # Nilai lama dari musim lain (setelah ganti musim / reload file) dibuang sebelum widget dibuat
+    if st.session_state.get("circuit") not in season.circuits:
+        st.session_state.pop("circuit", None)
+    if st.session_state.get("driver_id", 0) >= season.n_drivers:
+        st.session_state.pop("driver_id", None)
+    for key, default in LAP_INPUTS.values():
+        st.session_state.setdefault(key, default)
+    col1, col2, col3 = st.columns(3, gap="large")
 
-with col3:
-    st.markdown("#### 🏆 Driver Statistics")
+    with col1:
+        st.markdown("#### 🏁 Starting Position")
+        GridPosition = st.slider("Grid Position", 1, season.n_drivers, 5, help="Posisi start pada kualifikasi")
     
-    # Driver ID dengan informasi nama
-    driver_names = {
-        0: "Max Verstappen (Red Bull)",
-        1: "Sergio Pérez (Red Bull)",
-        2: "Lewis Hamilton (Mercedes)",
-        3: "George Russell (Mercedes)",
-        4: "Charles Leclerc (Ferrari)",
-        5: "Carlos Sainz (Ferrari)",
-        6: "Lando Norris (McLaren)",
-        7: "Oscar Piastri (McLaren)",
-        8: "Fernando Alonso (Aston Martin)",
-        9: "Lance Stroll (Aston Martin)",
-        10: "Pierre Gasly (Alpine)",
-        11: "Esteban Ocon (Alpine)",
-        12: "Valtteri Bottas (Alfa Romeo)",
-        13: "Zhou Guanyu (Alfa Romeo)",
-        14: "Kevin Magnussen (Haas)",
-        15: "Nico Hülkenberg (Haas)",
-        16: "Yuki Tsunoda (AlphaTauri)",
-        17: "Daniel Ricciardo (AlphaTauri)",
-        18: "Alexander Albon (Williams)",
-        19: "Logan Sargeant (Williams)"
-    }
+        st.markdown("#### 🔥 Speed Performance")
+        LapTime = st.number_input("Best Lap Time (s)", key="lap_time", step=0.001, format="%.3f")
+        BestQuali = st.number_input("Best Quali Time (s)", key="best_quali", step=0.001, format="%.3f")
+
+    with col2:
+        st.markdown("#### 🏎️ Race Performance")
+        RacePace = st.number_input("Race Pace (s)", key="race_pace", step=0.001, format="%.3f")
     
-    DriverEncoded = st.slider("Driver ID", 0, 19, 10, help="Pilih ID driver (lihat daftar di bawah)")
+        st.markdown("#### ⏱️ Sector Times")
+        Sector1Time = st.number_input("Sector 1 Time (s)", key="sector1", step=0.001, format="%.3f")
+        Sector2Time = st.number_input("Sector 2 Time (s)", key="sector2", step=0.001, format="%.3f")
+        Sector3Time = st.number_input("Sector 3 Time (s)", key="sector3", step=0.001, format="%.3f")
+
+    with col3:
+        st.markdown("#### 🗺️ Season & Circuit")
+        registry = driver_registry()
+        st.selectbox("Season", registry.years, index=registry.years.index(season.year), key="season")
+        st.selectbox("Circuit", list(season.circuits), index=list(season.circuits).index(circuit),
+                     format_func=season.circuit_name, key="circuit",
+                     help=f"Fastest quali: {season.fastest_quali_time(circuit):.3f}s")
+        if st.session_state.get("header_event") != (season.year, circuit):
+            # Widget ini hanya me-rerun fragment; header di luar fragment perlu rerun penuh
+            st.rerun(scope="app")
+
+        st.markdown("#### 🏆 Driver Statistics")
     
-    # Tampilkan nama driver yang dipilih
-    st.markdown(f"""
-    <div style='background: rgba(255, 0, 0, 0.2); padding: 10px; border-radius: 8px; border: 1px solid #ff0000; margin: 10px 0;'>
-        <p style='color: white; font-size: 1rem; margin: 0; text-align: center; font-weight: bold;'>
-            🏎️ <span style='color: #ff0000;'>{driver_names.get(DriverEncoded, "Unknown Driver")}</span>
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+        DriverEncoded = st.slider("Driver ID", 0, season.n_drivers - 1, min(10, season.n_drivers - 1),
+                                  key="driver_id", help="Pilih ID driver (lihat daftar di bawah)")
     
-    # Expander untuk daftar lengkap driver
-    with st.expander("📋 Lihat Daftar Lengkap Driver ID"):
-        st.markdown("""
-        <div style='background: rgba(43, 43, 43, 0.8); padding: 15px; border-radius: 10px;'>
+        # Tampilkan nama driver yang dipilih
+        st.markdown(f"""
+        <div style='background: rgba(255, 0, 0, 0.2); padding: 10px; border-radius: 8px; border: 1px solid #ff0000; margin: 10px 0;'>
+            <p style='color: white; font-size: 1rem; margin: 0; text-align: center; font-weight: bold;'>
+                🏎️ <span style='color: #ff0000;'>{season.label(DriverEncoded)}</span>
+            </p>
+        </div>
         """, unsafe_allow_html=True)
+    
+        # Expander untuk daftar lengkap driver
+        with st.expander("📋 Lihat Daftar Lengkap Driver ID"):
+            st.markdown("""
+            <div style='background: rgba(43, 43, 43, 0.8); padding: 15px; border-radius: 10px;'>
+            """, unsafe_allow_html=True)
         
-        # Bagi menjadi 2 kolom
-        driver_col1, driver_col2 = st.columns(2)
+            # Bagi menjadi 2 kolom (satu elemen markdown per kolom)
+            driver_col1, driver_col2 = st.columns(2)
         
-        with driver_col1:
-            for i in range(0, 10):
-                st.markdown(f"**ID {i}:** {driver_names[i]}")
+            half = (season.n_drivers + 1) // 2
+            with driver_col1:
+                st.markdown("  \n".join(f"**ID {i}:** {season.labels[i]}" for i in range(0, half)))
         
-        with driver_col2:
-            for i in range(10, 20):
-                st.markdown(f"**ID {i}:** {driver_names[i]}")
+            with driver_col2:
+                st.markdown("  \n".join(f"**ID {i}:** {season.labels[i]}" for i in range(half, season.n_drivers)))
         
-        st.markdown("</div>", unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
     
-    # Historical performance data berdasarkan Driver ID (2024 season average)
-    driver_historical_data = {
-        0: {"avg_pos": 1.5, "avg_points": 22.0},   # Verstappen
-        1: {"avg_pos": 5.0, "avg_points": 10.0},   # Pérez
-        2: {"avg_pos": 4.0, "avg_points": 12.0},   # Hamilton
-        3: {"avg_pos": 5.5, "avg_points": 9.0},    # Russell
-        4: {"avg_pos": 3.0, "avg_points": 15.0},   # Leclerc
-        5: {"avg_pos": 4.5, "avg_points": 11.0},   # Sainz
-        6: {"avg_pos": 3.5, "avg_points": 14.0},   # Norris
-        7: {"avg_pos": 6.0, "avg_points": 8.0},    # Piastri
-        8: {"avg_pos": 7.0, "avg_points": 6.0},    # Alonso
-        9: {"avg_pos": 12.0, "avg_points": 2.0},   # Stroll
-        10: {"avg_pos": 10.0, "avg_points": 4.0},  # Gasly
-        11: {"avg_pos": 11.0, "avg_points": 3.0},  # Ocon
-        12: {"avg_pos": 14.0, "avg_points": 1.0},  # Bottas
-        13: {"avg_pos": 16.0, "avg_points": 0.5},  # Zhou
-        14: {"avg_pos": 13.0, "avg_points": 1.5},  # Magnussen
-        15: {"avg_pos": 11.0, "avg_points": 3.0},  # Hülkenberg
-        16: {"avg_pos": 12.0, "avg_points": 2.0},  # Tsunoda
-        17: {"avg_pos": 10.0, "avg_points": 4.0},  # Ricciardo
-        18: {"avg_pos": 15.0, "avg_points": 0.8},  # Albon
-        19: {"avg_pos": 18.0, "avg_points": 0.2},  # Sargeant
-    }
+        store = telemetry_store()
+        st.button(
+            "📡 Load from session", width="stretch", disabled=store is None,
+            on_click=load_session_inputs, args=(season.year, circuit, DriverEncoded, season.label(DriverEncoded)),
+            help="Isi lap, quali, race pace & sector dari data telemetry lokal" if store is not None
+                 else f"Belum ada data telemetry di {TELEMETRY_DIR} (python -m telemetry <file lap>)",
+        )
+        if "telemetry_status" in st.session_state:
+            st.caption(st.session_state.pop("telemetry_status"))
     
-    # Auto-calculate berdasarkan driver yang dipilih
-    AvgPrevPositions = driver_historical_data[DriverEncoded]["avg_pos"]
-    AvgPrevPoints = driver_historical_data[DriverEncoded]["avg_points"]
-    Year = 2025.0
-
-# Feature Engineering
-total_sector_time = Sector1Time + Sector2Time + Sector3Time
-SectorTimeConsistency = np.std([Sector1Time, Sector2Time, Sector3Time])
-QualiAdvantage = BestQuali - LapTime
-PositionImprovement = GridPosition - 5
-RacePaceEfficiency = RacePace / LapTime
-Sector1Ratio = Sector1Time / total_sector_time
-Sector2Ratio = Sector2Time / total_sector_time
-Sector3Ratio = Sector3Time / total_sector_time
-
-# Auto-calculate TimeDiffFromFastest based on BestQuali
-# Assuming fastest quali time is around 78.0s for Mexico City GP
-fastest_quali_time = 78.0
-TimeDiffFromFastest = max(0, BestQuali - fastest_quali_time)
-
-user_inputs = {
-    'Year': Year, 'GridPosition': float(GridPosition), 'LapTime (s)': LapTime,
-    'BestQuali (s)': BestQuali, 'RacePace (s)': RacePace,
-    'Sector1Time (s)': Sector1Time, 'Sector2Time (s)': Sector2Time, 'Sector3Time (s)': Sector3Time,
-    'SectorTimeConsistency': SectorTimeConsistency, 'QualiAdvantage': QualiAdvantage,
-    'PositionImprovement': float(PositionImprovement), 'RacePaceEfficiency': RacePaceEfficiency,
-    'Sector1Ratio': Sector1Ratio, 'Sector2Ratio': Sector2Ratio, 'Sector3Ratio': Sector3Ratio,
-    'TimeDiffFromFastest': TimeDiffFromFastest, 'DriverEncoded': float(DriverEncoded),
-    'AvgPrevPositions': AvgPrevPositions, 'AvgPrevPoints': AvgPrevPoints
-}
+        # Auto-calculate berdasarkan driver yang dipilih
+        AvgPrevPositions = season.avg_positions[DriverEncoded]
+        AvgPrevPoints = season.avg_points[DriverEncoded]
+        Year = float(season.year)
 
-# ============ PREDICTION BUTTON ============
-st.markdown("<br>", unsafe_allow_html=True)
-col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
-with col_btn2:
-    predict_button = st.button("🏁 START PREDICTION • LIGHTS OUT! 🏁", use_container_width=True)
+    widgets_span.stop()
 
-# ============ PREDICTION RESULTS ============
-if predict_button:
-    input_data_list = format_input_data(user_inputs)
-    payload = {"features": input_data_list}
+    # Feature Engineering (lihat features.py)
+    raw_inputs = {
+        'Year': Year, 'GridPosition': GridPosition, 'LapTime (s)': LapTime,
+        'BestQuali (s)': BestQuali, 'RacePace (s)': RacePace,
+        'Sector1Time (s)': Sector1Time, 'Sector2Time (s)': Sector2Time, 'Sector3Time (s)': Sector3Time,
+        'DriverEncoded': DriverEncoded, 'AvgPrevPositions': AvgPrevPositions, 'AvgPrevPoints': AvgPrevPoints
+    }
+    with span("rerun.features"):
+        fastest_quali_time = season.fastest_quali_time(circuit)
+        user_inputs = features_to_dict(engineer_features(raw_inputs, fastest_quali_time)[0])
+    # Dibaca panel sweep (fragment terpisah)
+    st.session_state["raw_inputs"] = raw_inputs
+
+    # ============ INSTANT PREVIEW (surface, tanpa request ke backend) ============
+    if SURFACE_ENABLED:
+        with span("rerun.surface"):
+            # Predictor tanpa cache: baris surface tidak boleh menggeser hasil prediksi asli dari cache
+            surface = get_surface_builder().request(
+                raw_inputs, get_predictor(API_URL, PREDICTOR_MODE).predictor, fastest_quali_time,
+                season.n_drivers, season.avg_positions, season.avg_points,
+            )
+            preview = surface.interpolate(DriverEncoded, GridPosition, LapTime, BestQuali) if surface else None
+        if surface is None:
+            st.caption("⏸️ Preview dijeda sebentar (terlalu banyak konteks baru); nilai resmi lewat START PREDICTION.")
+        elif preview is not None:
+            st.markdown(f"<p style='text-align: center; color: white; font-size: 1.2rem; margin: 20px 0 0 0;'>"
+                        f"⚡ Preview: <b style='color: #ff0000;'>{preview * 100:.1f}%</b></p>", unsafe_allow_html=True)
+            st.caption("Estimasi instan dari surface yang sudah dihitung; nilai resmi lewat START PREDICTION.")
+        elif surface.error:
+            st.caption(f"⚠️ Preview tidak tersedia: {surface.error}")
+        else:
+            st.caption(f"⏳ Menyiapkan preview ({int(surface.ready.sum())}/{surface.n_drivers} driver) ...")
+
+    # ============ PREDICTION BUTTON ============
+    st.markdown("<br>", unsafe_allow_html=True)
+    col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
+    with col_btn2:
+        predict_button = st.button("🏁 START PREDICTION • LIGHTS OUT! 🏁", width="stretch")
+        grid_button = st.button("🏎️ PREDICT FULL GRID • ALL DRIVERS", width="stretch")
+        race_button = st.button(f"🏆 SIMULATE RACE • {RACE_SIMULATIONS:,} RACES", width="stretch")
+        uncertainty_mode = st.toggle(
+            "🎲 Uncertainty bands (Monte Carlo)", key="uncertainty_mode",
+            help=f"{UNCERTAINTY_SAMPLES} sampel input dengan noise lap ±{UNCERTAINTY_LAP_SIGMA}s "
+                 f"dan sector ±{UNCERTAINTY_SECTOR_SIGMA}s, dinilai dalam satu batch",
+        )
+
+    # ============ PREDICTION RESULTS ============
+    if predict_button:
+        from charts import (
+            create_comparison_metrics, create_dashboard, create_performance_radar,
+            create_position_distribution, create_sector_comparison, create_speedometer,
+        )
+
+        input_data_list = format_input_data(user_inputs)
     
-    with st.spinner("🔧 Analyzing driver performance..."):
-        try:
-            response = requests.post(API_URL, json=payload, headers={"Content-Type": "application/json"}, timeout=10)
+        with st.spinner("🔧 Analyzing driver performance..."):
+            try:
+                result = get_predictor(API_URL, PREDICTOR_MODE).predict(input_data_list)
             
-            if response.status_code == 200:
-                result = response.json()
                 win_prob = result.get("winner_probability", 0)
-                
+                session_history().add(input_data_list, win_prob,
+                                      f"{season.label(DriverEncoded)} • {season.circuit_name(circuit)}")
+                band = None
+                if uncertainty_mode:
+                    with span("uncertainty.monte_carlo"):
+                        band = monte_carlo(
+                            raw_inputs, get_predictor(API_URL, PREDICTOR_MODE),
+                            n_samples=UNCERTAINTY_SAMPLES,
+                            lap_sigma=UNCERTAINTY_LAP_SIGMA,
+                            sector_sigma=UNCERTAINTY_SECTOR_SIGMA,
+                            level=UNCERTAINTY_LEVEL,
+                            fastest_quali_time=fastest_quali_time,
+                            max_position=season.n_drivers,
+                        )
+                interval = (band["low"], band["high"]) if band else None
+            
                 st.markdown("<div class='section-divider'></div>", unsafe_allow_html=True)
-                
+            
                 # Result Header
                 st.markdown("""
                 <div class='result-card'>
@@ -539,10 +648,12 @@ if predict_button:
                     </h2>
                 </div>
                 """, unsafe_allow_html=True)
-                
+                if str(result.get("model_version", "")).startswith("local"):
+                    st.caption(f"ℹ️ Hasil dari model lokal ({result['model_version']}), bukan backend.")
+            
                 # Main Metrics
                 metric_col1, metric_col2, metric_col3 = st.columns([1, 2, 1])
-                
+            
                 with metric_col1:
                     st.markdown("<div style='text-align: center;'>", unsafe_allow_html=True)
                     st.metric(
@@ -551,7 +662,7 @@ if predict_button:
                         delta=f"{(win_prob*100 - 50):.1f}% vs avg"
                     )
                     st.markdown("</div>", unsafe_allow_html=True)
-                
+            
                 with metric_col2:
                     if win_prob > 0.35:
                         st.success(
@@ -568,156 +679,378 @@ if predict_button:
                             f"**⚠️ MID-PACK FINISH.** Peluang rendah ({win_prob*100:.1f}%). "
                             f"Driver ini kemungkinan finish posisi 6-10."
                         )
-                
+            
                 with metric_col3:
                     st.markdown("<div style='text-align: center;'>", unsafe_allow_html=True)
-                    predicted_position = int(1 + (1 - win_prob) * 10)
+                    predicted_position = int(estimated_positions(win_prob, season.n_drivers))
                     st.metric(
                         label="📊 Est. Position",
                         value=f"P{predicted_position}",
-                        delta="Predicted"
+                        delta=f"P{band['position_low']}–P{band['position_high']}" if band else "Predicted"
                     )
                     st.markdown("</div>", unsafe_allow_html=True)
-                
+            
+                if band:
+                    st.caption(
+                        f"🎲 {band['level']*100:.0f}% interval dari {band['samples']:,} sampel: "
+                        f"{band['low']*100:.2f}% – {band['high']*100:.2f}% "
+                        f"(median {band['median']*100:.2f}%, σ {band['std']*100:.2f} pt)"
+                    )
+                    st.plotly_chart(create_position_distribution(band["position_distribution"]), width="stretch")
+            
                 st.markdown("<br>", unsafe_allow_html=True)
-                
+            
                 # Visualization Section - Organized Layout
                 st.markdown("<h3 style='text-align: center; color: white !important; margin: 30px 0;'>📊 DETAILED ANALYSIS</h3>", unsafe_allow_html=True)
-                
-                # Row 1: Main visualizations
-                viz_col1, viz_col2 = st.columns(2, gap="large")
-                
-                with viz_col1:
-                    st.markdown("<div class='viz-container'>", unsafe_allow_html=True)
-                    fig_speedometer = create_speedometer(win_prob)
-                    st.plotly_chart(fig_speedometer, use_container_width=True)
-                    st.markdown("</div>", unsafe_allow_html=True)
-                
-                with viz_col2:
-                    st.markdown("<div class='viz-container'>", unsafe_allow_html=True)
-                    fig_sectors = create_sector_comparison(Sector1Time, Sector2Time, Sector3Time)
-                    st.plotly_chart(fig_sectors, use_container_width=True)
-                    st.markdown("</div>", unsafe_allow_html=True)
-                
-                st.markdown("<br>", unsafe_allow_html=True)
-                
-                # Row 2: Performance radar and metrics
-                viz_col3, viz_col4 = st.columns(2, gap="large")
-                
-                with viz_col3:
-                    st.markdown("<div class='viz-container'>", unsafe_allow_html=True)
-                    fig_radar = create_performance_radar(user_inputs)
-                    st.plotly_chart(fig_radar, use_container_width=True)
-                    st.markdown("</div>", unsafe_allow_html=True)
-                
-                with viz_col4:
+            
+                if COMBINED_CHARTS:
+                    # Satu figure gabungan = satu payload Plotly, bukan empat
                     st.markdown("<div class='viz-container'>", unsafe_allow_html=True)
-                    fig_comparison = create_comparison_metrics(user_inputs)
-                    st.plotly_chart(fig_comparison, use_container_width=True)
+                    fig_dashboard = create_dashboard(win_prob, Sector1Time, Sector2Time, Sector3Time, user_inputs, interval)
+                    st.plotly_chart(fig_dashboard, width="stretch")
                     st.markdown("</div>", unsafe_allow_html=True)
+                else:
+                    # Row 1: Main visualizations
+                    viz_col1, viz_col2 = st.columns(2, gap="large")
+            
+                    with viz_col1:
+                        st.markdown("<div class='viz-container'>", unsafe_allow_html=True)
+                        fig_speedometer = create_speedometer(win_prob, interval)
+                        st.plotly_chart(fig_speedometer, width="stretch")
+                        st.markdown("</div>", unsafe_allow_html=True)
+            
+                    with viz_col2:
+                        st.markdown("<div class='viz-container'>", unsafe_allow_html=True)
+                        fig_sectors = create_sector_comparison(Sector1Time, Sector2Time, Sector3Time)
+                        st.plotly_chart(fig_sectors, width="stretch")
+                        st.markdown("</div>", unsafe_allow_html=True)
+            
+                    st.markdown("<br>", unsafe_allow_html=True)
+            
+                    # Row 2: Performance radar and metrics
+                    viz_col3, viz_col4 = st.columns(2, gap="large")
+            
+                    with viz_col3:
+                        st.markdown("<div class='viz-container'>", unsafe_allow_html=True)
+                        fig_radar = create_performance_radar(user_inputs)
+                        st.plotly_chart(fig_radar, width="stretch")
+                        st.markdown("</div>", unsafe_allow_html=True)
+            
+                    with viz_col4:
+                        st.markdown("<div class='viz-container'>", unsafe_allow_html=True)
+                        fig_comparison = create_comparison_metrics(user_inputs)
+                        st.plotly_chart(fig_comparison, width="stretch")
+                        st.markdown("</div>", unsafe_allow_html=True)
+
+            except CircuitOpenError as e:
+                st.error(f"❌ Backend sedang down: {e}")
+            except PredictError as e:
+                st.error(f"❌ {e}")
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+
+    # ============ FULL GRID PREDICTION ============
+    if grid_button or race_button:
+        grid_ids = season.driver_ids
+        grid_matrix = engineer_features(
+            expand_for_drivers(raw_inputs, grid_ids, season.avg_positions, season.avg_points),
+            fastest_quali_time,
+        )
+
+    if grid_button:
+        with st.spinner("🔧 Scoring the full grid..."):
+            try:
+                grid_probs = get_predictor(API_URL, PREDICTOR_MODE).predict_rows(grid_matrix.tolist())
+                grid_table = rank_grid(grid_ids, grid_probs, season.labels)
             
-            else:
-                st.error(f"❌ API Error: Status Code {response.status_code}")
-                
-        except Exception as e:
-            st.error(f"❌ Error: {str(e)}")
+                st.markdown("<div class='section-divider'></div>", unsafe_allow_html=True)
+                st.markdown("<h3 style='text-align: center; color: white !important; margin: 30px 0;'>🏁 FULL GRID OUTLOOK</h3>", unsafe_allow_html=True)
+                st.caption("Semua driver memakai input lap/sector yang sama; Field Share = probabilitas yang dinormalisasi ke total 100%.")
+                st.dataframe(
+                    grid_table,
+                    hide_index=True,
+                    width="stretch",
+                    column_config={
+                        "Win Probability": st.column_config.NumberColumn(format="%.2f%%"),
+                        "Field Share": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
+                    },
+                )
+            except CircuitOpenError as e:
+                st.error(f"❌ Backend sedang down: {e}")
+            except PredictError as e:
+                st.error(f"❌ {e}")
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+
+    # ============ RACE SIMULATION ============
+    if race_button:
+        from charts import create_finish_heatmap
+        from race_sim import simulate
+
+        with st.spinner(f"🏆 Simulating {RACE_SIMULATIONS:,} races..."):
+            try:
+                race_probs = get_predictor(API_URL, PREDICTOR_MODE).predict_rows(grid_matrix.tolist())
+                with span("race_sim.simulate"):
+                    # Seed dari probabilitas: input sama -> hasil simulasi sama
+                    race = simulate(race_probs, RACE_SIMULATIONS, seed=int(feature_key(race_probs)[:16], 16))
+
+                st.markdown("<div class='section-divider'></div>", unsafe_allow_html=True)
+                st.markdown("<h3 style='text-align: center; color: white !important; margin: 30px 0;'>🏆 RACE SIMULATION</h3>", unsafe_allow_html=True)
+                st.caption(
+                    f"{RACE_SIMULATIONS:,} balapan disimulasikan (Plackett-Luce): probabilitas tiap driver menjadi "
+                    "kekuatan relatif, urutan finish diundi ulang per balapan. Poin memakai sistem 25-18-15-...-1."
+                )
+                st.dataframe(
+                    race_table(season.labels, race),
+                    hide_index=True,
+                    width="stretch",
+                    column_config={
+                        "P(Win)": st.column_config.NumberColumn(format="%.2f%%"),
+                        "P(Podium)": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
+                        "Exp. Points": st.column_config.NumberColumn(format="%.2f"),
+                        "Avg. Finish": st.column_config.NumberColumn(format="%.1f"),
+                    },
+                )
+                st.plotly_chart(create_finish_heatmap(season.labels, race["positions"]), width="stretch")
+            except CircuitOpenError as e:
+                st.error(f"❌ Backend sedang down: {e}")
+            except PredictError as e:
+                st.error(f"❌ {e}")
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+
+    # Nested fragment: ikut diperbarui setelah prediksi, tapi widget compare hanya me-rerun dirinya
+    history_panel()
+
+prediction_panel()
+
+# ============ LIVE RACE MODE (fragment, refresh otomatis) ============
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+@timed("fragment.live")
+def live_panel():
+    season, circuit = selected_season()
+    try:
+        live = get_live_board(LIVE_FEED_FILE, season.n_drivers).tick(
+            get_predictor(API_URL, PREDICTOR_MODE), (season.year, circuit), season.year,
+            season.avg_positions, season.avg_points, season.fastest_quali_time(circuit),
+        )
+    except CircuitOpenError as e:
+        st.error(f"❌ Backend sedang down: {e}")
+        return
+    except PredictError as e:
+        st.error(f"❌ {e}")
+        return
+    except Exception as e:
+        st.error(f"❌ Error: {str(e)}")
+        return
+
+    from charts import create_live_probabilities
+
+    live_ids = np.flatnonzero(np.isfinite(live["probabilities"]))
+    if not len(live_ids):
+        st.info(f"⏳ Menunggu lap pertama di {LIVE_FEED_FILE} ...")
+        return
+    table_col, chart_col = st.columns(2, gap="large")
+    with table_col:
+        st.dataframe(
+            rank_grid(live_ids, live["probabilities"][live_ids], season.labels),
+            hide_index=True,
+            width="stretch",
+            column_config={
+                "Win Probability": st.column_config.NumberColumn(format="%.2f%%"),
+                "Field Share": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
+            },
+        )
+    with chart_col:
+        # Chart ikut di fragment: diperbarui setiap tick bersama tabel
+        st.plotly_chart(
+            create_live_probabilities([season.labels[i] for i in live_ids], live["probabilities"][live_ids]),
+            width="stretch",
+        )
+    st.caption(
+        f"{live['records']:,} lap dibaca • {live['rescored']} driver dinilai ulang di tick ini "
+        f"• refresh tiap {LIVE_REFRESH_SECONDS:g} detik • {season.circuit_name(circuit)} {season.year}"
+    )
+
+if LIVE_FEED_FILE:
+    st.markdown("<div class='section-divider'></div>", unsafe_allow_html=True)
+    if st.toggle("📡 LIVE RACE MODE • leaderboard dari feed lap", key="live_mode"):
+        live_panel()
+
+# ============ WHAT-IF SENSITIVITY SWEEP (fragment) ============
+@st.fragment
+@timed("fragment.sweep")
+def sweep_panel():
+    with st.expander("🔬 WHAT-IF • Sensitivity Sweep (Grid Position × Lap Time)"):
+        st.caption(
+            "Semua posisi grid (P1–P terakhir) dikombinasikan dengan pergeseran Best Lap & Best Quali; input lain tetap. "
+            "Titik yang sudah ada di cache tidak dikirim ulang."
+        )
+        sweep_col1, sweep_col2 = st.columns(2)
+        with sweep_col1:
+            sweep_range = st.slider("Lap time range (± s)", 0.1, 3.0, 1.0, step=0.1)
+        with sweep_col2:
+            sweep_steps = st.slider("Lap time steps", 3, 41, 11, step=2)
+        sweep_button = st.button("🔬 RUN SWEEP", width="stretch")
+    
+        if sweep_button:
+            from charts import create_sweep_heatmap
+
+            raw_inputs = st.session_state["raw_inputs"]
+            season, circuit = selected_season()
+            sweep_grid = np.arange(1, season.n_drivers + 1)
+            sweep_deltas = np.linspace(-sweep_range, sweep_range, sweep_steps)
+            sweep_matrix = engineer_features(sweep_inputs(raw_inputs, sweep_grid, sweep_deltas),
+                                             season.fastest_quali_time(circuit))
+            sweep_probs = np.full(len(sweep_matrix), np.nan)
+            sweep_chart = st.empty()
+            sweep_progress = st.progress(0.0, text=f"Scoring {len(sweep_matrix)} points...")
+        
+            try:
+                done = 0
+                for idx, probs in get_predictor(API_URL, PREDICTOR_MODE).iter_predict_rows(
+                    sweep_matrix.tolist(),
+                    chunk_size=int(get_setting("sweep", "CHUNK_SIZE", 50)),
+                    max_workers=int(get_setting("sweep", "MAX_WORKERS", 4)),
+                ):
+                    sweep_probs[idx] = probs
+                    done += len(idx)
+                    sweep_progress.progress(done / len(sweep_matrix), text=f"Scored {done}/{len(sweep_matrix)} points")
+                    sweep_chart.plotly_chart(
+                        create_sweep_heatmap(sweep_grid, raw_inputs['LapTime (s)'] + sweep_deltas, sweep_probs.reshape(len(sweep_grid), -1)),
+                        width="stretch",
+                    )
+                sweep_progress.empty()
+            except CircuitOpenError as e:
+                st.error(f"❌ Backend sedang down: {e}")
+            except PredictError as e:
+                st.error(f"❌ {e}")
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+
+sweep_panel()
+
+# ============ BULK SCORING (fragment) ============
+@st.fragment
+@timed("fragment.bulk")
+def bulk_panel():
+    with st.expander("📁 BULK SCORING • CSV / Parquet"):
+        st.caption(
+            "Kolom wajib: " + ", ".join(f"`{c}`" for c in REQUIRED_RAW_COLUMNS)
+            + ". `Year`, `AvgPrevPositions`, `AvgPrevPoints` opsional (diisi dari musim & sirkuit yang dipilih di panel input)."
+        )
+        bulk_file = st.file_uploader("Upload file", type=["csv", "parquet"])
+        bulk_format = st.radio("Output format", ["csv", "parquet"], horizontal=True)
+        bulk_button = st.button("📁 SCORE FILE", width="stretch", disabled=bulk_file is None)
+    
+        if bulk_button and bulk_file is not None:
+            from bulk_scoring import new_output_path, score_file
+            season, circuit = selected_season()
+            bulk_progress = st.progress(0.0, text="Scoring...")
+            # Output sebelumnya dari session ini dibuang; yang baru dibaca dari disk hanya saat diunduh
+            old_output = st.session_state.pop("bulk_output", None)
+            if old_output and os.path.exists(old_output):
+                os.unlink(old_output)
+            # Output session yang sudah selesai tidak dihapus session-nya: tiap upload menyapu yang sudah tua
+            bulk_max_age = float(get_setting("bulk", "OUTPUT_MAX_AGE_MINUTES", 60.0))
+            bulk_output = new_output_path(
+                get_setting("bulk", "OUTPUT_DIR", "") or os.path.join(tempfile.gettempdir(), "f1-bulk"),
+                bulk_format,
+                max_age=bulk_max_age * 60,
+            )
+        
+            def _bulk_progress(rows_done):
+                fraction = min(1.0, bulk_file.tell() / max(bulk_file.size, 1))
+                bulk_progress.progress(fraction, text=f"Scored {rows_done:,} rows")
+        
+            try:
+                bulk_rows = score_file(
+                    bulk_file, bulk_file.name, bulk_output, bulk_format,
+                    get_predictor(API_URL, PREDICTOR_MODE),
+                    season.avg_positions,
+                    season.avg_points,
+                    year=season.year,
+                    fastest_quali_time=season.fastest_quali_time(circuit),
+                    chunksize=int(get_setting("bulk", "CHUNK_ROWS", 5000)),
+                    batch_size=int(get_setting("bulk", "BATCH_SIZE", 500)),
+                    max_workers=int(get_setting("bulk", "MAX_WORKERS", 4)),
+                    progress=_bulk_progress,
+                )
+                bulk_progress.progress(1.0, text=f"Done • {bulk_rows:,} rows scored")
+                st.session_state["bulk_output"] = str(bulk_output)
+                st.download_button(
+                    "⬇️ Download scored file",
+                    lambda path=bulk_output: path.read_bytes(),
+                    file_name=f"{Path(bulk_file.name).stem}_scored.{bulk_format}",
+                    on_click="ignore",
+                    width="stretch",
+                )
+                st.caption("File hasil disimpan di disk server dan baru dibaca saat tombol download diklik; "
+                           f"dihapus setelah {bulk_max_age:g} menit.")
+            except CircuitOpenError as e:
+                st.error(f"❌ Backend sedang down: {e}")
+            except PredictError as e:
+                st.error(f"❌ {e}")
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+            if "bulk_output" not in st.session_state:
+                bulk_output.unlink(missing_ok=True)
+
+bulk_panel()
+
+# ============ SIDEBAR: CACHE STATS ============
+with st.sidebar:
+    st.markdown("### ⚡ Prediction Cache")
+    cache_stats = get_predictor(API_URL, PREDICTOR_MODE).cache.stats()
+    hit_col, miss_col = st.columns(2)
+    hit_col.metric("Hits", cache_stats["hits"])
+    miss_col.metric("Misses", cache_stats["misses"])
+    st.caption(
+        f"Hit rate {cache_stats['hit_rate']*100:.1f}% • {cache_stats['entries']} entries"
+        + (f" • model {cache_stats['model_version']}" if cache_stats["model_version"] else "")
+    )
+    prediction_store = get_predictor(API_URL, PREDICTOR_MODE).cache.store
+    if prediction_store is not None:
+        store_stats = prediction_store.stats()
+        st.caption(f"Disk store: {store_stats['rows']:,} rows • {store_stats['bytes'] / 1024:.0f} KB"
+                   + (f" • {store_stats['pending']} pending" if store_stats["pending"] else ""))
+    st.caption(f"Predictor mode: {PREDICTOR_MODE}")
+    history = session_history()
+    st.caption(f"Session history: {len(history)}/{history.capacity} runs • {history.nbytes / 1024:.1f} KB")
+
+# ============ SIDEBAR: ADMIN METRICS ============
+def is_admin():
+    """Admin panel: ?admin=<[admin] TOKEN>, or always on when IS_LOCAL_TESTING"""
+    token = get_setting("admin", "TOKEN")
+    if token:
+        return st.query_params.get("admin") == token
+    return bool(get_setting("api", "IS_LOCAL_TESTING", False))
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_endpoint(port):
+    """Expose REGISTRY at http://127.0.0.1:<port>/metrics (once per process)"""
+    return serve_prometheus(port)
+
+METRICS_PORT = int(get_setting("metrics", "PROMETHEUS_PORT", 0))
+METRICS_FILE = get_setting("metrics", "PROMETHEUS_FILE", "")
+if METRICS_PORT:
+    start_metrics_endpoint(METRICS_PORT)
+
+if is_admin():
+    with st.sidebar.expander("🛠️ Performance Metrics", expanded=False):
+        st.caption("Durasi per tahap rerun (semua session, sejak proses start). p50/p95 = batas atas bucket.")
+        st.dataframe(REGISTRY.stage_rows(), hide_index=True, width="stretch")
+        st.dataframe(REGISTRY.counter_rows(), hide_index=True, width="stretch")
+        st.download_button("⬇️ Prometheus export", REGISTRY.to_prometheus(), file_name="metrics.prom")
+        if st.button("Reset metrics"):
+            REGISTRY.reset()
 
 # ============ ABOUT F1 SECTION ============
-st.markdown("<div class='section-divider'></div>", unsafe_allow_html=True)
-st.markdown("<h2 style='text-align: center; color: white !important; margin-bottom: 40px;'>🏎️ ABOUT FORMULA 1</h2>", unsafe_allow_html=True)
-
-st.markdown("""
-<div class='about-card'>
-    <h3 style='color: #ff0000; margin-top: 0;'>What is Formula 1?</h3>
-    <p style='font-size: 1.15rem; line-height: 1.9; color: #ddd;'>
-    Formula 1 (F1) adalah kelas tertinggi dari balap mobil roda terbuka internasional yang diatur oleh 
-    <strong>Fédération Internationale de l'Automobile (FIA)</strong>. F1 dikenal sebagai puncak teknologi 
-    otomotif dan keterampilan mengemudi, dengan mobil-mobil yang mampu mencapai kecepatan lebih dari 
-    <strong style='color: #ff0000;'>350 km/jam</strong> dan menghasilkan <strong>5G force</strong> di tikungan cepat.
-    </p>
-</div>
-""", unsafe_allow_html=True)
-
-about_col1, about_col2, about_col3 = st.columns(3, gap="large")
-
-with about_col1:
-    st.markdown("""
-    <div class='about-card'>
-        <h4 style='color: #ff0000; text-align: center;'>⚡ EXTREME SPEED</h4>
-        <p style='color: #ddd; text-align: center; font-size: 1rem; line-height: 1.6;'>
-        Mobil F1 berakselerasi <strong style='color: #ff0000;'>0-100 km/jam</strong> dalam 
-        <strong>2.6 detik</strong> dan mencapai top speed <strong style='color: #ff0000;'>350+ km/jam</strong>.
-        <br><br>
-        Sistem DRS menambah <strong>10-12 km/jam</strong> ekstra di straight!
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-with about_col2:
-    st.markdown("""
-    <div class='about-card'>
-        <h4 style='color: #ff0000; text-align: center;'>🌍 GLOBAL REACH</h4>
-        <p style='color: #ddd; text-align: center; font-size: 1rem; line-height: 1.6;'>
-        F1 mengadakan <strong style='color: #ff0000;'>23+ races</strong> di 5 benua setiap musim, 
-        dari Monaco hingga Singapore.
-        <br><br>
-        Ditonton oleh <strong style='color: #ff0000;'>500+ juta</strong> fans di seluruh dunia!
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-with about_col3:
-    st.markdown("""
-    <div class='about-card'>
-        <h4 style='color: #ff0000; text-align: center;'>🔧 CUTTING-EDGE TECH</h4>
-        <p style='color: #ddd; text-align: center; font-size: 1rem; line-height: 1.6;'>
-        Setiap mobil memiliki <strong style='color: #ff0000;'>300+ sensors</strong> yang 
-        menghasilkan <strong>1.5 TB data</strong> per race.
-        <br><br>
-        Power unit hybrid menghasilkan <strong style='color: #ff0000;'>1000+ HP</strong>!
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-st.markdown("""
-<div class='about-card'>
-    <h3 style='color: #ff0000; text-align: center;'>🏆 THE ELITE COMPETITION</h3>
-    <p style='font-size: 1.1rem; line-height: 1.8; color: #ddd; text-align: center;'>
-    Hanya <strong style='color: #ff0000;'>20 pembalap terbaik dunia</strong> yang berkompetisi di F1, 
-    mewakili 10 tim konstruktor. Mereka bersaing untuk dua kejuaraan: 
-    <strong>Kejuaraan Dunia Pembalap</strong> dan <strong>Kejuaraan Dunia Konstruktor</strong>.
-    </p>
-    <br>
-    <h4 style='color: #ff0000; text-align: center;'>🇲🇽 MEXICO CITY GRAND PRIX</h4>
-    <p style='color: #ddd; font-size: 1rem; line-height: 1.7; text-align: center;'>
-    <strong>Autódromo Hermanos Rodríguez</strong> di Mexico City adalah salah satu sirkuit paling ikonik di F1, 
-    terkenal dengan <strong style='color: #ff0000;'>atmosfer elektrik</strong> dan elevasi tinggi 
-    <strong>(2,200m di atas permukaan laut)</strong> yang menantang performa mesin dan aero.
-    <br><br>
-    Sirkuit ini memiliki <strong style='color: #ff0000;'>Foro Sol</strong>, sebuah stadion baseball 
-    yang diubah menjadi tribun dengan kapasitas <strong>30,000+ penonton</strong> yang menciptakan 
-    suasana luar biasa dengan Mexican wave dan chants yang legendaris!
-    </p>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(ABOUT_HTML, unsafe_allow_html=True)
 
 # ============ FOOTER ============
-st.markdown("<div class='section-divider'></div>", unsafe_allow_html=True)
-st.markdown("""
-<div style='text-align: center; color: #888; padding: 40px 0 20px 0;'>
-    <p style='font-size: 1rem; margin-bottom: 10px; color: #ccc;'>
-        🏎️ <strong style='color: #ff0000;'>F1 Winner Predictor 2025</strong> | Powered by Machine Learning & AI
-    </p>
-    <p style='font-size: 0.9rem; margin-bottom: 20px; color: #999;'>
-        Backend: Flask + Waitress on Railway | Frontend: Streamlit Cloud
-    </p>
-    <div style='border-top: 2px solid #444; padding-top: 20px; margin: 20px auto; max-width: 600px;'>
-        <p style='font-size: 1.1rem; color: #ff0000; font-weight: bold; letter-spacing: 2px; text-shadow: 2px 2px 4px #000;'>
-            © DGX 2025 • ALL RIGHTS RESERVED
-        </p>
-        <p style='font-size: 0.85rem; color: #666; margin-top: 10px;'>
-            Racing Analytics • Performance Prediction • Data Science
-        </p>
-    </div>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+
+rerun_span.stop()
+if METRICS_FILE:
+    REGISTRY.maybe_write_prometheus(METRICS_FILE)
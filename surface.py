@@ -0,0 +1,215 @@
+"""Precomputed probability surface for instant slider previews.
+
+For one context (season, circuit and driver history), a background thread
+scores a (grid, lap, quali) grid for each driver a viewer selects and
+stores it in a float32 array. Previews are then trilinear interpolation
+over (grid, lap, quali) with no backend call. Race pace and sectors are not
+part of the context: they come from the inputs at the time a driver is
+scored, so the preview is an estimate and START PREDICTION stays the
+official number. The lap and quali axes are centred on the input rounded
+to half the span, so small drags reuse the same surface and the value
+always falls inside the axes.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+import numpy as np
+
+from features import engineer_features
+from metrics import inc
+from predict_client import feature_key
+
+
+def _bracket(axis: np.ndarray, value: float):
+    """Lower index into `axis` and the fractional distance to the next point (clamped)"""
+    if len(axis) == 1:
+        return 0, 0.0
+    i = int(np.clip(np.searchsorted(axis, value, side="right") - 1, 0, len(axis) - 2))
+    frac = (value - axis[i]) / (axis[i + 1] - axis[i])
+    return i, float(np.clip(frac, 0.0, 1.0))
+
+
+class Surface:
+    """Win probabilities over (driver, grid position, lap time, best quali)"""
+
+    def __init__(self, key: str, n_drivers: int, lap_axis, quali_axis):
+        self.key = key
+        self.grid_axis = np.arange(1, n_drivers + 1, dtype=np.float64)
+        self.lap_axis = np.asarray(lap_axis, dtype=np.float64)
+        self.quali_axis = np.asarray(quali_axis, dtype=np.float64)
+        self.values = np.full((n_drivers, n_drivers, len(self.lap_axis), len(self.quali_axis)), np.nan,
+                              dtype=np.float32)
+        self.ready = np.zeros(n_drivers, dtype=bool)
+        self.created_at = time.monotonic()
+        self.error = None
+
+    @property
+    def n_drivers(self) -> int:
+        return len(self.grid_axis)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def interpolate(self, driver: int, grid: float, lap: float, quali: float) -> Optional[float]:
+        """Trilinear estimate for one driver, or None while that driver is still being scored"""
+        if not 0 <= driver < self.n_drivers or not self.ready[driver]:
+            return None
+        (g, fg), (l, fl), (q, fq) = (_bracket(self.grid_axis, grid), _bracket(self.lap_axis, lap),
+                                     _bracket(self.quali_axis, quali))
+        cube = self.values[driver, g:g + 2, l:l + 2, q:q + 2].astype(np.float64)
+        # Interpolasi per sumbu; sumbu dengan satu titik saja tidak diinterpolasi
+        for frac in (fg, fl, fq):
+            cube = cube[0] * (1 - frac) + cube[-1] * frac
+        return float(cube)
+
+
+class SurfaceBuilder:
+    """Process-wide LRU of surfaces filled by one background worker thread.
+
+    Only drivers that a viewer actually selects are scored, one driver
+    (grid x lap x quali points) per batch. `max_rows` caps the points scored
+    per driver by thinning the lap/quali axes, and at most `max_new_per_minute`
+    new contexts are started per process; beyond that request() returns None.
+    """
+
+    def __init__(self, lap_span: float = 2.0, points: int = 9, max_surfaces: int = 16,
+                 ttl: float = 600.0, max_rows: int = 1000, max_new_per_minute: int = 6):
+        self.lap_span = lap_span
+        self.points = points
+        self.max_surfaces = max_surfaces
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.max_new_per_minute = max_new_per_minute
+        # key -> (surface, konteks scoring); jobs: key -> driver yang diminta, terbaru di depan
+        self._surfaces = OrderedDict()
+        self._jobs = OrderedDict()
+        self._started = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.throttled = 0
+
+    def _points(self, n_drivers: int) -> int:
+        """Points per lap/quali axis so one driver's slice stays within max_rows"""
+        fit = int(np.sqrt(self.max_rows / max(n_drivers, 1))) if self.max_rows else self.points
+        return max(2, min(self.points, fit))
+
+    def _axis(self, value: float, points: int) -> np.ndarray:
+        step = self.lap_span / 2
+        centre = round(value / step) * step
+        return np.linspace(centre - self.lap_span, centre + self.lap_span, points)
+
+    def _throttled(self) -> bool:
+        now = time.monotonic()
+        while self._started and now - self._started[0] >= 60.0:
+            self._started.popleft()
+        if self.max_new_per_minute and len(self._started) >= self.max_new_per_minute:
+            return True
+        self._started.append(now)
+        return False
+
+    def request(self, raw: dict, predictor, fastest_quali_time: float, n_drivers: int,
+                avg_positions, avg_points) -> Optional[Surface]:
+        """Surface for the context of `raw` with its selected driver queued for scoring.
+
+        The context key holds only what the preview depends on (season,
+        circuit, driver history and the axes); race pace and sectors are
+        taken from `raw` when a driver is scored. Returns None while new
+        contexts are rate-limited. `predictor` needs ``predict_batch(rows)``;
+        pass the uncached backend so surface rows don't evict real
+        predictions from the shared cache.
+        """
+        points = self._points(n_drivers)
+        lap_axis = self._axis(raw['LapTime (s)'], points)
+        quali_axis = self._axis(raw['BestQuali (s)'], points)
+        avg_positions = np.asarray(avg_positions, dtype=np.float64)
+        avg_points = np.asarray(avg_points, dtype=np.float64)
+        key = feature_key([raw['Year'], fastest_quali_time, lap_axis[0], quali_axis[0], points, n_drivers,
+                           *avg_positions, *avg_points])
+        driver = int(raw['DriverEncoded'])
+        with self._cond:
+            entry = self._surfaces.get(key)
+            if entry is not None and (entry[0].error is None and time.monotonic() - entry[0].created_at < self.ttl):
+                self._surfaces.move_to_end(key)
+                surface = entry[0]
+            else:
+                if self._throttled():
+                    self.throttled += 1
+                    inc("surface.throttled")
+                    return None
+                surface = Surface(key, n_drivers, lap_axis, quali_axis)
+                self._jobs.pop(key, None)
+                inc("surface.requested")
+            # Driver berikutnya di-score dengan race pace / sector terbaru
+            self._surfaces[key] = (surface, (predictor, dict(raw), fastest_quali_time, avg_positions, avg_points))
+            while len(self._surfaces) > self.max_surfaces:
+                old_key, _ = self._surfaces.popitem(last=False)
+                self._jobs.pop(old_key, None)
+            if 0 <= driver < n_drivers and not surface.ready[driver]:
+                # Driver yang sedang dilihat naik ke depan antrean
+                wanted = self._jobs.setdefault(key, [])
+                if driver in wanted:
+                    wanted.remove(driver)
+                wanted.insert(0, driver)
+                self._jobs.move_to_end(key, last=False)
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="surface-builder", daemon=True)
+                    self._thread.start()
+                self._cond.notify()
+            return surface
+
+    def _next_batch(self):
+        """Pop the next (surface, context, driver) to score, newest request first"""
+        with self._cond:
+            while not self._jobs:
+                self._cond.wait()
+            key = next(iter(self._jobs))
+            wanted = self._jobs[key]
+            driver = wanted.pop(0)
+            if not wanted:
+                del self._jobs[key]
+            surface, context = self._surfaces[key]
+            return surface, context, driver
+
+    def _run(self):
+        while True:
+            surface, (predictor, raw, fastest_quali_time, avg_positions, avg_points), driver = self._next_batch()
+            if surface.ready[driver]:
+                continue
+            try:
+                surface.values[[driver]] = self.score(surface, [driver], predictor, raw, fastest_quali_time,
+                                                      avg_positions, avg_points)
+                surface.ready[driver] = True
+            except Exception as e:
+                surface.error = str(e)
+                with self._cond:
+                    self._jobs.pop(surface.key, None)
+                inc("surface.failed")
+
+    @staticmethod
+    def score(surface: Surface, drivers, predictor, raw: dict, fastest_quali_time: float,
+              avg_positions, avg_points) -> np.ndarray:
+        """Score every (grid, lap, quali) point for `drivers` in one batch"""
+        d, g, l, q = np.meshgrid(np.asarray(drivers), surface.grid_axis, surface.lap_axis, surface.quali_axis,
+                                 indexing="ij")
+        d = d.ravel().astype(np.int64)
+        grid_raw = dict(raw)
+        grid_raw.update({
+            'GridPosition': g.ravel(), 'LapTime (s)': l.ravel(), 'BestQuali (s)': q.ravel(),
+            'DriverEncoded': d, 'AvgPrevPositions': avg_positions[d], 'AvgPrevPoints': avg_points[d],
+        })
+        matrix = engineer_features(grid_raw, fastest_quali_time)
+        probs = np.asarray(predictor.predict_batch(matrix.tolist()), dtype=np.float32)
+        inc("surface.rows", len(probs))
+        return probs.reshape((len(drivers),) + surface.values.shape[1:])
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "surfaces": len(self._surfaces),
+                "pending": sum(len(wanted) for wanted in self._jobs.values()),
+                "bytes": sum(surface.nbytes for surface, _ in self._surfaces.values()),
+                "throttled": self.throttled,
+            }
@@ -0,0 +1,179 @@
+"""Columnar lap-telemetry store used to auto-fill the lap/sector inputs.
+
+Lap exports (CSV or Parquet, one row per lap) are ingested once into a
+directory of ``.npy`` columns sorted by (season, circuit, session, driver)
+and then by lap time, plus the start offset of every group. The store is
+opened with ``mmap_mode="r"``: nothing is parsed on load, a group is a
+contiguous slice, and because each group is sorted by lap time its best lap
+is the first row and its median the middle one. Per-group summaries are
+therefore plain fancy-indexing over the offsets, for every group at once.
+
+    python -m telemetry laps_2025.parquet more_laps.csv --store data/telemetry
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+LAP_COLUMNS = [
+    'Season', 'Circuit', 'Session', 'DriverEncoded',
+    'LapTime (s)', 'Sector1Time (s)', 'Sector2Time (s)', 'Sector3Time (s)',
+]
+VALUE_COLUMNS = ['LapTime (s)', 'Sector1Time (s)', 'Sector2Time (s)', 'Sector3Time (s)']
+_FILES = {'LapTime (s)': 'lap_time', 'Sector1Time (s)': 'sector1', 'Sector2Time (s)': 'sector2',
+          'Sector3Time (s)': 'sector3'}
+
+QUALI_SESSIONS = ("Q", "Q1", "Q2", "Q3", "SQ")
+RACE_SESSIONS = ("R",)
+
+# Radix kunci grup: ((season * 1000 + circuit) * 100 + session) * 1000 + driver
+_CIRCUIT_RADIX, _SESSION_RADIX, _DRIVER_RADIX = 1000, 100, 1000
+META_FILE = "meta.json"
+
+
+def group_key(season, circuit_code, session_code, driver):
+    """Single int64 key per (season, circuit, session, driver), sortable like the tuple"""
+    season, circuit_code, session_code, driver = (np.asarray(a, dtype=np.int64)
+                                                  for a in (season, circuit_code, session_code, driver))
+    return ((season * _CIRCUIT_RADIX + circuit_code) * _SESSION_RADIX + session_code) * _DRIVER_RADIX + driver
+
+
+def meta_path(store_dir) -> Path:
+    return Path(store_dir) / META_FILE
+
+
+def ingest(sources, store_dir, chunksize: int = 500_000) -> int:
+    """Read lap files into a sorted, memory-mappable store; return the number of laps"""
+    import pandas as pd
+
+    from bulk_scoring import iter_input_chunks
+
+    frames = []
+    for source in sources:
+        for chunk in iter_input_chunks(source, str(source), chunksize):
+            missing = [c for c in LAP_COLUMNS if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"{source}: missing columns {', '.join(missing)}")
+            frames.append(chunk[LAP_COLUMNS].dropna(subset=['LapTime (s)']))
+    laps = pd.concat(frames, ignore_index=True)
+
+    circuit_codes, circuits = pd.factorize(laps['Circuit'].astype(str).str.lower(), sort=True)
+    session_codes, sessions = pd.factorize(laps['Session'].astype(str).str.upper(), sort=True)
+    drivers = laps['DriverEncoded'].to_numpy(dtype=np.int64)
+    if len(circuits) > _CIRCUIT_RADIX or len(sessions) > _SESSION_RADIX or drivers.max() >= _DRIVER_RADIX:
+        raise ValueError("Too many circuits, sessions or driver IDs for the store's key layout")
+    keys = group_key(laps['Season'].to_numpy(dtype=np.int64), circuit_codes, session_codes, drivers)
+    lap_times = laps['LapTime (s)'].to_numpy(dtype=np.float64)
+    order = np.lexsort((lap_times, keys))
+    groups, starts = np.unique(keys[order], return_index=True)
+
+    # Tulis ke direktori sementara lalu ganti sekaligus; meta.json (penanda versi) ditulis terakhir
+    store_dir = Path(store_dir)
+    tmp_dir = store_dir.with_name(store_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    np.save(tmp_dir / "groups.npy", groups)
+    np.save(tmp_dir / "starts.npy", starts.astype(np.int64))
+    for column, name in _FILES.items():
+        np.save(tmp_dir / f"{name}.npy", laps[column].to_numpy(dtype=np.float64)[order])
+    meta = {
+        "rows": int(len(laps)),
+        "circuits": [str(c) for c in circuits],
+        "sessions": [str(s) for s in sessions],
+        "sources": [Path(str(s)).name for s in sources],
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    (tmp_dir / META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+    return len(laps)
+
+
+class TelemetryStore:
+    """Read-only, memory-mapped view of an ingested store"""
+
+    def __init__(self, store_dir):
+        store_dir = Path(store_dir)
+        self.meta = json.loads(meta_path(store_dir).read_text(encoding="utf-8"))
+        self.groups = np.load(store_dir / "groups.npy")
+        self.starts = np.load(store_dir / "starts.npy")
+        self.columns = {column: np.load(store_dir / f"{name}.npy", mmap_mode="r") for column, name in _FILES.items()}
+        self.ends = np.append(self.starts[1:], self.meta["rows"])
+        self.circuit_codes = {c: i for i, c in enumerate(self.meta["circuits"])}
+        self.session_codes = {s: i for i, s in enumerate(self.meta["sessions"])}
+
+        # Ringkasan semua grup sekaligus (tiap grup sudah urut lap time)
+        lap_time = self.columns['LapTime (s)']
+        lengths = self.ends - self.starts
+        self.best_lap = np.asarray(lap_time[self.starts])
+        self.median_lap = (np.asarray(lap_time[self.starts + (lengths - 1) // 2])
+                           + np.asarray(lap_time[self.starts + lengths // 2])) / 2
+        self.lap_count = lengths
+
+    @classmethod
+    def load(cls, store_dir) -> "TelemetryStore":
+        return cls(store_dir)
+
+    @property
+    def rows(self) -> int:
+        return self.meta["rows"]
+
+    def _find(self, season: int, circuit: str, sessions, driver: int) -> np.ndarray:
+        """Indices of the groups that exist for any of `sessions`"""
+        circuit_code = self.circuit_codes.get(circuit.lower())
+        codes = [self.session_codes[s] for s in sessions if s in self.session_codes]
+        if circuit_code is None or not codes:
+            return np.empty(0, dtype=np.int64)
+        keys = group_key(season, circuit_code, codes, driver)
+        pos = np.searchsorted(self.groups, keys)
+        pos = pos[pos < len(self.groups)]
+        return pos[np.isin(self.groups[pos], keys)]
+
+    def session_inputs(self, season: int, circuit: str, driver: int) -> Optional[dict]:
+        """Best lap, best quali, median race pace and best-lap sector splits for one driver.
+
+        Returns raw input columns (as in features.RAW_COLUMNS); a value is
+        missing when its session is not in the store. None if nothing matches.
+        """
+        quali = self._find(season, circuit, QUALI_SESSIONS, driver)
+        race = self._find(season, circuit, RACE_SESSIONS, driver)
+        if not len(quali) and not len(race):
+            return None
+
+        inputs = {}
+        if len(quali):
+            inputs['BestQuali (s)'] = float(self.best_lap[quali].min())
+        # Lap tercepat & sector dari balapan; tanpa data balapan, pakai lap tercepat quali
+        groups = race if len(race) else quali
+        best = groups[np.argmin(self.best_lap[groups])]
+        row = self.starts[best]
+        inputs['LapTime (s)'] = float(self.best_lap[best])
+        for column in VALUE_COLUMNS[1:]:
+            value = float(self.columns[column][row])
+            if np.isfinite(value):
+                inputs[column] = value
+        if len(race):
+            counts = self.lap_count[race]
+            inputs['RacePace (s)'] = float(np.average(self.median_lap[race], weights=counts))
+        inputs['laps'] = int(self.lap_count[np.concatenate([quali, race])].sum())
+        return inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest lap exports into the telemetry store")
+    parser.add_argument("sources", nargs="+", type=Path, help="CSV or Parquet lap files")
+    parser.add_argument("--store", type=Path, default=Path("data/telemetry"))
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    rows = ingest(args.sources, args.store, args.chunksize)
+    print(f"Ingested {rows:,} laps into {args.store} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from bulk_scoring import OUTPUT_COLUMN, new_output_path, score_file
+from features import REQUIRED_RAW_COLUMNS
+from predict_client import CachedPredictor, PredictionCache
+
+
+class ConstantPredictor:
+    def predict_batch(self, rows):
+        return [0.25] * len(rows)
+
+
+def _score(csv: str, tmp_path):
+    predictor = CachedPredictor(ConstantPredictor(), PredictionCache())
+    out = tmp_path / "scored.csv"
+    rows = score_file(io.StringIO(csv), "in.csv", out, "csv", predictor, np.zeros(20), np.zeros(20), chunksize=2)
+    return rows, pd.read_csv(out), predictor
+
+
+def test_header_only_csv_writes_header(tmp_path):
+    rows, scored, _ = _score(",".join(REQUIRED_RAW_COLUMNS) + "\n", tmp_path)
+    assert rows == 0
+    assert list(scored.columns) == REQUIRED_RAW_COLUMNS + [OUTPUT_COLUMN]
+
+
+def test_rows_are_scored_without_filling_the_shared_cache(tmp_path):
+    line = "5,80.1,79.9,81.2,26,27,27.1,3\n"
+    rows, scored, predictor = _score(",".join(REQUIRED_RAW_COLUMNS) + "\n" + line * 5, tmp_path)
+    assert rows == 5
+    assert (scored[OUTPUT_COLUMN] == 0.25).all()
+    assert predictor.cache.stats()["entries"] == 0
+
+
+def test_new_output_prunes_only_old_outputs(tmp_path):
+    old, recent = new_output_path(tmp_path, "csv"), new_output_path(tmp_path, "parquet")
+    other = tmp_path / "notes.txt"
+    other.write_text("keep")
+    hour_ago = time.time() - 3600
+    os.utime(old, (hour_ago, hour_ago))
+    os.utime(other, (hour_ago, hour_ago))
+
+    fresh = new_output_path(tmp_path, "csv", max_age=1800)
+    assert not old.exists() and recent.exists() and other.exists()
+    assert fresh.suffix == ".csv" and fresh.exists() and fresh.parent == tmp_path
@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pytest
+
+from content import header_html
+from drivers import DriverRegistry
+
+
+def _driver(i, name, team, avg_pos, avg_points):
+    return {"id": i, "name": name, "team": team, "avg_pos": avg_pos, "avg_points": avg_points}
+
+
+TWO_SEASONS = {
+    "version": "test.1",
+    "default_season": 2025,
+    "seasons": {
+        "2024": {
+            "history_from": 2023,
+            "drivers": [
+                _driver(1, "Lando Norris", "McLaren", 4.0, 15.0),
+                _driver(0, "Max Verstappen", "Red Bull", 1.5, 22.0),
+                _driver(2, "Carlos Sainz", "Ferrari", 5.5, 11.0),
+            ],
+            "circuits": {
+                "bahrain": {"name": "Bahrain GP", "fastest_quali_time": 89.179},
+                "monaco": {"name": "Monaco GP", "fastest_quali_time": 70.27},
+            },
+        },
+        "2025": {
+            "history_from": 2024,
+            "default_circuit": "mexico_city",
+            "drivers": [
+                _driver(0, "Max Verstappen", "Red Bull", 2.0, 18.0),
+                _driver(1, "Lando Norris", "McLaren", 2.5, 19.0),
+                _driver(2, "Lewis Hamilton", "Ferrari", 6.0, 9.0),
+                _driver(3, "Oscar Piastri", "McLaren", 3.0, 17.0),
+            ],
+            "circuits": {
+                "monaco": {"name": "Monaco GP", "fastest_quali_time": 69.954},
+                "mexico_city": {"name": "Mexico City GP", "fastest_quali_time": 78.0},
+            },
+        },
+    },
+}
+
+
+@pytest.fixture
+def registry(tmp_path):
+    path = tmp_path / "drivers.json"
+    path.write_text(json.dumps(TWO_SEASONS), encoding="utf-8")
+    return DriverRegistry.load(path)
+
+
+def test_each_season_keeps_its_own_grid_and_circuits(registry):
+    assert registry.years == [2025, 2024] and registry.version == "test.1"
+    assert registry.season().year == 2025 and registry.season(2024).year == 2024
+
+    old, new = registry.season(2024), registry.season(2025)
+    assert (old.n_drivers, new.n_drivers) == (3, 4)
+    # ID yang sama bisa jadi driver lain di musim lain
+    assert old.label(2) == "Carlos Sainz (Ferrari)" and new.label(2) == "Lewis Hamilton (Ferrari)"
+    assert old.label(3) == "Unknown Driver"
+    np.testing.assert_array_equal(old.avg_points, [22.0, 15.0, 11.0])
+    assert old.fastest_quali_time("monaco") == 70.27 and new.fastest_quali_time("monaco") == 69.954
+    # Tanpa default_circuit: sirkuit pertama di file
+    assert old.default_circuit == "bahrain" and new.fastest_quali_time() == 78.0
+
+
+def test_header_names_the_selected_event(registry):
+    season = registry.season(2024)
+    assert "MONACO GRAND PRIX 2024" in header_html(season.circuit_name("monaco"), season.year)
+    assert "MEXICO CITY GRAND PRIX 2025" in header_html("Mexico City GP", 2025)
+    assert "R&amp;D CUP 2025" in header_html("R&D Cup", 2025)
+
+
+@pytest.mark.parametrize("edit, message", [
+    (lambda data: data["seasons"]["2024"]["drivers"].pop(0), "without gaps"),
+    (lambda data: data["seasons"]["2025"].update(default_circuit="suzuka"), "unknown default circuit"),
+    (lambda data: data.update(default_season=2023), "not in the data file"),
+])
+def test_invalid_registry_is_rejected(tmp_path, edit, message):
+    data = json.loads(json.dumps(TWO_SEASONS))
+    edit(data)
+    path = tmp_path / "drivers.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    with pytest.raises(ValueError, match=message):
+        DriverRegistry.load(path)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from features import FEATURE_ORDER, RAW_COLUMNS, engineer_features, format_input_data
+
+
+def baseline_features(raw: dict, fastest_quali_time: float = 78.0) -> list:
+    """The scalar formulas of the original single-row app, feature by feature"""
+    s1, s2, s3 = raw['Sector1Time (s)'], raw['Sector2Time (s)'], raw['Sector3Time (s)']
+    total_sector_time = s1 + s2 + s3
+    inputs = dict(raw)
+    inputs.update({
+        'SectorTimeConsistency': np.std([s1, s2, s3]),
+        'QualiAdvantage': raw['BestQuali (s)'] - raw['LapTime (s)'],
+        'PositionImprovement': float(raw['GridPosition'] - 5),
+        'RacePaceEfficiency': raw['RacePace (s)'] / raw['LapTime (s)'],
+        'Sector1Ratio': s1 / total_sector_time,
+        'Sector2Ratio': s2 / total_sector_time,
+        'Sector3Ratio': s3 / total_sector_time,
+        'TimeDiffFromFastest': max(0, raw['BestQuali (s)'] - fastest_quali_time),
+    })
+    return [0.0 if key == 'Dummy' else float(inputs[key]) for key in FEATURE_ORDER]
+
+
+def random_raw(rng) -> dict:
+    return {
+        'Year': 2025.0, 'GridPosition': int(rng.integers(1, 21)), 'LapTime (s)': rng.uniform(76, 84),
+        'BestQuali (s)': rng.uniform(76, 84), 'RacePace (s)': rng.uniform(78, 86),
+        'Sector1Time (s)': rng.uniform(24, 29), 'Sector2Time (s)': rng.uniform(25, 30),
+        'Sector3Time (s)': rng.uniform(24, 29), 'DriverEncoded': int(rng.integers(0, 20)),
+        'AvgPrevPositions': rng.uniform(1, 20), 'AvgPrevPoints': rng.uniform(0, 25),
+    }
+
+
+@pytest.mark.parametrize("fastest", [78.0, 90.0])
+def test_single_row_matches_baseline(fastest):
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        raw = random_raw(rng)
+        np.testing.assert_allclose(engineer_features(raw, fastest)[0], baseline_features(raw, fastest), rtol=1e-12)
+
+
+def test_batch_matches_row_by_row():
+    rng = np.random.default_rng(1)
+    rows = [random_raw(rng) for _ in range(100)]
+    matrix = engineer_features(np.array([[row[c] for c in RAW_COLUMNS] for row in rows]))
+    assert matrix.shape == (100, len(FEATURE_ORDER))
+    np.testing.assert_allclose(matrix, [baseline_features(row) for row in rows], rtol=1e-12)
+
+
+def test_per_row_fastest_quali_time():
+    raw = random_raw(np.random.default_rng(2))
+    raw['BestQuali (s)'] = 80.0
+    matrix = engineer_features({k: np.repeat(v, 2) for k, v in raw.items()}, np.array([78.0, 81.0]))
+    assert list(matrix[:, FEATURE_ORDER.index('TimeDiffFromFastest')]) == pytest.approx([2.0, 0.0])
+
+
+def test_format_input_data_orders_features():
+    raw = random_raw(np.random.default_rng(3))
+    row = engineer_features(raw)[0]
+    assert format_input_data(dict(zip(FEATURE_ORDER, row))) == pytest.approx(baseline_features(raw))
@@ -0,0 +1,56 @@
+import numpy as np
+
+from features import FEATURE_INDEX, N_FEATURES
+from history import PredictionHistory
+
+
+def _row(lap_time, grid=5):
+    row = np.zeros(N_FEATURES)
+    row[FEATURE_INDEX['LapTime (s)']] = lap_time
+    row[FEATURE_INDEX['GridPosition']] = grid
+    return row
+
+
+def test_stored_run_loads_back_its_inputs():
+    history = PredictionHistory(capacity=4)
+    run_id = history.add(_row(80.5, grid=3), 0.42, "Max Verstappen (Red Bull)")
+
+    run = history.get(run_id)
+    assert run["label"] == "Max Verstappen (Red Bull)" and run["probability"] == 0.42
+    assert run["inputs"]["LapTime (s)"] == 80.5 and run["inputs"]["GridPosition"] == 3
+    assert "Dummy" not in run["inputs"]
+    # Salinan: mengubah hasil get tidak mengubah history
+    run["features"][:] = 0
+    assert history.get(run_id)["inputs"]["LapTime (s)"] == 80.5
+
+    [summary] = history.rows()
+    assert summary["Run"] == run_id and summary["Grid"] == 3 and summary["Win Probability"] == 42.0
+
+
+def test_identical_row_is_touched_not_duplicated():
+    history = PredictionHistory(capacity=4)
+    first = history.add(_row(80.5), 0.3)
+    assert history.add(_row(80.5), 0.35) == first
+    assert len(history) == 1 and history.get(first)["probability"] == 0.35
+
+
+def test_least_recently_used_run_is_evicted_at_capacity():
+    history = PredictionHistory(capacity=3)
+    ids = [history.add(_row(80 + i), 0.1 * i) for i in range(3)]
+    nbytes = history.nbytes
+    # Run pertama dibuka lagi: run kedua jadi yang paling lama tidak dipakai
+    history.get(ids[0])
+    newest = history.add(_row(90.0), 0.9)
+
+    assert len(history) == 3 and history.evictions == 1
+    assert history.get(ids[1]) is None
+    assert sorted(history.run_ids_recent_first()) == sorted([ids[0], ids[2], newest])
+    # Kapasitas tetap: ukuran tidak tumbuh setelah penuh
+    assert history.nbytes == nbytes
+
+
+def test_clear_forgets_every_run():
+    history = PredictionHistory(capacity=2)
+    run_id = history.add(_row(80.0), 0.2)
+    history.clear()
+    assert len(history) == 0 and history.get(run_id) is None and history.rows() == []
@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+
+from features import FEATURE_ORDER
+from live_feed import LiveBoard
+
+
+class ConstantPredictor:
+    def __init__(self):
+        self.calls = []
+
+    def predict_rows(self, rows, cache=True):
+        self.calls.append((np.asarray(rows), cache))
+        return [0.25] * len(rows)
+
+
+def _laps(feed, *records):
+    with open(feed, "a") as f:
+        f.write("".join(json.dumps(record) + "\n" for record in records))
+
+
+def test_bad_records_are_skipped(tmp_path):
+    feed = tmp_path / "feed.jsonl"
+    lines = [
+        {"driver": 1, "lap_time": None},
+        {"driver": "ham", "lap_time": 80.0},
+        {"driver": 2, "lap_time": 81.5, "sector1": None, "position": 3},
+        {"lap_time": 79.0},
+        [1, 2, 3],
+        {"driver": 4, "lap_time": 80.2, "session": "Q"},
+    ]
+    feed.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    board = LiveBoard(feed, n_drivers=5)
+    state = board.tick(ConstantPredictor(), "ctx", 2024, np.zeros(5), np.zeros(5), 78.0, force=True)
+
+    assert board.skipped == 4
+    assert list(np.flatnonzero(state["laps"])) == [2, 4]
+    assert state["rescored"] == 2 and state["probabilities"][2] == 0.25
+
+
+def test_tick_rescores_only_changed_drivers_without_caching(tmp_path):
+    feed = tmp_path / "feed.jsonl"
+    _laps(feed, *({"driver": i, "lap_time": 80.0 + i, "position": i + 1} for i in range(4)),
+          {"driver": 2, "lap_time": 81.0, "session": "Q"})
+    board, predictor = LiveBoard(feed, n_drivers=4), ConstantPredictor()
+    args = (predictor, "ctx", 2024, np.zeros(4), np.zeros(4), 78.0)
+
+    assert board.tick(*args, force=True)["rescored"] == 4
+    # Lap quali driver 2 lebih lambat dari best quali/best lap-nya: agregat tidak berubah, tidak dinilai ulang
+    _laps(feed, {"driver": 1, "lap_time": 79.5, "position": 2}, {"driver": 2, "lap_time": 81.5, "session": "Q"},
+          {"driver": 3, "lap_time": 83.0, "position": 1})
+    state = board.tick(*args, force=True)
+    assert state["rescored"] == 2
+    rows, cache = predictor.calls[-1]
+    assert len(rows) == 2 and cache is False
+    assert list(rows[:, FEATURE_ORDER.index("DriverEncoded")]) == [1, 3]
+
+    assert board.tick(*args, force=True)["rescored"] == 0
+    assert len(predictor.calls) == 2
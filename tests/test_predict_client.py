@@ -0,0 +1,202 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from predict_client import (LOCAL_SOURCE, CachedPredictor, CircuitOpenError, LocalProbabilities, PredictClient,
+                            PredictError, PredictionCache, SingleFlight)
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight(timeout=5)
+    release, calls, results = threading.Event(), [], []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return {"winner_probability": 0.5}
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1
+    assert results == [{"winner_probability": 0.5}] * 8
+    assert flight.in_flight() == 0
+
+
+def test_single_flight_passes_errors_to_waiters():
+    flight = SingleFlight(timeout=5)
+    release, errors = threading.Event(), []
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("backend down")
+
+    def call():
+        try:
+            flight.do("k", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert errors == ["backend down"] * 5
+    # Error tidak tersimpan: panggilan berikutnya dieksekusi ulang
+    assert flight.do("k", lambda: 1) == 1
+
+
+def test_cache_lru_eviction_and_ttl():
+    cache = PredictionCache(max_entries=2, ttl=0.05)
+    cache.put("a", {"winner_probability": 0.1})
+    cache.put("b", {"winner_probability": 0.2})
+    assert cache.get("a") is not None
+    cache.put("c", {"winner_probability": 0.3})
+    assert cache.get("b") is None
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("invalidate", [True, False])
+def test_cache_model_version_change(invalidate):
+    cache = PredictionCache()
+    cache.observe_model_version("v1")
+    cache.put("a", {"winner_probability": 0.1})
+    assert cache.observe_model_version("v2", invalidate)
+    assert (cache.get("a") is None) == invalidate
+
+
+def test_local_results_are_not_cached():
+    class Local:
+        def predict(self, features):
+            return {"winner_probability": 0.5, "model_version": "local-logit", "source": LOCAL_SOURCE}
+
+        def predict_batch(self, rows):
+            return LocalProbabilities([0.5] * len(rows))
+
+    cache = PredictionCache()
+    predictor = CachedPredictor(Local(), cache)
+    predictor.predict([1.0, 2.0])
+    assert predictor.predict_rows([[3.0, 4.0]]) == [0.5]
+    assert cache.stats()["entries"] == 0
+    assert cache.model_version is None
+
+
+def test_worst_case_covers_every_retry():
+    client = PredictClient("http://127.0.0.1:9/predict", connect_timeout=3.0, read_timeout=10.0,
+                           max_retries=2, backoff=0.5)
+    assert client.worst_case_seconds == pytest.approx(13.0 * 3 + 0.5 + 1.0)
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers every POST with the server's (status, body, headers) script, one entry per request"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status, body, headers = self.server.script[min(self.server.hits, len(self.server.script) - 1)]
+        self.server.hits += 1
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def scripted():
+    servers = []
+
+    def start(*script):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _ScriptedHandler)
+        server.script, server.hits = list(script), 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, PredictClient(f"http://127.0.0.1:{server.server_port}/predict", backoff=0.0,
+                                     failure_threshold=2, reset_timeout=60)
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+OK = (200, b'{"winner_probability": 0.3}', {"Content-Type": "application/json"})
+
+
+def test_retries_transient_status_then_succeeds(scripted):
+    server, client = scripted((503, b"", {}), (502, b"", {}), OK)
+    assert client.predict([0.0] * 20) == {"winner_probability": 0.3}
+    assert server.hits == 3 and client.breaker.state == "closed"
+
+
+def test_breaker_opens_after_repeated_failures(scripted):
+    server, client = scripted((503, b"", {}))
+    for _ in range(2):
+        with pytest.raises(PredictError):
+            client.predict([0.0] * 20)
+    assert server.hits == 2 * (client.max_retries + 1)
+    with pytest.raises(CircuitOpenError):
+        client.predict([0.0] * 20)
+    assert server.hits == 2 * (client.max_retries + 1)
+
+
+def test_client_errors_are_not_retried(scripted):
+    server, client = scripted((404, b"", {}))
+    with pytest.raises(PredictError) as e:
+        client.predict([0.0] * 20)
+    assert e.value.status_code == 404 and server.hits == 1 and client.breaker.state == "closed"
+
+
+@pytest.mark.parametrize("response", [
+    (200, b"<html>bad gateway</html>", {"Content-Type": "text/html"}),
+    (200, b"[0.3]", {"Content-Type": "application/json"}),
+    (307, b"", {"Location": "/predict"}),
+])
+def test_unusable_responses_become_predict_errors_and_count_as_failures(scripted, response):
+    server, client = scripted(response)
+    for _ in range(2):
+        with pytest.raises(PredictError):
+            client.predict([0.0] * 20)
+    assert client.breaker.state == "open"
+
+
+def test_fallback_predictor_survives_a_bad_body(scripted):
+    from predictors import FallbackPredictor
+
+    class Local:
+        def predict(self, features):
+            return {"winner_probability": 0.1}
+
+    _, client = scripted((200, b"not json", {}))
+    assert FallbackPredictor(client, Local()).predict([0.0] * 20) == {"winner_probability": 0.1}
+
+
+def test_async_deadline_stops_retries_in_the_worker_thread():
+    from bench.fake_predict_server import start_server
+
+    server = start_server(latency_ms=400, jitter_ms=0)
+    try:
+        client = PredictClient(server.url, read_timeout=0.3, max_retries=3, backoff=0.0, request_deadline=0.15)
+        results = client.aio.predict_many_sync([[0.0] * 20] * 2, return_exceptions=True)
+        assert all(isinstance(r, PredictError) and r.status_code == 504 for r in results)
+        # Tanpa deadline di _send, thread executor terus retry (4 percobaan x 0.3 detik) di background
+        time.sleep(1.5)
+        assert server.requests == 2
+        assert client.breaker.state == "closed"
+    finally:
+        server.shutdown()
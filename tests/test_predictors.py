@@ -0,0 +1,48 @@
+import time
+
+from predict_client import CachedPredictor, PredictionCache, feature_key
+from predictors import LocalModel, build_predictor
+
+MODEL = LocalModel([0.0] * 20, [1.0] * 20, [0.0] * 20, 0.0, "local-test")
+
+
+class SlowRemote:
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+
+    def predict(self, features):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {"winner_probability": 0.9, "model_version": "v1"}
+
+    def predict_batch(self, rows):
+        time.sleep(self.delay)
+        return [0.9] * len(rows)
+
+
+def test_race_prefers_the_backend_within_the_hedge():
+    race = build_predictor("race", SlowRemote(0.01), lambda: MODEL, hedge_after=1.0)
+    assert race.predict([1.0] * 20)["winner_probability"] == 0.9
+    assert race.predict_batch([[1.0] * 20] * 3) == [0.9] * 3
+
+
+def test_race_answers_locally_and_caches_the_late_backend_answer():
+    remote = SlowRemote(0.2)
+    race = build_predictor("race", remote, lambda: MODEL, hedge_after=0.02)
+    cached = CachedPredictor(race, PredictionCache())
+    race.on_late = cached.remember_late
+    features = [1.0] * 20
+
+    assert cached.predict(features)["source"] == "local"
+    time.sleep(0.3)
+    assert cached.cache.peek(feature_key(features))["winner_probability"] == 0.9
+    assert cached.predict(features)["winner_probability"] == 0.9 and remote.calls == 1
+
+
+def test_local_model_is_resolved_on_every_call():
+    models = [MODEL]
+    local = build_predictor("local", None, lambda: models[-1])
+    assert local.predict([0.0] * 20)["model_version"] == "local-test"
+    models.append(LocalModel([0.0] * 20, [1.0] * 20, [0.0] * 20, 0.0, "local-reloaded"))
+    assert local.predict([0.0] * 20)["model_version"] == "local-reloaded"
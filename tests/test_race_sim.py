@@ -0,0 +1,24 @@
+import numpy as np
+
+from race_sim import POINTS, simulate
+
+
+def test_win_probability_matches_field_share():
+    probs = np.array([0.6, 0.3, 0.2, 0.1, 0.05, 0.05, 0.02, 0.01])
+    result = simulate(probs, n_simulations=200_000, seed=0, chunk_size=30_000)
+    np.testing.assert_allclose(result["win"], probs / probs.sum(), atol=0.005)
+
+
+def test_position_matrix_is_doubly_stochastic():
+    result = simulate(np.random.default_rng(1).uniform(0.01, 0.5, 20), n_simulations=20_000, seed=1)
+    positions = result["positions"]
+    np.testing.assert_allclose(positions.sum(axis=0), 1.0)
+    np.testing.assert_allclose(positions.sum(axis=1), 1.0)
+    np.testing.assert_allclose(result["points"].sum(), POINTS.sum())
+    np.testing.assert_allclose(result["mean_position"].sum(), np.arange(1, 21).sum())
+
+
+def test_seed_is_reproducible():
+    probs = [0.4, 0.3, 0.2, 0.1]
+    a, b = simulate(probs, 5_000, seed=7), simulate(probs, 5_000, seed=7)
+    np.testing.assert_array_equal(a["positions"], b["positions"])
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from predict_client import PredictionCache
+from store import PredictionStore
+
+
+def test_miss_is_read_through_for_the_current_version(tmp_path):
+    store = PredictionStore(tmp_path / "p.sqlite")
+    store.put("a", {"winner_probability": 0.1, "model_version": "v1"})
+    store.put("a", {"winner_probability": 0.2, "model_version": "v2"})
+    store.flush()
+
+    cache = PredictionCache(store=store)
+    cache.model_version = "v2"
+    assert cache.get("a") == {"winner_probability": 0.2, "model_version": "v2"}
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1 and store.stats()["hits"] == 1
+
+
+def test_warm_loads_one_version_and_keeps_the_stored_age(tmp_path):
+    store = PredictionStore(tmp_path / "p.sqlite")
+    store.put("old", {"winner_probability": 0.1, "model_version": "v1"})
+    store.put("new", {"winner_probability": 0.2, "model_version": "v2"})
+    store.flush()
+
+    time.sleep(0.15)
+    cache = PredictionCache(ttl=0.3)
+    assert store.warm(cache, 10) == 1
+    assert cache.model_version == "v2" and cache.peek("old") is None
+    # Umur dari store ikut dihitung: tidak mendapat TTL baru saat dimuat
+    time.sleep(0.2)
+    assert cache.peek("new") is None and store.warm(PredictionCache(ttl=0.3), 10) == 0
+
+
+def test_stats_row_counts_are_cached_for_the_ttl(tmp_path):
+    store = PredictionStore(tmp_path / "p.sqlite", stats_ttl=0.2)
+    store.put("a", {"winner_probability": 0.1, "model_version": "v1"})
+    store.flush()
+    assert store.stats()["rows"] == 1
+
+    store.put("b", {"winner_probability": 0.2, "model_version": "v2"})
+    store.flush()
+    stats = store.stats()
+    assert stats["rows"] == 1 and stats["written"] == 2
+    time.sleep(0.25)
+    assert store.stats()["rows"] == 2 and store.stats()["model_versions"] == 2
+
+
+def test_lookup_counters_are_exact_across_threads(tmp_path):
+    store = PredictionStore(tmp_path / "p.sqlite")
+    store.put("a", {"winner_probability": 0.1})
+    store.flush()
+
+    def lookups():
+        for _ in range(200):
+            store.get("a")
+            store.get("missing")
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = store.stats()
+    assert stats["hits"] == stats["misses"] == 1600
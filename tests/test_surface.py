@@ -0,0 +1,48 @@
+import time
+
+import numpy as np
+import pytest
+
+from surface import SurfaceBuilder
+
+RAW = {
+    'Year': 2024, 'GridPosition': 3, 'LapTime (s)': 80.0, 'BestQuali (s)': 79.5, 'RacePace (s)': 81.0,
+    'Sector1Time (s)': 26.0, 'Sector2Time (s)': 28.0, 'Sector3Time (s)': 26.0, 'DriverEncoded': 1,
+    'AvgPrevPositions': 5.0, 'AvgPrevPoints': 10.0,
+}
+
+
+class CountingPredictor:
+    def __init__(self):
+        self.rows = 0
+
+    def predict_batch(self, rows):
+        self.rows += len(rows)
+        return [row[1] / 100 for row in rows]
+
+
+def wait_ready(surface, driver, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not surface.ready[driver] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert surface.ready[driver], surface.error
+
+
+def test_only_the_selected_driver_is_scored_within_max_rows():
+    predictor, history = CountingPredictor(), np.arange(20.0)
+    builder = SurfaceBuilder(max_rows=1000)
+    surface = builder.request(RAW, predictor, 78.0, 20, history, history)
+    wait_ready(surface, 1)
+    assert predictor.rows <= 1000 and surface.ready.sum() == 1
+    assert surface.interpolate(1, 3.5, 80.0, 79.5) == pytest.approx(0.035)
+
+
+def test_context_ignores_pace_and_sectors_and_new_contexts_are_limited():
+    predictor, history = CountingPredictor(), np.arange(20.0)
+    builder = SurfaceBuilder(max_new_per_minute=2)
+    surface = builder.request(RAW, predictor, 78.0, 20, history, history)
+    assert builder.request(dict(RAW, **{'RacePace (s)': 83.0, 'Sector1Time (s)': 27.0}),
+                           predictor, 78.0, 20, history, history) is surface
+    assert builder.request(dict(RAW, **{'LapTime (s)': 85.0}), predictor, 78.0, 20, history, history) is not None
+    assert builder.request(dict(RAW, **{'LapTime (s)': 90.0}), predictor, 78.0, 20, history, history) is None
+    assert builder.stats()["throttled"] == 1
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from telemetry import TelemetryStore, ingest
+
+
+def _lap(season, circuit, session, driver, lap_time, s1=None, s2=None, s3=None):
+    return {'Season': season, 'Circuit': circuit, 'Session': session, 'DriverEncoded': driver,
+            'LapTime (s)': lap_time, 'Sector1Time (s)': s1, 'Sector2Time (s)': s2, 'Sector3Time (s)': s3}
+
+
+LAPS = [
+    _lap(2025, "Monza", "R", 4, 82.0, 26.0, 28.0, 28.0),
+    _lap(2025, "Monza", "R", 4, 81.1, 25.5, 27.8, 27.8),
+    _lap(2025, "Monza", "R", 4, 83.5, 26.5, 28.5, 28.5),
+    _lap(2025, "Monza", "R", 4, None),
+    _lap(2025, "Monza", "Q1", 4, 80.4),
+    _lap(2025, "Monza", "q3", 4, 79.6, 25.0, 27.3, 27.3),
+    _lap(2025, "Monza", "Q3", 7, 79.1, 24.9, 27.2, 27.0),
+    _lap(2024, "Monza", "R", 4, 84.0, 27.0, 28.5, 28.5),
+    _lap(2025, "Monaco", "Q3", 4, 70.5, 18.5, 32.0, 20.0),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    source = tmp_path / "laps.csv"
+    pd.DataFrame(LAPS).to_csv(source, index=False)
+    assert ingest([source], tmp_path / "store") == len(LAPS) - 1
+    return TelemetryStore.load(tmp_path / "store")
+
+
+def test_session_inputs_summarize_one_driver(store):
+    inputs = store.session_inputs(2025, "monza", 4)
+    # Best quali dari semua sesi quali (nama sesi tidak peka huruf besar/kecil)
+    assert inputs['BestQuali (s)'] == 79.6
+    # Lap tercepat & sector dari balapan, race pace = median lap balapan
+    assert inputs['LapTime (s)'] == 81.1
+    assert (inputs['Sector1Time (s)'], inputs['Sector2Time (s)'], inputs['Sector3Time (s)']) == (25.5, 27.8, 27.8)
+    assert inputs['RacePace (s)'] == 82.0
+    assert inputs['laps'] == 5
+
+
+def test_quali_only_driver_uses_the_quali_lap(store):
+    inputs = store.session_inputs(2025, "Monza", 7)
+    assert inputs['LapTime (s)'] == inputs['BestQuali (s)'] == 79.1
+    assert 'RacePace (s)' not in inputs and inputs['laps'] == 1
+
+
+def test_other_seasons_circuits_and_drivers_do_not_leak(store):
+    assert store.session_inputs(2024, "Monza", 4) == {'LapTime (s)': 84.0, 'Sector1Time (s)': 27.0,
+                                                      'Sector2Time (s)': 28.5, 'Sector3Time (s)': 28.5,
+                                                      'RacePace (s)': 84.0, 'laps': 1}
+    assert store.session_inputs(2025, "Monaco", 4)['LapTime (s)'] == 70.5
+    assert store.session_inputs(2025, "Monza", 9) is None
+    assert store.session_inputs(2025, "Suzuka", 4) is None
+    assert store.session_inputs(2023, "Monza", 4) is None
+
+
+def test_lap_columns_are_memory_mapped(store):
+    assert all(isinstance(column, np.memmap) for column in store.columns.values())
+    assert store.rows == len(LAPS) - 1
+
+
+def test_reingest_replaces_the_store(tmp_path, store):
+    source = tmp_path / "more.csv"
+    pd.DataFrame([_lap(2025, "Suzuka", "R", 1, 90.0)]).to_csv(source, index=False)
+    ingest([source], tmp_path / "store")
+    fresh = TelemetryStore.load(tmp_path / "store")
+    assert fresh.rows == 1 and fresh.session_inputs(2025, "Monza", 4) is None
+    assert fresh.session_inputs(2025, "Suzuka", 1)['LapTime (s)'] == 90.0
+
+
+def test_missing_columns_are_rejected(tmp_path):
+    source = tmp_path / "bad.csv"
+    pd.DataFrame(LAPS).drop(columns=['Session']).to_csv(source, index=False)
+    with pytest.raises(ValueError, match="Session"):
+        ingest([source], tmp_path / "store")
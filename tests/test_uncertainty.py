@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from features import FEATURE_INDEX
+from uncertainty import estimated_positions, monte_carlo, summarize
+
+RAW = {
+    'Year': 2025, 'GridPosition': 3, 'LapTime (s)': 80.5, 'BestQuali (s)': 79.9, 'RacePace (s)': 81.2,
+    'Sector1Time (s)': 25.0, 'Sector2Time (s)': 28.0, 'Sector3Time (s)': 27.5,
+    'DriverEncoded': 4, 'AvgPrevPositions': 3.0, 'AvgPrevPoints': 15.0,
+}
+
+
+class LapTimePredictor:
+    """Win probability falls linearly with lap time (0.5 at 80.5s)"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict_rows(self, rows, cache=True):
+        matrix = np.asarray(rows)
+        self.calls.append((len(matrix), cache))
+        return np.clip(0.5 - (matrix[:, FEATURE_INDEX['LapTime (s)']] - 80.5), 0.0, 1.0).tolist()
+
+
+def test_summarize_reports_the_central_interval():
+    band = summarize(np.linspace(0.0, 1.0, 101), level=0.9)
+    assert band["samples"] == 101 and band["level"] == 0.9
+    assert band["low"] == pytest.approx(0.05) and band["high"] == pytest.approx(0.95)
+    assert band["median"] == pytest.approx(0.5) and band["mean"] == pytest.approx(0.5)
+    assert band["position_distribution"].sum() == pytest.approx(1.0)
+    assert 1 <= band["position_low"] <= band["position_high"] <= 11
+
+
+def test_estimated_positions_are_clipped_to_the_grid():
+    assert estimated_positions([1.0, 0.5, 0.0, -2.0], max_position=20).tolist() == [1, 6, 11, 20]
+
+
+def test_band_widens_with_noise_and_brackets_the_point_estimate():
+    predictor = LapTimePredictor()
+    narrow = monte_carlo(RAW, predictor, n_samples=2000, lap_sigma=0.05, sector_sigma=0.02)
+    wide = monte_carlo(RAW, predictor, n_samples=2000, lap_sigma=0.3, sector_sigma=0.1)
+
+    for band in (narrow, wide):
+        assert band["low"] < 0.5 < band["high"] and band["median"] == pytest.approx(0.5, abs=0.02)
+    assert wide["high"] - wide["low"] > 4 * (narrow["high"] - narrow["low"])
+    # Sigma lap 0.3 -> interval 90% sekitar +-1.645 sigma
+    assert wide["high"] - wide["low"] == pytest.approx(2 * 1.645 * 0.3, rel=0.1)
+    # Satu batch per band, tanpa mengisi cache bersama
+    assert predictor.calls == [(2000, False), (2000, False)]
+
+
+def test_same_inputs_draw_the_same_band():
+    first = monte_carlo(RAW, LapTimePredictor(), n_samples=500)
+    again = monte_carlo(RAW, LapTimePredictor(), n_samples=500)
+    other = monte_carlo({**RAW, 'GridPosition': 4}, LapTimePredictor(), n_samples=500)
+    assert (first["low"], first["high"]) == (again["low"], again["high"])
+    assert (first["low"], first["high"]) != (other["low"], other["high"])
+
+
+def test_zero_noise_collapses_the_band():
+    band = monte_carlo(RAW, LapTimePredictor(), n_samples=50, lap_sigma=0.0, sector_sigma=0.0)
+    assert band["low"] == band["high"] == band["median"] == pytest.approx(0.5) and band["std"] == 0.0
@@ -0,0 +1,100 @@
+import gzip
+
+import numpy as np
+import pytest
+
+import wire
+from features import N_FEATURES
+
+
+@pytest.fixture
+def matrix():
+    return np.random.default_rng(0).normal(80, 5, size=(37, N_FEATURES))
+
+
+@pytest.mark.parametrize("fmt", ["json", "f64", "arrow"])
+def test_rows_round_trip_exactly(matrix, fmt):
+    if fmt == "arrow":
+        pytest.importorskip("pyarrow")
+    body, content_type = wire.encode_rows(matrix, fmt)
+    assert wire.format_of(content_type) == fmt
+    np.testing.assert_array_equal(wire.decode_rows(body, content_type), matrix)
+
+
+def test_f32_rows_round_trip_to_float32_precision(matrix):
+    body, content_type = wire.encode_rows(matrix, "f32")
+    assert len(body) == matrix.size * 4
+    np.testing.assert_allclose(wire.decode_rows(body, content_type), matrix, rtol=1e-6)
+
+
+@pytest.mark.parametrize("fmt", ["f64", "f32", "arrow"])
+def test_probabilities_round_trip(fmt):
+    if fmt == "arrow":
+        pytest.importorskip("pyarrow")
+    probs = np.linspace(0, 1, 20)
+    body, content_type = wire.encode_probabilities(probs, fmt)
+    np.testing.assert_allclose(wire.decode_probabilities(body, content_type), probs, rtol=1e-6)
+
+
+def test_media_type_parameters():
+    assert wire.parse_media_type("application/x-ndarray; dtype=<f4; shape=3,20") == (
+        wire.NDARRAY, {"dtype": "<f4", "shape": "3,20"})
+    assert wire.format_of(None) == "json"
+    assert wire.format_of(wire.media_type("f32")) == "f32"
+
+
+def test_maybe_gzip_threshold():
+    body = b"x" * 1000
+    assert wire.maybe_gzip(body, 0) == (body, None)
+    assert wire.maybe_gzip(body, 2000) == (body, None)
+    compressed, encoding = wire.maybe_gzip(body, 1000)
+    assert encoding == "gzip" and gzip.decompress(compressed) == body
+
+
+def test_large_json_batches_are_gzipped():
+    from bench.fake_predict_server import start_server
+    from predict_client import PredictClient
+
+    server = start_server(latency_ms=0, jitter_ms=0)
+    try:
+        rows = np.random.default_rng(1).random((500, 20)).tolist()
+        plain = PredictClient(server.url, gzip_min_bytes=0).predict_batch(rows)
+        sent_plain = server.bytes_in
+        zipped = PredictClient(server.url, gzip_min_bytes=1024).predict_batch(rows)
+        assert zipped == plain
+        assert server.requests == 2 and server.bytes_in - sent_plain < sent_plain / 2
+    finally:
+        server.shutdown()
+
+
+def test_rejected_gzip_is_resent_plain():
+    from bench.fake_predict_server import start_server
+    from predict_client import PredictClient
+
+    server = start_server(latency_ms=0, jitter_ms=0, gzip=False)
+    try:
+        client = PredictClient(server.url, gzip_min_bytes=1024)
+        rows = np.random.default_rng(2).random((100, 20)).tolist()
+        assert len(client.predict_batch(rows)) == 100
+        assert client.gzip_supported is False and client.batch_supported is True
+        client.predict_batch(rows)
+        assert server.requests == 3
+    finally:
+        server.shutdown()
+
+
+def test_binary_rejection_falls_back_once_without_blaming_gzip():
+    from bench.fake_predict_server import start_server
+    from predict_client import PredictClient
+
+    server = start_server(latency_ms=0, jitter_ms=0, binary=False)
+    try:
+        # batch_recheck=0: format yang ditolak tidak boleh diaktifkan lagi di panggilan yang sama
+        client = PredictClient(server.url, wire_format="f64", gzip_min_bytes=1024, batch_recheck=0)
+        rows = np.random.default_rng(3).random((100, 20)).tolist()
+        assert len(client.predict_batch(rows)) == 100
+        # f64 gzip (415), f64 polos (415 -> bukan salah gzip), JSON gzip (200)
+        assert server.requests == 3
+        assert client.wire_format_supported is False and client.gzip_supported is True
+    finally:
+        server.shutdown()
@@ -0,0 +1,71 @@
+"""Monte Carlo uncertainty around a single prediction.
+
+Lap, quali, race-pace and sector inputs are perturbed with Gaussian noise,
+all samples are feature-engineered in one vectorized pass and scored as one
+batch. The samples bypass the shared prediction cache (and its disk store),
+so a band never evicts real predictions. The sample seed is derived from
+the inputs, so repeating a run draws the same samples and gives the same band.
+"""
+from typing import Optional
+
+import numpy as np
+
+from features import FASTEST_QUALI_TIME, engineer_features
+from predict_client import feature_key
+
+LAP_COLUMNS = ('LapTime (s)', 'BestQuali (s)', 'RacePace (s)')
+SECTOR_COLUMNS = ('Sector1Time (s)', 'Sector2Time (s)', 'Sector3Time (s)')
+
+
+def estimated_positions(probabilities, max_position: int = 20) -> np.ndarray:
+    """Finishing position heuristic of the result panel, P = 1 + (1 - p) * 10, vectorized"""
+    probs = np.asarray(probabilities, dtype=np.float64)
+    return np.clip((1 + (1 - probs) * 10).astype(np.int64), 1, max_position)
+
+
+def perturb_inputs(raw: dict, n_samples: int, lap_sigma: float, sector_sigma: float,
+                   seed: Optional[int] = None) -> dict:
+    """`n_samples` copies of one row of raw inputs with noisy lap/quali/pace and sector times"""
+    rng = np.random.default_rng(seed)
+    samples = dict(raw)
+    for column in LAP_COLUMNS:
+        samples[column] = raw[column] + rng.normal(0.0, lap_sigma, n_samples)
+    for column in SECTOR_COLUMNS:
+        samples[column] = raw[column] + rng.normal(0.0, sector_sigma, n_samples)
+    return samples
+
+
+def summarize(probabilities, level: float = 0.9, max_position: int = 20) -> dict:
+    """Central interval, spread and estimated-position distribution of sampled probabilities"""
+    probs = np.asarray(probabilities, dtype=np.float64)
+    tail = (1 - level) / 2
+    low, median, high = np.quantile(probs, [tail, 0.5, 1 - tail])
+    positions = estimated_positions(probs, max_position)
+    distribution = np.bincount(positions, minlength=max_position + 1)[1:] / len(probs)
+    position_low, position_high = np.quantile(positions, [tail, 1 - tail])
+    return {
+        "samples": len(probs),
+        "level": level,
+        "mean": float(probs.mean()),
+        "std": float(probs.std()),
+        "median": float(median),
+        "low": float(low),
+        "high": float(high),
+        "position_distribution": distribution,
+        "position_low": int(position_low),
+        "position_high": int(position_high),
+    }
+
+
+def monte_carlo(raw: dict, predictor, n_samples: int = 1000, lap_sigma: float = 0.15,
+                sector_sigma: float = 0.08, level: float = 0.9,
+                fastest_quali_time: float = FASTEST_QUALI_TIME, max_position: int = 20) -> dict:
+    """Score `n_samples` perturbed copies of `raw` in one batch and summarize them.
+
+    `predictor` is a CachedPredictor; samples are scored with ``cache=False``.
+    """
+    base = engineer_features(raw, fastest_quali_time)[0]
+    seed = int(feature_key(np.append(base, [n_samples, lap_sigma, sector_sigma]))[:16], 16)
+    matrix = engineer_features(perturb_inputs(raw, n_samples, lap_sigma, sector_sigma, seed), fastest_quali_time)
+    probs = np.asarray(predictor.predict_rows(matrix.tolist(), cache=False), dtype=np.float64)
+    return summarize(probs, level, max_position)
@@ -0,0 +1,121 @@
+"""Encodings for batched /predict payloads.
+
+``json`` is the original ``{"features": [[...], ...]}`` body. The binary
+formats send the (N, 20) feature matrix as-is:
+
+  * ``f64`` / ``f32`` – packed little-endian floats (``ndarray.tobytes``),
+    ``Content-Type: application/x-ndarray; dtype=<f8; shape=N,20``
+  * ``arrow`` – an Arrow IPC stream with one column per feature
+
+The backend answers in the format named in ``Accept`` (probabilities as a
+length-N vector, model version in ``X-Model-Version``) or in JSON. Both
+sides of the codec live here so the fake backend in bench/ can reuse it.
+"""
+import gzip
+import json
+from typing import Optional, Tuple
+
+import numpy as np
+
+from features import FEATURE_ORDER, N_FEATURES
+
+JSON = "application/json"
+NDARRAY = "application/x-ndarray"
+ARROW = "application/vnd.apache.arrow.stream"
+
+WIRE_FORMATS = ("json", "f64", "f32", "arrow")
+_DTYPES = {"f64": "<f8", "f32": "<f4"}
+PROBABILITY_COLUMN = "winner_probability"
+MODEL_VERSION_HEADER = "X-Model-Version"
+
+
+def parse_media_type(header: Optional[str]) -> Tuple[str, dict]:
+    """'type/sub; k=v; ...' -> ('type/sub', {k: v})"""
+    parts = [p.strip() for p in (header or JSON).split(";")]
+    params = dict(p.split("=", 1) for p in parts[1:] if "=" in p)
+    return parts[0].lower(), {k.strip().lower(): v.strip() for k, v in params.items()}
+
+
+def media_type(fmt: str, shape: Optional[tuple] = None) -> str:
+    if fmt == "arrow":
+        return ARROW
+    if fmt in _DTYPES:
+        ctype = f"{NDARRAY}; dtype={_DTYPES[fmt]}"
+        return ctype + (f"; shape={','.join(map(str, shape))}" if shape else "")
+    return JSON
+
+
+def format_of(content_type: Optional[str]) -> str:
+    """Wire format name for a Content-Type/Accept entry ('json' if unknown)"""
+    mtype, params = parse_media_type(content_type)
+    if mtype == ARROW:
+        return "arrow"
+    if mtype == NDARRAY:
+        return "f32" if params.get("dtype") == "<f4" else "f64"
+    return "json"
+
+
+def _to_arrow(columns: dict) -> bytes:
+    import pyarrow as pa
+
+    batch = pa.RecordBatch.from_arrays([pa.array(v) for v in columns.values()], names=list(columns))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def _from_arrow(body: bytes):
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(body).read_all()
+
+
+# ---------- Request: matriks fitur ----------
+
+def encode_rows(matrix, fmt: str) -> Tuple[bytes, str]:
+    """Encode an (N, 20) feature matrix, return (body, content type)"""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if fmt == "arrow":
+        return _to_arrow({name: matrix[:, i] for i, name in enumerate(FEATURE_ORDER)}), ARROW
+    if fmt in _DTYPES:
+        body = np.ascontiguousarray(matrix, dtype=_DTYPES[fmt]).tobytes()
+        return body, media_type(fmt, matrix.shape)
+    return json.dumps({"features": matrix.tolist()}).encode(), JSON
+
+
+def decode_rows(body: bytes, content_type: str) -> np.ndarray:
+    """Inverse of encode_rows(); returns an (N, 20) float64 matrix"""
+    fmt = format_of(content_type)
+    if fmt == "arrow":
+        table = _from_arrow(body)
+        return np.column_stack([table.column(name).to_numpy() for name in FEATURE_ORDER]).astype(np.float64)
+    if fmt in _DTYPES:
+        return np.frombuffer(body, dtype=_DTYPES[fmt]).astype(np.float64).reshape(-1, N_FEATURES)
+    return np.atleast_2d(np.asarray(json.loads(body)["features"], dtype=np.float64))
+
+
+# ---------- Response: vektor probabilitas ----------
+
+def encode_probabilities(probs, fmt: str) -> Tuple[bytes, str]:
+    probs = np.asarray(probs, dtype=np.float64)
+    if fmt == "arrow":
+        return _to_arrow({PROBABILITY_COLUMN: probs}), ARROW
+    if fmt in _DTYPES:
+        return probs.astype(_DTYPES[fmt]).tobytes(), media_type(fmt, probs.shape)
+    return json.dumps({"winner_probabilities": probs.tolist()}).encode(), JSON
+
+
+def decode_probabilities(body: bytes, content_type: str) -> np.ndarray:
+    """Probabilities from a binary batch response (JSON bodies go through PredictClient)"""
+    fmt = format_of(content_type)
+    if fmt == "arrow":
+        return _from_arrow(body).column(PROBABILITY_COLUMN).to_numpy().astype(np.float64)
+    return np.frombuffer(body, dtype=_DTYPES[fmt]).astype(np.float64)
+
+
+def maybe_gzip(body: bytes, min_bytes: int) -> Tuple[bytes, Optional[str]]:
+    """gzip bodies of at least `min_bytes` (0 = never), return (body, Content-Encoding)"""
+    if min_bytes and len(body) >= min_bytes:
+        return gzip.compress(body, compresslevel=1), "gzip"
+    return body, None